@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Script de profilage de la répartition proportionnelle (ProportionalCalculator)
+
+Construit des RFCV représentatives (par défaut 100 RFCV de 35 articles,
+comme OT_M_2025_03475) et exécute apply_to_rfcv sous cProfile. Les
+statistiques sont triées par temps cumulé pour distinguer le coût des
+répartitions (distribute_proportionally) de celui de l'affectation aux
+articles (construction des CurrencyAmount, parcours des items).
+
+Usage:
+    python scripts/profile_proportional.py [--rfcv 100] [--items 35] [--top 25]
+    python scripts/profile_proportional.py --output proportional.prof
+
+Pour un profil ligne par ligne (CPU + mémoire), lancer le même script
+sous scalene si disponible:
+    scalene --html --outfile profile.html scripts/profile_proportional.py
+"""
+import sys
+import argparse
+import cProfile
+import pstats
+import random
+import time
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from models import (
+    RFCVData, Item, Tarification, Valuation, CurrencyAmount, Financial
+)
+from proportional_calculator import ProportionalCalculator, HAS_NUMPY, _NUMPY_MIN_ITEMS
+
+
+def build_rfcv(n_items: int, rng: random.Random) -> RFCVData:
+    """
+    Construit une RFCV avec totaux globaux (FRET, ASSURANCE, POIDS) à répartir
+
+    Args:
+        n_items: Nombre d'articles
+        rng: Générateur aléatoire (reproductibilité)
+
+    Returns:
+        RFCVData prête pour apply_to_rfcv
+    """
+    # Moitié d'articles identiques (cas fréquent), moitié de FOB variés
+    fobs = [362.39 if i % 2 == 0 else round(rng.uniform(50, 5000), 2) for i in range(n_items)]
+    return RFCVData(
+        financial=Financial(currency_code='USD', exchange_rate=566.68),
+        valuation=Valuation(
+            gross_weight=22797.0,
+            net_weight=22227.0,
+            external_freight=CurrencyAmount(amount_foreign=2000.0, currency_code='USD'),
+            insurance=CurrencyAmount(amount_national=44050.0, currency_code='XOF'),
+        ),
+        items=[Item(tarification=Tarification(item_price=fob)) for fob in fobs],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profilage de ProportionalCalculator.apply_to_rfcv")
+    parser.add_argument('--rfcv', type=int, default=100, help="Nombre de RFCV traitées (défaut: 100)")
+    parser.add_argument('--items', type=int, default=35, help="Articles par RFCV (défaut: 35)")
+    parser.add_argument('--top', type=int, default=25, help="Nombre de lignes affichées (défaut: 25)")
+    parser.add_argument('--sort', default='cumulative', help="Clé de tri pstats (défaut: cumulative)")
+    parser.add_argument('--output', help="Fichier .prof à écrire (pour snakeviz, pstats...)")
+    parser.add_argument('--seed', type=int, default=42, help="Graine aléatoire (défaut: 42)")
+    args = parser.parse_args()
+
+    # RFCV construites hors mesure : apply_to_rfcv modifie ses entrées
+    rng = random.Random(args.seed)
+    rfcvs = [build_rfcv(args.items, rng) for _ in range(args.rfcv)]
+    calculator = ProportionalCalculator()
+
+    chemin = 'NumPy' if HAS_NUMPY and args.items >= _NUMPY_MIN_ITEMS else 'Python'
+    print(f"📊 {args.rfcv} RFCV × {args.items} articles (chemin {chemin})")
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    for rfcv in rfcvs:
+        calculator.apply_to_rfcv(rfcv)
+    profiler.disable()
+    elapsed = time.perf_counter() - start
+
+    print(f"⏱  {elapsed * 1000:.1f} ms au total, {elapsed * 1e6 / args.rfcv:.0f} µs par RFCV (sous profileur)\n")
+
+    stats = pstats.Stats(profiler)
+    stats.strip_dirs().sort_stats(args.sort).print_stats(args.top)
+
+    if args.output:
+        stats.dump_stats(args.output)
+        print(f"✓ Profil écrit: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
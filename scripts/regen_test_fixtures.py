@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Script pour régénérer les extractions PDF utilisées par les tests
+
+Pour chaque PDF RFCV de test, sérialise le texte et les tables extraits
+dans tests/fixtures/<nom>.json. Les fixtures pytest relisent ces fichiers
+au lieu de rouvrir les PDF avec pdfplumber.
+
+Usage:
+    python scripts/regen_test_fixtures.py [pdf ...]
+"""
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR / 'src'))
+
+from pdf_extractor import PDFExtractor, dump_extraction
+
+FIXTURES_DIR = ROOT_DIR / 'tests' / 'fixtures'
+
+# PDF utilisés par les tests : échantillon versionné, puis RFCV réelles (intégration)
+TEST_PDFS = [
+    ROOT_DIR / 'tests' / 'fixtures' / 'echantillon_extraction.pdf',
+    ROOT_DIR / 'tests' / 'OT_M_2025_03286_BL_2025_03131_RFCV_v1.pdf',
+    ROOT_DIR / 'asycuda-extraction' / 'OT_M_2025_03475_BL_2025_03320_RFCV_v1.pdf',
+    ROOT_DIR / 'asycuda-extraction' / 'OT_M_2025_03977_BL_2025_03796_RFCV_v1.pdf',
+]
+
+
+def regen_fixtures(pdf_paths):
+    """Extrait chaque PDF et écrit sa fixture JSON"""
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+
+    for pdf_path in map(Path, pdf_paths):
+        if not pdf_path.exists():
+            print(f"⚠ PDF absent, ignoré: {pdf_path}")
+            continue
+
+        with PDFExtractor(str(pdf_path)) as extractor:
+            text = extractor.extract_all_text()
+            tables = extractor.extract_all_tables()
+
+        output_path = FIXTURES_DIR / f'{pdf_path.stem}.json'
+        dump_extraction(text, tables, str(output_path))
+        print(f"✓ {pdf_path.name} → {output_path.relative_to(ROOT_DIR)} ({len(tables)} tables)")
+
+
+if __name__ == '__main__':
+    regen_fixtures(sys.argv[1:] or TEST_PDFS)
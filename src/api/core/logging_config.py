@@ -6,6 +6,7 @@ import logging.config
 import sys
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 from logging.handlers import RotatingFileHandler
 
@@ -17,10 +18,53 @@ def configure_logging(settings) -> None:
     Args:
         settings: Instance Settings avec les paramètres de logging
     """
-    log_dir = Path(settings.log_dir)
-    level = settings.log_level
-    fmt = settings.log_format  # "standard" ou "detailed"
+    if settings.log_to_file:
+        Path(settings.log_dir).mkdir(parents=True, exist_ok=True)
+
+    config = _build_logging_config(
+        level=settings.log_level,
+        fmt=settings.log_format,
+        log_to_file=settings.log_to_file,
+        log_dir=str(settings.log_dir),
+        max_bytes=settings.log_max_bytes,
+        backup_count=settings.log_backup_count,
+    )
+    logging.config.dictConfig(config)
+
+    # Activer le security logging existant
+    setup_security_logging(
+        log_dir=settings.log_dir,
+        log_level=getattr(logging, settings.log_level),
+        log_to_file=settings.log_to_file,
+    )
+
+
+@lru_cache(maxsize=16)
+def _build_logging_config(
+    level: str,
+    fmt: str,
+    log_to_file: bool,
+    log_dir: str,
+    max_bytes: int,
+    backup_count: int,
+) -> dict:
+    """
+    Construit le dictionnaire dictConfig (mis en cache par jeu de paramètres)
+
+    dictConfig ne modifie pas le dictionnaire reçu : l'instance en cache
+    peut être réutilisée telle quelle, mais ne doit pas être modifiée.
 
+    Args:
+        level: Niveau de logging (DEBUG, INFO, ...)
+        fmt: Format des logs ("standard" ou "detailed")
+        log_to_file: Si True, ajoute un handler fichier app.log
+        log_dir: Répertoire des fichiers de log
+        max_bytes: Taille max d'un fichier avant rotation
+        backup_count: Nombre de fichiers de rotation conservés
+
+    Returns:
+        Configuration au format logging.config.dictConfig
+    """
     # Handlers
     handlers = {
         'console': {
@@ -32,20 +76,19 @@ def configure_logging(settings) -> None:
     }
     handler_list = ['console']
 
-    if settings.log_to_file:
-        log_dir.mkdir(parents=True, exist_ok=True)
+    if log_to_file:
         handlers['file'] = {
             'class': 'logging.handlers.RotatingFileHandler',
             'level': level,
             'formatter': fmt,
-            'filename': str(log_dir / 'app.log'),
-            'maxBytes': settings.log_max_bytes,
-            'backupCount': settings.log_backup_count,
+            'filename': str(Path(log_dir) / 'app.log'),
+            'maxBytes': max_bytes,
+            'backupCount': backup_count,
             'encoding': 'utf-8',
         }
         handler_list.append('file')
 
-    config = {
+    return {
         'version': 1,
         'disable_existing_loggers': False,
         'formatters': {
@@ -70,15 +113,6 @@ def configure_logging(settings) -> None:
         },
     }
 
-    logging.config.dictConfig(config)
-
-    # Activer le security logging existant
-    setup_security_logging(
-        log_dir=settings.log_dir,
-        log_level=getattr(logging, settings.log_level),
-        log_to_file=settings.log_to_file,
-    )
-
 
 def setup_security_logging(log_dir: str = "logs", log_level: int = logging.INFO, log_to_file: bool = True):
     """
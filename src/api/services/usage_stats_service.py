@@ -3,13 +3,23 @@ Service de statistiques d'utilisation de l'API
 Persistance JSON thread-safe (pattern ChassisSequenceManager)
 """
 
+import atexit
+import copy
 import json
+import os
 import threading
 import logging
 import time
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 logger = logging.getLogger(__name__)
 
@@ -18,13 +28,89 @@ _FLUSH_INTERVAL_SECONDS = 30
 _FLUSH_INTERVAL_MUTATIONS = 100
 
 
+# Structure par défaut des statistiques (copiée par _fresh_stats, jamais modifiée)
+_DEFAULT_STATS_TEMPLATE: Dict[str, Any] = {
+    "initialized_at": None,
+    "last_updated": None,
+    "conversions": {
+        "total": 0,
+        "successful": 0,
+        "failed": 0,
+        "sync": 0,
+        "async": 0,
+        "with_chassis": 0,
+        "with_payment": 0
+    },
+    "batches": {
+        "total": 0,
+        "successful": 0,
+        "failed": 0,
+        "total_files_processed": 0,
+        "successful_files": 0,
+        "failed_files": 0
+    },
+    "chassis": {
+        "generation_requests": 0,
+        "total_vins_generated": 0
+    },
+    "requests": {
+        "total": 0,
+        "by_method": {},
+        "by_status": {}
+    }
+}
+
+
+def _fresh_stats() -> Dict[str, Any]:
+    """Nouvelle structure de statistiques vide, horodatée maintenant"""
+    stats = copy.deepcopy(_DEFAULT_STATS_TEMPLATE)
+    stats["initialized_at"] = stats["last_updated"] = datetime.now().isoformat()
+    return stats
+
+
+def _dumps(data: Dict[str, Any]) -> bytes:
+    """Sérialise en JSON UTF-8 indenté (orjson si disponible)"""
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _loads(payload: bytes) -> Any:
+    """Désérialise du JSON (orjson si disponible)"""
+    if HAS_ORJSON:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+class _RequestCell:
+    """
+    Compteurs de requêtes propres à un thread (cellule style LongAdder).
+
+    Seul le thread propriétaire écrit dans sa cellule : l'incrément ne prend
+    aucun lock. Les lecteurs additionnent les cellules sous le lock du service.
+    """
+
+    __slots__ = ("total", "counts", "flushed_total")
+
+    def __init__(self):
+        self.total = 0
+        # Un seul compteur (méthode, statut) : by_method / by_status sont projetés à la lecture
+        self.counts: Counter = Counter()
+        # Valeur de total incluse dans le dernier snapshot (écrite sous lock)
+        self.flushed_total = 0
+
+
 class UsageStatsService:
     """
     Service de statistiques d'utilisation avec persistance JSON.
 
-    Thread-safe via threading.Lock.
+    Thread-safe via threading.Lock ; les compteurs de requêtes (chemin le plus
+    chaud, appelé par le middleware) sont répartis en cellules par thread
+    et additionnés à la lecture.
     Sauvegarde périodique (toutes les 30s ou 100 mutations) pour éviter
-    l'I/O disque à chaque requête.
+    l'I/O disque à chaque requête. Le snapshot JSON est pris sous lock mais
+    écrit après l'avoir relâché, pour que les track_* concurrents ne
+    patientent pas derrière l'écriture disque.
     """
 
     def __init__(self, storage_path: Optional[str] = None):
@@ -33,10 +119,19 @@ class UsageStatsService:
 
         self.storage_path = Path(storage_path)
         self._lock = threading.Lock()
+        # Les écritures disque se font hors de self._lock : track_* ne bloque
+        # jamais sur l'I/O, seul l'ordre des snapshots est protégé ici
+        self._write_lock = threading.Lock()
         self._stats: Dict[str, Any] = {}
         self._dirty = False
         self._mutations_since_flush = 0
         self._last_flush_time = time.monotonic()
+        self._snapshot_generation = 0
+        self._written_generation = 0
+
+        # Compteurs de requêtes par thread ; self._stats["requests"] reste la base chargée du disque
+        self._local = threading.local()
+        self._request_cells: List[_RequestCell] = []
 
         # Créer répertoire si nécessaire
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
@@ -44,46 +139,12 @@ class UsageStatsService:
         self._load()
         logger.info("UsageStatsService initialisé: %s", self.storage_path)
 
-    def _default_stats(self) -> Dict[str, Any]:
-        """Structure par défaut des statistiques"""
-        now = datetime.now().isoformat()
-        return {
-            "initialized_at": now,
-            "last_updated": now,
-            "conversions": {
-                "total": 0,
-                "successful": 0,
-                "failed": 0,
-                "sync": 0,
-                "async": 0,
-                "with_chassis": 0,
-                "with_payment": 0
-            },
-            "batches": {
-                "total": 0,
-                "successful": 0,
-                "failed": 0,
-                "total_files_processed": 0,
-                "successful_files": 0,
-                "failed_files": 0
-            },
-            "chassis": {
-                "generation_requests": 0,
-                "total_vins_generated": 0
-            },
-            "requests": {
-                "total": 0,
-                "by_method": {},
-                "by_status": {}
-            }
-        }
-
     def _load(self) -> None:
         """Charge les statistiques depuis le fichier JSON"""
         if self.storage_path.exists():
             try:
-                with open(self.storage_path, 'r') as f:
-                    self._stats = json.load(f)
+                # orjson.JSONDecodeError hérite de json.JSONDecodeError
+                self._stats = _loads(self.storage_path.read_bytes())
                 # Migration : ajouter les champs manquants si upgrade
                 batches = self._stats.get("batches", {})
                 if "successful_files" not in batches:
@@ -93,54 +154,124 @@ class UsageStatsService:
                 logger.info("Statistiques chargées depuis %s", self.storage_path)
             except (json.JSONDecodeError, IOError) as e:
                 logger.warning("Erreur chargement stats: %s. Initialisation.", e)
-                self._stats = self._default_stats()
+                self._stats = _fresh_stats()
         else:
             logger.info("Aucun fichier de stats existant. Initialisation.")
-            self._stats = self._default_stats()
-            self._force_save()
-
-    def _force_save(self) -> None:
-        """Sauvegarde immédiate sur disque (appelé sous lock)"""
-        try:
-            self._stats["last_updated"] = datetime.now().isoformat()
-            with open(self.storage_path, 'w') as f:
-                json.dump(self._stats, f, indent=2, ensure_ascii=False)
-            self._dirty = False
-            self._mutations_since_flush = 0
-            self._last_flush_time = time.monotonic()
-        except IOError as e:
-            logger.error("Erreur sauvegarde stats: %s", e)
-
-    def _maybe_flush(self) -> None:
-        """Flush si le seuil de mutations ou le délai est atteint (appelé sous lock)"""
+            self._stats = _fresh_stats()
+            self._write(self._snapshot())
+
+    def _snapshot(self) -> Tuple[int, bytes]:
+        """
+        Sérialise l'état courant pour écriture disque (appelé sous lock)
+
+        Returns:
+            Tuple (génération, JSON UTF-8) à passer à _write() une fois le lock relâché
+        """
+        self._stats["last_updated"] = datetime.now().isoformat()
+        self._dirty = False
+        self._mutations_since_flush = 0
+        self._last_flush_time = time.monotonic()
+        self._snapshot_generation += 1
+        data = dict(self._stats)
+        data["requests"] = self._merged_request_stats(mark_flushed=True)
+        return self._snapshot_generation, _dumps(data)
+
+    def _merged_request_stats(self, mark_flushed: bool = False) -> Dict[str, Any]:
+        """
+        Additionne la base persistée et les cellules de chaque thread (appelé sous lock)
+
+        Args:
+            mark_flushed: Si True, marque les totaux lus comme inclus dans un snapshot
+
+        Returns:
+            Nouveau dictionnaire {total, by_method, by_status}
+        """
+        base = self._stats["requests"]
+        total = base["total"]
+        by_method = dict(base["by_method"])
+        by_status = dict(base["by_status"])
+
+        for cell in self._request_cells:
+            cell_total = cell.total
+            # dict() copie atomiquement sous le GIL, même si le propriétaire incrémente
+            for (method, status_code), count in dict(cell.counts).items():
+                by_method[method] = by_method.get(method, 0) + count
+                status_key = str(status_code)
+                by_status[status_key] = by_status.get(status_key, 0) + count
+            total += cell_total
+            if mark_flushed:
+                cell.flushed_total = cell_total
+
+        return {"total": total, "by_method": by_method, "by_status": by_status}
+
+    def _has_pending_requests(self) -> bool:
+        """True si des requêtes ont été comptées depuis le dernier snapshot (appelé sous lock)"""
+        return any(cell.total != cell.flushed_total for cell in self._request_cells)
+
+    def _request_cell(self) -> _RequestCell:
+        """Retourne la cellule du thread courant (créée au premier appel)"""
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = _RequestCell()
+            with self._lock:
+                self._request_cells.append(cell)
+            self._local.cell = cell
+        return cell
+
+    def _write(self, snapshot: Optional[Tuple[int, bytes]]) -> None:
+        """Écrit un snapshot sur disque (appelé hors lock)"""
+        if snapshot is None:
+            return
+        generation, payload = snapshot
+        with self._write_lock:
+            # Un snapshot plus récent a déjà été écrit par un autre thread
+            if generation <= self._written_generation:
+                return
+            # Écriture atomique : un crash en cours d'écriture laisse l'ancien fichier intact
+            tmp_path = self.storage_path.with_name(self.storage_path.name + '.tmp')
+            try:
+                tmp_path.write_bytes(payload)
+                os.replace(tmp_path, self.storage_path)
+                self._written_generation = generation
+            except IOError as e:
+                logger.error("Erreur sauvegarde stats: %s", e)
+                self._dirty = True
+
+    def _maybe_flush(self) -> Optional[Tuple[int, bytes]]:
+        """
+        Prépare un snapshot si le seuil de mutations ou le délai est atteint (appelé sous lock)
+
+        Returns:
+            Snapshot à écrire via _write() après relâchement du lock, ou None
+        """
         self._dirty = True
         self._mutations_since_flush += 1
 
         elapsed = time.monotonic() - self._last_flush_time
         if (self._mutations_since_flush >= _FLUSH_INTERVAL_MUTATIONS
                 or elapsed >= _FLUSH_INTERVAL_SECONDS):
-            self._force_save()
+            return self._snapshot()
+        return None
 
     def flush(self) -> None:
         """Force la sauvegarde si des données sont en attente. Safe à appeler au shutdown."""
         with self._lock:
-            if self._dirty:
-                self._force_save()
+            pending = self._dirty or self._has_pending_requests()
+            snapshot = self._snapshot() if pending else None
+        self._write(snapshot)
 
     def track_request(self, method: str, status_code: int) -> None:
-        """Enregistre une requête HTTP"""
-        with self._lock:
-            self._stats["requests"]["total"] += 1
-
-            method_key = method.upper()
-            self._stats["requests"]["by_method"][method_key] = \
-                self._stats["requests"]["by_method"].get(method_key, 0) + 1
-
-            status_key = str(status_code)
-            self._stats["requests"]["by_status"][status_key] = \
-                self._stats["requests"]["by_status"].get(status_key, 0) + 1
-
-            self._maybe_flush()
+        """Enregistre une requête HTTP (sans lock sur le chemin courant)"""
+        cell = self._request_cell()
+        cell.counts[(method.upper(), status_code)] += 1
+        cell.total += 1
+
+        # Le lock n'est pris que tous les N appels du thread ou une fois le délai écoulé
+        if (cell.total % _FLUSH_INTERVAL_MUTATIONS == 0
+                or time.monotonic() - self._last_flush_time >= _FLUSH_INTERVAL_SECONDS):
+            with self._lock:
+                snapshot = self._snapshot()
+            self._write(snapshot)
 
     def track_conversion(
         self,
@@ -169,7 +300,8 @@ class UsageStatsService:
             if has_payment:
                 self._stats["conversions"]["with_payment"] += 1
 
-            self._maybe_flush()
+            snapshot = self._maybe_flush()
+        self._write(snapshot)
 
     def track_batch(self, successful: int, failed: int, files_processed: int) -> None:
         """Enregistre un traitement batch avec compteurs par fichier"""
@@ -184,7 +316,8 @@ class UsageStatsService:
             else:
                 self._stats["batches"]["failed"] += 1
 
-            self._maybe_flush()
+            snapshot = self._maybe_flush()
+        self._write(snapshot)
 
     def track_chassis_generation(self, vins_count: int) -> None:
         """Enregistre une génération de VINs"""
@@ -192,12 +325,15 @@ class UsageStatsService:
             self._stats["chassis"]["generation_requests"] += 1
             self._stats["chassis"]["total_vins_generated"] += vins_count
 
-            self._maybe_flush()
+            snapshot = self._maybe_flush()
+        self._write(snapshot)
 
     def get_stats(self) -> Dict[str, Any]:
         """Retourne toutes les statistiques"""
         with self._lock:
-            return json.loads(json.dumps(self._stats))
+            stats = _loads(_dumps(self._stats))
+            stats["requests"] = self._merged_request_stats()
+            return stats
 
     def get_conversion_stats(self) -> Dict[str, Any]:
         """Retourne les statistiques de conversion"""
@@ -207,7 +343,7 @@ class UsageStatsService:
     def get_request_stats(self) -> Dict[str, Any]:
         """Retourne les statistiques de requêtes"""
         with self._lock:
-            return json.loads(json.dumps(self._stats["requests"]))
+            return self._merged_request_stats()
 
 
 # Lazy singleton
@@ -226,6 +362,8 @@ def get_usage_stats() -> UsageStatsService:
                     _usage_stats = UsageStatsService(settings.stats_file)
                 except Exception:
                     _usage_stats = UsageStatsService()
+                # Filet de sécurité si l'arrêt ne passe pas par le lifespan FastAPI
+                atexit.register(_usage_stats.flush)
     return _usage_stats
 
 
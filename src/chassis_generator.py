@@ -36,17 +36,33 @@ Usage:
 import re
 import random
 import string
-from typing import List, Optional, Dict, Tuple
+from array import array
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Dict, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
 # Import optionnel de la base de préfixes réels
 try:
-    from vin_prefix_database import VINPrefixDatabase, VINPrefix
+    from vin_prefix_database import VINPrefixDatabase, VINPrefix, get_shared_database
     HAS_PREFIX_DATABASE = True
 except ImportError:
     HAS_PREFIX_DATABASE = False
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# En dessous de ce nombre de VIN, la boucle Python est plus rapide que
+# le coût fixe de conversion en tableaux NumPy
+_NUMPY_MIN_VINS = 64
+
+# Lignes traitées par tuile dans les calculs NumPy : les temporaires
+# (N, 17) d'une tuile restent dans le cache (4096 × 17 octets ≈ 70 Ko)
+_VIN_TILE_ROWS = 4096
+
 
 class ChassisType(Enum):
     """Types de châssis supportés"""
@@ -63,6 +79,28 @@ class ValidationResult:
     checksum_valid: Optional[bool] = None
 
 
+def _build_vin_weight_tables(weights: List[int], char_values: Dict[str, int]) -> List[array]:
+    """
+    Précalcule, pour chaque position du VIN, la contribution de chaque code ASCII
+
+    Args:
+        weights: Poids ISO 3779 par position
+        char_values: Transcodage caractère → valeur numérique
+
+    Returns:
+        17 tables de 128 entrées : (valeur × poids) mod 11, 0 pour un caractère inconnu
+    """
+    tables = []
+    for weight in weights:
+        table = array('b', bytes(128))
+        for char, value in char_values.items():
+            contribution = (value * weight) % 11
+            table[ord(char)] = contribution
+            table[ord(char.lower())] = contribution
+        tables.append(table)
+    return tables
+
+
 class ChassisValidator:
     """
     Validateur universel de numéros de châssis
@@ -76,6 +114,9 @@ class ChassisValidator:
     # Caractères interdits dans les VIN ISO 3779
     VIN_FORBIDDEN = {'I', 'O', 'Q', 'i', 'o', 'q'}
 
+    # Caractères autorisés dans un VIN (majuscules et chiffres, sans I/O/Q)
+    VIN_ALLOWED_CHARS = (string.ascii_uppercase + string.digits).translate(str.maketrans('', '', 'IOQ'))
+
     # Poids pour chaque position du VIN (ISO 3779)
     VIN_WEIGHTS = [8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2]
 
@@ -87,6 +128,10 @@ class ChassisValidator:
         '0': 0, '1': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9
     }
 
+    # Contribution (valeur × poids) mod 11 par position et par code ASCII
+    # (minuscules incluses ; la position 9 a un poids nul)
+    _VIN_WEIGHT_TABLES = _build_vin_weight_tables(VIN_WEIGHTS, VIN_CHAR_VALUES)
+
     @classmethod
     def calculate_vin_checksum(cls, vin: str) -> str:
         """
@@ -109,17 +154,44 @@ class ChassisValidator:
         if len(vin) != 17:
             raise ValueError(f"VIN doit avoir 17 caractères, reçu: {len(vin)}")
 
-        total = 0
-        for i, char in enumerate(vin.upper()):
-            if i == 8:  # Position du checksum, ignorée dans le calcul
-                continue
-
-            value = cls.VIN_CHAR_VALUES.get(char, 0)
-            total += value * cls.VIN_WEIGHTS[i]
+        # Caractère non-ASCII → '?' (contribution nulle, comme un caractère inconnu)
+        codes = vin.encode('ascii', 'replace')
+        total = sum(table[code] for table, code in zip(cls._VIN_WEIGHT_TABLES, codes))
 
         checksum = total % 11
         return 'X' if checksum == 10 else str(checksum)
 
+    @classmethod
+    def calculate_vin_checksums(cls, vins: List[str]) -> List[str]:
+        """
+        Calcule le checksum ISO 3779 d'un lot de VIN (même règles que calculate_vin_checksum)
+
+        Au-delà de _NUMPY_MIN_VINS, les VIN sont empilés en une matrice (N, 17)
+        de codes ASCII et les contributions sont sommées en une seule passe
+        vectorisée.
+
+        Args:
+            vins: VIN de 17 caractères (le caractère en position 9 est ignoré)
+
+        Returns:
+            Caractères de checksum, dans l'ordre d'entrée
+
+        Raises:
+            ValueError: Si un VIN n'a pas 17 caractères
+        """
+        if not (HAS_NUMPY and len(vins) >= _NUMPY_MIN_VINS):
+            calculate = cls.calculate_vin_checksum
+            return [calculate(vin) for vin in vins]
+
+        for vin in vins:
+            if len(vin) != 17:
+                raise ValueError(f"VIN doit avoir 17 caractères, reçu: {len(vin)}")
+
+        codes = np.frombuffer(
+            ''.join(vins).encode('ascii', 'replace'), dtype=np.uint8
+        ).reshape(len(vins), 17)
+        return list(_vin_checksum_codes(codes).tobytes().decode('ascii'))
+
     @classmethod
     def validate_vin(cls, vin: str, check_checksum: bool = True) -> ValidationResult:
         """
@@ -148,9 +220,9 @@ class ChassisValidator:
         if not vin.isalnum():
             errors.append("Caractères non-alphanumériques détectés")
 
-        # Vérifier caractères interdits
-        forbidden_found = [c for c in vin if c in cls.VIN_FORBIDDEN]
-        if forbidden_found:
+        # Vérifier caractères interdits (isdisjoint en C ; liste construite seulement en cas d'erreur)
+        if not cls.VIN_FORBIDDEN.isdisjoint(vin):
+            forbidden_found = [c for c in vin if c in cls.VIN_FORBIDDEN]
             errors.append(f"Caractères interdits (I/O/Q): {forbidden_found}")
 
         # Vérifier checksum si demandé
@@ -239,6 +311,65 @@ class ChassisValidator:
             # Par défaut, essayer validation VIN
             return cls.validate_vin(chassis)
 
+    @classmethod
+    def validate_many(cls, chassis_list: Iterable[str], auto_detect: bool = True) -> List[ValidationResult]:
+        """
+        Valide un lot de châssis (même règles que validate())
+
+        Args:
+            chassis_list: Numéros de châssis à valider
+            auto_detect: Si True, détecte automatiquement le type (VIN vs fabricant)
+
+        Returns:
+            Liste de ValidationResult, dans l'ordre d'entrée
+        """
+        # Méthodes résolues une seule fois pour tout le lot
+        validate_vin = cls.validate_vin
+        if not auto_detect:
+            return [validate_vin(chassis) for chassis in chassis_list]
+
+        validate_manufacturer = cls.validate_manufacturer_chassis
+        return [
+            validate_vin(chassis) if len(chassis) == 17 else validate_manufacturer(chassis)
+            for chassis in chassis_list
+        ]
+
+
+@lru_cache(maxsize=1)
+def _vin_checksum_arrays() -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+    """
+    Tableaux NumPy du calcul vectorisé des checksums (construits au premier usage)
+
+    Returns:
+        (tables de contributions (17, 128), indices de position 0-16,
+         code ASCII du checksum par reste modulo 11)
+    """
+    # Contributions 0-10 : uint8 suffit (somme de 17 positions ≤ 170)
+    return (
+        np.array(ChassisValidator._VIN_WEIGHT_TABLES, dtype=np.uint8),
+        np.arange(17),
+        np.frombuffer(b'0123456789X', dtype=np.uint8),
+    )
+
+
+def _vin_checksum_codes(codes: 'np.ndarray') -> 'np.ndarray':
+    """
+    Checksums ISO 3779 d'une matrice de VIN
+
+    Args:
+        codes: Matrice (N, 17) de codes ASCII (< 128) ; la colonne 9 est ignorée
+
+    Returns:
+        Codes ASCII des N caractères de checksum
+    """
+    tables, positions, checksum_codes = _vin_checksum_arrays()
+    result = np.empty(len(codes), dtype=np.uint8)
+    for base in range(0, len(codes), _VIN_TILE_ROWS):
+        tile = slice(base, base + _VIN_TILE_ROWS)
+        totals = tables[positions, codes[tile]].sum(axis=1, dtype=np.uint16)
+        result[tile] = checksum_codes[totals % 11]
+    return result
+
 
 class VINGenerator:
     """
@@ -300,35 +431,61 @@ class VINGenerator:
             >>> VINGenerator.generate("LZS", "HCKZS", 2028, "S", 4073)
             'LZSHCKZS2S8054073'
         """
-        # Validation paramètres
-        if len(wmi) != 3:
-            raise ValueError(f"WMI doit avoir 3 caractères, reçu: {len(wmi)}")
-        if len(vds) != 5:
-            raise ValueError(f"VDS doit avoir 5 caractères, reçu: {len(vds)}")
-        if year not in cls.YEAR_CODES:
-            raise ValueError(f"Année {year} non supportée (2001-2030)")
-        if len(plant) != 1:
-            raise ValueError(f"Code usine doit avoir 1 caractère, reçu: {len(plant)}")
+        year_code = cls._resolve_year_code(wmi, vds, year, plant)
         if not (1 <= sequence <= 999999):
             raise ValueError(f"Séquence doit être entre 1 et 999999, reçu: {sequence}")
 
         # Construire VIN sans checksum (X temporaire en position 9)
-        year_code = cls.YEAR_CODES[year]
-        sequence_str = str(sequence).zfill(6)
-        vin_temp = f"{wmi.upper()}{vds.upper()}X{year_code.upper()}{plant.upper()}{sequence_str}"
+        # (YEAR_CODES ne contient que des chiffres et majuscules)
+        head = f"{wmi.upper()}{vds.upper()}"
+        tail = f"{year_code}{plant.upper()}{sequence:06d}"
+        vin_temp = f"{head}X{tail}"
 
         # Calculer et insérer checksum
         checksum = ChassisValidator.calculate_vin_checksum(vin_temp)
-        vin = f"{wmi.upper()}{vds.upper()}{checksum}{year_code.upper()}{plant.upper()}{sequence_str}"
+        vin = f"{head}{checksum}{tail}"
 
         # Validation optionnelle
         if validate_output:
-            result = ChassisValidator.validate_vin(vin)
-            if not result.is_valid:
-                raise ValueError(f"VIN généré invalide: {result.errors}")
+            cls._check_generated(vin)
 
         return vin
 
+    @classmethod
+    def _resolve_year_code(cls, wmi: str, vds: str, year: int, plant: str) -> str:
+        """
+        Valide les paramètres fixes d'un VIN et résout le code année
+
+        Args:
+            wmi: World Manufacturer Identifier (3 caractères)
+            vds: Vehicle Descriptor Section (5 caractères)
+            year: Année modèle (2001-2030)
+            plant: Code usine (1 caractère)
+
+        Returns:
+            Code année (position 10)
+
+        Raises:
+            ValueError: Si les paramètres sont invalides
+        """
+        if len(wmi) != 3:
+            raise ValueError(f"WMI doit avoir 3 caractères, reçu: {len(wmi)}")
+        if len(vds) != 5:
+            raise ValueError(f"VDS doit avoir 5 caractères, reçu: {len(vds)}")
+        year_code = cls.YEAR_CODES.get(year)
+        if year_code is None:
+            raise ValueError(f"Année {year} non supportée (2001-2030)")
+        if len(plant) != 1:
+            raise ValueError(f"Code usine doit avoir 1 caractère, reçu: {len(plant)}")
+        return year_code
+
+    @staticmethod
+    def _check_generated(vin: str) -> None:
+        """Lève ValueError si le VIN généré n'est pas conforme ISO 3779"""
+        result = ChassisValidator.validate_vin(vin)
+        if not result.is_valid:
+            raise ValueError(f"VIN généré invalide: {result.errors}")
+
     @classmethod
     def generate_batch(
         cls,
@@ -357,10 +514,109 @@ class VINGenerator:
             >>> VINGenerator.generate_batch("LZS", "HCKZS", 2028, "S", 4073, 3)
             ['LZSHCKZS2S8054073', 'LZSHCKZS2S8054074', 'LZSHCKZS2S8054075']
         """
-        return [
-            cls.generate(wmi, vds, year, plant, start_sequence + i)
-            for i in range(quantity)
-        ]
+        if quantity < 1:
+            return []
+        year_code = cls._resolve_year_code(wmi, vds, year, plant)
+        return cls.generate_batch_for_year_code(wmi, vds, year_code, plant, start_sequence, quantity)
+
+    @staticmethod
+    def _generate_batch_numpy(head: str, tail_prefix: str, start_sequence: int, quantity: int) -> List[str]:
+        """
+        Construit un lot de VIN sous forme de matrice (N, 17) de codes ASCII
+
+        Les colonnes fixes (WMI+VDS, code année, usine) sont remplies par
+        diffusion, les 6 chiffres de série par divisions successives de
+        arange(start, start+N), puis la colonne 9 reçoit les checksums,
+        par tuiles de _VIN_TILE_ROWS lignes. Les chaînes ne sont créées
+        qu'à la fin.
+
+        Args:
+            head: WMI+VDS en majuscules (8 caractères ASCII)
+            tail_prefix: Code année + code usine (2 caractères ASCII)
+            start_sequence: Première séquence (bornes déjà vérifiées)
+            quantity: Nombre de VIN
+
+        Returns:
+            Liste de VIN (identique au chemin Python)
+        """
+        codes = np.empty((quantity, 17), dtype=np.uint8)
+        codes[:, :8] = np.frombuffer(head.encode('ascii'), dtype=np.uint8)
+        codes[:, 8] = ord('X')  # poids nul en position 9
+        codes[:, 9:11] = np.frombuffer(tail_prefix.encode('ascii'), dtype=np.uint8)
+
+        # Série puis checksum, tuile par tuile (la tuile reste en cache entre les deux)
+        for base in range(0, quantity, _VIN_TILE_ROWS):
+            tile = codes[base:base + _VIN_TILE_ROWS]
+            sequences = np.arange(start_sequence + base, start_sequence + base + len(tile), dtype=np.int64)
+            for column in range(16, 10, -1):
+                sequences, digits = np.divmod(sequences, 10)
+                tile[:, column] = digits + ord('0')
+            tile[:, 8] = _vin_checksum_codes(tile)
+
+        text = codes.tobytes().decode('ascii')
+        return [text[i:i + 17] for i in range(0, 17 * quantity, 17)]
+
+    @classmethod
+    def generate_batch_for_year_code(
+        cls,
+        wmi: str,
+        vds: str,
+        year_code: str,
+        plant: str,
+        start_sequence: int,
+        quantity: int
+    ) -> List[str]:
+        """
+        Génère un lot de VIN consécutifs à partir d'un code année déjà résolu
+
+        Les parties fixes (WMI+VDS, code année, usine) sont assemblées et
+        validées une seule fois : seuls le numéro de série et le checksum
+        varient d'un VIN à l'autre. Les paramètres fixes doivent avoir été
+        validés au préalable (voir generate_batch).
+
+        Args:
+            wmi: World Manufacturer Identifier (3 caractères)
+            vds: Vehicle Descriptor Section (5 caractères)
+            year_code: Code année (position 10), ex: 'S' pour 2025
+            plant: Code usine (1 caractère)
+            start_sequence: Numéro de début de séquence
+            quantity: Nombre de VIN à générer
+
+        Returns:
+            Liste de VIN générés (identique à generate_batch)
+
+        Raises:
+            ValueError: Si une séquence sort de 1-999999 ou si le VIN est invalide
+        """
+        if quantity < 1:
+            return []
+
+        if not (1 <= start_sequence <= 999999):
+            raise ValueError(f"Séquence doit être entre 1 et 999999, reçu: {start_sequence}")
+
+        head = f"{wmi.upper()}{vds.upper()}"
+        tail_prefix = f"{year_code}{plant.upper()}"
+
+        # Seuls les chiffres de série varient : valider le premier VIN suffit
+        first_tail = f"{tail_prefix}{start_sequence:06d}"
+        first_checksum = ChassisValidator.calculate_vin_checksum(f"{head}X{first_tail}")
+        first_vin = f"{head}{first_checksum}{first_tail}"
+        cls._check_generated(first_vin)
+
+        last_sequence = start_sequence + quantity - 1
+        if last_sequence > 999999:
+            raise ValueError("Séquence doit être entre 1 et 999999, reçu: 1000000")
+
+        if HAS_NUMPY and quantity >= _NUMPY_MIN_VINS and f"{head}{tail_prefix}".isascii():
+            return cls._generate_batch_numpy(head, tail_prefix, start_sequence, quantity)
+
+        # Checksums du reste du lot calculés en une passe
+        tails = [f"{tail_prefix}{sequence:06d}" for sequence in range(start_sequence + 1, last_sequence + 1)]
+        checksums = ChassisValidator.calculate_vin_checksums([f"{head}X{tail}" for tail in tails])
+
+        vins = [first_vin]
+        vins.extend(f"{head}{checksum}{tail}" for checksum, tail in zip(checksums, tails))
+        return vins
 
 
 class ManufacturerChassisGenerator:
@@ -404,9 +660,58 @@ class ManufacturerChassisGenerator:
             ... )
             'AP2KC1A6S258796'
         """
+        return ManufacturerChassisGenerator._render(
+            ManufacturerChassisGenerator._compile_template(template), params
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _compile_template(template: str) -> Callable[[Dict[str, any]], str]:
+        """
+        Analyse un template une seule fois et retourne sa fonction de rendu
+
+        Les champs simples ({nom} ou {nom:spec}) sont précompilés en une liste
+        (littéral | champ, spec). Les formes avancées (attributs, index,
+        conversions !r, specs imbriquées) retombent sur str.format.
+
+        Args:
+            template: Template de format avec variables Python
+
+        Returns:
+            Fonction params -> châssis (non converti en majuscules)
+        """
+        try:
+            parsed = list(string.Formatter().parse(template))
+        except ValueError:
+            parsed = None
+
+        if parsed is None or any(
+            field is not None
+            and (not field.isidentifier() or conversion is not None or '{' in spec)
+            for _, field, spec, conversion in parsed
+        ):
+            return lambda params: template.format(**params)
+
+        parts: List[Tuple[Optional[str], str]] = []
+        for literal, field, spec, _ in parsed:
+            if literal:
+                parts.append((None, literal))
+            if field is not None:
+                parts.append((field, spec))
+
+        def render(params: Dict[str, any]) -> str:
+            return ''.join(
+                text if field is None else format(params[field], text)
+                for field, text in parts
+            )
+
+        return render
+
+    @staticmethod
+    def _render(compiled: Callable[[Dict[str, any]], str], params: Dict[str, any]) -> str:
+        """Applique un template compilé (erreurs converties en ValueError)"""
         try:
-            chassis = template.format(**params)
-            return chassis.upper()
+            return compiled(params).upper()
         except KeyError as e:
             raise ValueError(f"Variable manquante dans params: {e}")
         except Exception as e:
@@ -443,12 +748,15 @@ class ManufacturerChassisGenerator:
             ... )
             ['TEST0100', 'TEST0101', 'TEST0102']
         """
+        # Template analysé une seule fois pour tout le lot
+        compiled = ManufacturerChassisGenerator._compile_template(template)
+        render = ManufacturerChassisGenerator._render
+
+        params = base_params.copy()
         chassis_list = []
-        for i in range(quantity):
-            params = base_params.copy()
-            params[sequence_var] = start_sequence + i
-            chassis = ManufacturerChassisGenerator.generate(template, params)
-            chassis_list.append(chassis)
+        for sequence in range(start_sequence, start_sequence + quantity):
+            params[sequence_var] = sequence
+            chassis_list.append(render(compiled, params))
         return chassis_list
 
 
@@ -487,10 +795,11 @@ class ChassisFactory:
         self.validator = ChassisValidator()
 
         # Charger base de préfixes réels si demandé et disponible
+        # (chargée une fois par processus, partagée entre les factories)
         self.prefix_db: Optional[VINPrefixDatabase] = None
         if use_real_prefixes and HAS_PREFIX_DATABASE:
             try:
-                self.prefix_db = VINPrefixDatabase(prefix_db_path)
+                self.prefix_db = get_shared_database(prefix_db_path)
             except FileNotFoundError:
                 # Base de préfixes non trouvée, mode générique
                 pass
@@ -722,8 +1031,7 @@ class ChassisFactory:
         wmi_pool = ["LZS", "LFV", "LBV", "LDC", "LGX"]
 
         # VDS aléatoire (5 caractères alphanumériques, sans I/O/Q)
-        allowed_chars = string.ascii_uppercase + string.digits
-        allowed_chars = ''.join(c for c in allowed_chars if c.upper() not in ChassisValidator.VIN_FORBIDDEN)
+        allowed_chars = ChassisValidator.VIN_ALLOWED_CHARS
 
         chassis_list = []
         for _ in range(quantity):
@@ -761,6 +1069,18 @@ class ChassisFactory:
         """
         return self.validator.validate(chassis)
 
+    def validate_many(self, chassis_list: Iterable[str]) -> List[ValidationResult]:
+        """
+        Valide un lot de châssis (détection automatique du type)
+
+        Args:
+            chassis_list: Numéros de châssis à valider
+
+        Returns:
+            Liste de ValidationResult, dans l'ordre d'entrée
+        """
+        return self.validator.validate_many(chassis_list)
+
     def continue_sequence(
         self,
         existing: List[str],
@@ -919,10 +1239,20 @@ class ChassisFactory:
                 "Génération unique nécessite ensure_unique=True lors de l'initialisation"
             )
 
-        return [
-            self.create_unique_vin(wmi, vds, year, plant)
-            for _ in range(quantity)
-        ]
+        if quantity < 1:
+            return []
+
+        # Paramètres validés et code année résolu une fois pour tout le lot
+        # (avant réservation : aucune séquence consommée si invalides)
+        year_code = self.vin_generator._resolve_year_code(wmi, vds, year, plant)
+
+        # Un seul bloc réservé (et sauvegardé) pour tout le lot
+        prefix = f"{wmi}{vds}{year_code}"
+        first_sequence = self.sequence_manager.reserve_sequences(prefix, quantity)
+
+        return self.vin_generator.generate_batch_for_year_code(
+            wmi, vds, year_code, plant, first_sequence, quantity
+        )
 
     def create_unique_vin_from_real_prefix(
         self,
@@ -18,9 +18,29 @@ from pathlib import Path
 from typing import Dict, Optional
 import logging
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 logger = logging.getLogger(__name__)
 
 
+def _dumps(data: Dict[str, int]) -> bytes:
+    """Sérialise en JSON UTF-8 indenté (orjson si disponible)"""
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+def _loads(payload: bytes) -> Dict[str, int]:
+    """Désérialise du JSON (orjson si disponible)"""
+    if HAS_ORJSON:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
 class ChassisSequenceManager:
     """
     Gestionnaire de séquences uniques pour numéros de châssis
@@ -73,8 +93,8 @@ class ChassisSequenceManager:
         """Charge les séquences depuis le fichier JSON"""
         if self.storage_path.exists():
             try:
-                with open(self.storage_path, 'r') as f:
-                    self.sequences = json.load(f)
+                # orjson.JSONDecodeError hérite de json.JSONDecodeError
+                self.sequences = _loads(self.storage_path.read_bytes())
                 logger.info(f"Chargé {len(self.sequences)} séquences depuis {self.storage_path}")
             except (json.JSONDecodeError, IOError) as e:
                 logger.warning(f"Erreur chargement séquences : {e}. Démarrage avec séquences vides.")
@@ -83,11 +103,14 @@ class ChassisSequenceManager:
             logger.info("Aucun fichier de séquences existant. Démarrage avec séquences vides.")
             self.sequences = {}
 
+    def _write_bytes(self, data: bytes) -> None:
+        """Écrit le contenu sérialisé dans le fichier de persistance (remplaçable en test)"""
+        self.storage_path.write_bytes(data)
+
     def _save(self) -> None:
         """Sauvegarde les séquences dans le fichier JSON"""
         try:
-            with open(self.storage_path, 'w') as f:
-                json.dump(self.sequences, f, indent=2)
+            self._write_bytes(_dumps(self.sequences))
             logger.debug(f"Séquences sauvegardées : {len(self.sequences)} préfixes")
         except IOError as e:
             logger.error(f"Erreur sauvegarde séquences : {e}")
@@ -136,6 +159,50 @@ class ChassisSequenceManager:
 
             return next_seq
 
+    def reserve_sequences(self, prefix: str, count: int) -> int:
+        """
+        Réserve un bloc de séquences consécutives (une seule sauvegarde)
+
+        La persistance reste synchrone : un bloc réservé est sur disque avant
+        d'être utilisé, l'unicité est donc garantie même après un crash.
+
+        Args:
+            prefix: Préfixe du châssis
+            count: Nombre de séquences à réserver (>= 1)
+
+        Returns:
+            Première séquence du bloc (le bloc couvre first..first+count-1)
+
+        Raises:
+            ValueError: Si count < 1
+
+        Example:
+            >>> manager = ChassisSequenceManager()
+            >>> manager.reserve_sequences("LZSHCKZS2S", 10)
+            1
+            >>> manager.get_next_sequence("LZSHCKZS2S")
+            11
+        """
+        if count < 1:
+            raise ValueError(f"count doit être >= 1, reçu: {count}")
+
+        with self._lock:
+            current = self.sequences.get(prefix, 0)
+            last_seq = current + count
+
+            if last_seq > 999999:
+                logger.warning(
+                    f"Séquence {prefix} atteint limite (999999). "
+                    "Considérer changement de préfixe."
+                )
+
+            self.sequences[prefix] = last_seq
+            self._save()
+
+            logger.debug(f"Séquence {prefix} : {current} → {last_seq} ({count} réservées)")
+
+            return current + 1
+
     def get_current_sequence(self, prefix: str) -> int:
         """
         Retourne la dernière séquence utilisée pour ce préfixe
@@ -177,6 +244,27 @@ class ChassisSequenceManager:
             self._save()
             logger.warning(f"Séquence {prefix} réinitialisée à {value}")
 
+    def bulk_set(self, sequences: Dict[str, int]) -> None:
+        """
+        Définit plusieurs séquences en une seule opération (une seule sauvegarde)
+
+        Args:
+            sequences: Dictionnaire {prefix: last_sequence_used}
+
+        Warning:
+            Comme reset_sequence, peut créer des doublons si mal utilisé.
+
+        Example:
+            >>> manager = ChassisSequenceManager()
+            >>> manager.bulk_set({"LZSHCKZS2S": 50, "1FAHP58U5S": 30})
+            >>> manager.get_next_sequence("LZSHCKZS2S")
+            51
+        """
+        with self._lock:
+            self.sequences.update(sequences)
+            self._save()
+            logger.warning(f"{len(sequences)} séquences définies en lot")
+
     def get_all_sequences(self) -> Dict[str, int]:
         """
         Retourne toutes les séquences actuelles
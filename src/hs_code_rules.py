@@ -18,9 +18,13 @@ sont traitées comme des marchandises ordinaires (pas de traitement spécial).
 """
 from typing import Dict, Optional
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# Table de suppression des séparateurs d'un code HS ("8704.31.19.90", "8711 30 19 00")
+_HS_SEPARATORS = str.maketrans('', '', '. ')
+
 
 class HSCodeAnalyzer:
     """Analyseur de codes HS pour détection de châssis obligatoires"""
@@ -55,6 +59,27 @@ class HSCodeAnalyzer:
         'CYCLOMOTEUR', 'MOTOBIKE', 'BIKE'
     ]
 
+    # Alternations compilées : une seule passe sur la description pour savoir
+    # si un mot-clé est présent (cas le plus fréquent : aucun)
+    _VEHICLE_KEYWORDS_RE = re.compile('|'.join(map(re.escape, VEHICLE_KEYWORDS)))
+    _MOTORCYCLE_KEYWORDS_RE = re.compile('|'.join(map(re.escape, MOTORCYCLE_KEYWORDS)))
+
+    @staticmethod
+    def _hs_chapter(hs_code: Optional[str]) -> Optional[str]:
+        """
+        Extrait le chapitre HS (4 premiers chiffres) d'un code brut
+
+        Args:
+            hs_code: Code HS (format: "87043119" ou "8704.31.19.90")
+
+        Returns:
+            Chapitre sur 4 caractères, ou None si le code est absent/trop court
+        """
+        if not hs_code:
+            return None
+        hs_clean = str(hs_code).translate(_HS_SEPARATORS).strip()
+        return hs_clean[:4] if len(hs_clean) >= 4 else None
+
     @staticmethod
     def requires_chassis(hs_code: Optional[str], description: str = '') -> Dict[str, any]:
         """
@@ -72,50 +97,44 @@ class HSCodeAnalyzer:
                 'category': str        # Nom de la catégorie de véhicule
             }
         """
-        # Cas 1: Code HS fourni et valide
-        if hs_code:
-            # Nettoyer le code HS (enlever points, espaces)
-            hs_clean = str(hs_code).replace('.', '').replace(' ', '').strip()
-
-            if len(hs_clean) >= 4:
-                # Extraire chapitre (4 premiers chiffres)
-                chapter = hs_clean[:4]
-
-                if chapter in HSCodeAnalyzer.CHASSIS_REQUIRED_CHAPTERS:
-                    category = HSCodeAnalyzer.CHASSIS_REQUIRED_CHAPTERS[chapter]
-                    logger.debug(f"Code HS {chapter} identifié: {category} - Châssis REQUIS")
-                    return {
-                        'required': True,
-                        'confidence': 1.0,
-                        'source': 'hs_code',
-                        'category': category
-                    }
-                else:
-                    # Code HS valide mais pas dans la liste
-                    logger.debug(f"Code HS {chapter} - Pas de châssis requis")
-                    return {
-                        'required': False,
-                        'confidence': 1.0,
-                        'source': 'hs_code',
-                        'category': 'Marchandise générale'
-                    }
+        # Cas 1: Code HS fourni et valide (lookup direct sur le chapitre)
+        chapter = HSCodeAnalyzer._hs_chapter(hs_code)
+        if chapter is not None:
+            category = HSCodeAnalyzer.CHASSIS_REQUIRED_CHAPTERS.get(chapter)
+            if category is not None:
+                logger.debug("Code HS %s identifié: %s - Châssis REQUIS", chapter, category)
+                return {
+                    'required': True,
+                    'confidence': 1.0,
+                    'source': 'hs_code',
+                    'category': category
+                }
+            # Code HS valide mais pas dans la liste
+            logger.debug("Code HS %s - Pas de châssis requis", chapter)
+            return {
+                'required': False,
+                'confidence': 1.0,
+                'source': 'hs_code',
+                'category': 'Marchandise générale'
+            }
 
         # Cas 2: Fallback sur mots-clés si code HS absent/invalide
         if description:
             desc_upper = description.upper()
 
-            for keyword in HSCodeAnalyzer.VEHICLE_KEYWORDS:
-                if keyword in desc_upper:
-                    logger.warning(
-                        f"Châssis détecté par mot-clé '{keyword}' dans description "
-                        f"(confiance: 70%) - Code HS manquant ou invalide"
-                    )
-                    return {
-                        'required': True,
-                        'confidence': 0.7,
-                        'source': 'keywords',
-                        'category': f'Véhicule (détection: {keyword})'
-                    }
+            if HSCodeAnalyzer._VEHICLE_KEYWORDS_RE.search(desc_upper):
+                # Mot-clé rapporté selon l'ordre de priorité de la liste
+                keyword = next(k for k in HSCodeAnalyzer.VEHICLE_KEYWORDS if k in desc_upper)
+                logger.warning(
+                    "Châssis détecté par mot-clé '%s' dans description "
+                    "(confiance: 70%%) - Code HS manquant ou invalide", keyword
+                )
+                return {
+                    'required': True,
+                    'confidence': 0.7,
+                    'source': 'keywords',
+                    'category': f'Véhicule (détection: {keyword})'
+                }
 
         # Cas 3: Aucune détection
         return {
@@ -152,30 +171,28 @@ class HSCodeAnalyzer:
             '6022'
         """
         # Méthode 1: Détection par code HS (priorité)
-        if hs_code:
-            hs_clean = str(hs_code).replace('.', '').replace(' ', '').strip()
-            if len(hs_clean) >= 4:
-                chapter = hs_clean[:4]
-                # Code HS 8711 = Motocycles → code document 6122
-                if chapter == '8711':
-                    logger.debug(f"Code HS {chapter} détecté → Code document 6122 (MOTOS)")
-                    return '6122'
-                # Tous les autres codes HS véhicules → code document 6022
-                elif chapter in HSCodeAnalyzer.CHASSIS_REQUIRED_CHAPTERS:
-                    logger.debug(f"Code HS {chapter} détecté → Code document 6022 (VÉHICULES)")
-                    return '6022'
+        chapter = HSCodeAnalyzer._hs_chapter(hs_code)
+        if chapter is not None:
+            # Code HS 8711 = Motocycles → code document 6122
+            if chapter == '8711':
+                logger.debug("Code HS %s détecté → Code document 6122 (MOTOS)", chapter)
+                return '6122'
+            # Tous les autres codes HS véhicules → code document 6022
+            elif chapter in HSCodeAnalyzer.CHASSIS_REQUIRED_CHAPTERS:
+                logger.debug("Code HS %s détecté → Code document 6022 (VÉHICULES)", chapter)
+                return '6022'
 
         # Méthode 2: Fallback sur mots-clés dans description
         if description:
             desc_upper = description.upper()
             # Vérifier mots-clés motos en premier (plus spécifique)
-            for keyword in HSCodeAnalyzer.MOTORCYCLE_KEYWORDS:
-                if keyword in desc_upper:
-                    logger.warning(
-                        f"Mot-clé moto '{keyword}' détecté → Code document 6122 "
-                        f"(fallback - code HS absent ou invalide)"
-                    )
-                    return '6122'
+            if HSCodeAnalyzer._MOTORCYCLE_KEYWORDS_RE.search(desc_upper):
+                keyword = next(k for k in HSCodeAnalyzer.MOTORCYCLE_KEYWORDS if k in desc_upper)
+                logger.warning(
+                    "Mot-clé moto '%s' détecté → Code document 6122 "
+                    "(fallback - code HS absent ou invalide)", keyword
+                )
+                return '6122'
 
         # Par défaut: code 6022 (tricycles et autres véhicules)
         logger.debug("Aucun code HS moto détecté → Code document 6022 par défaut (VÉHICULES)")
@@ -93,18 +93,24 @@ class MetricsCollector:
     def __init__(self):
         self.metrics: List[ConversionMetrics] = []
 
-    def collect_from_rfcv(self, pdf_path: str, rfcv_data: RFCVData) -> ConversionMetrics:
+    def collect_from_rfcv(
+        self,
+        pdf_path: str,
+        rfcv_data: RFCVData,
+        into: Optional[ConversionMetrics] = None
+    ) -> ConversionMetrics:
         """
         Collecte les métriques depuis les données RFCV
 
         Args:
             pdf_path: Chemin du PDF source
             rfcv_data: Données RFCV extraites
+            into: Métriques existantes à compléter (sinon un nouvel objet est créé)
 
         Returns:
-            Métriques collectées
+            Métriques collectées (into si fourni)
         """
-        metrics = ConversionMetrics(pdf_file=pdf_path)
+        metrics = into if into is not None else ConversionMetrics(pdf_file=pdf_path)
 
         # Complétude des traders
         metrics.has_exporter = self._has_trader_data(rfcv_data.exporter)
@@ -272,6 +278,12 @@ class MetricsCollector:
 
         return warnings
 
+    # Sections obligatoires d'un XML ASYCUDA
+    REQUIRED_XML_SECTIONS = (
+        'Property', 'Identification', 'Traders', 'Transport',
+        'Financial', 'Valuation'
+    )
+
     def validate_xml(self, xml_path: str, metrics: ConversionMetrics) -> bool:
         """
         Valide le XML généré
@@ -285,24 +297,7 @@ class MetricsCollector:
         """
         try:
             tree = ET.parse(xml_path)
-            root = tree.getroot()
-
-            # Taille du fichier
-            metrics.xml_size = Path(xml_path).stat().st_size
-
-            # Vérification structure basique
-            required_sections = [
-                'Property', 'Identification', 'Traders', 'Transport',
-                'Financial', 'Valuation'
-            ]
-
-            for section in required_sections:
-                if root.find(section) is None:
-                    metrics.warnings.append(f"Section XML manquante: {section}")
-                    return False
-
-            metrics.xml_valid = True
-            return True
+            return self.validate_xml_root(tree.getroot(), Path(xml_path).stat().st_size, metrics)
 
         except ET.ParseError as e:
             metrics.warnings.append(f"Erreur parsing XML: {str(e)}")
@@ -311,6 +306,29 @@ class MetricsCollector:
             metrics.warnings.append(f"Erreur validation XML: {str(e)}")
             return False
 
+    def validate_xml_root(self, root: ET.Element, xml_size: int, metrics: ConversionMetrics) -> bool:
+        """
+        Valide un arbre XML déjà en mémoire (sans relire le fichier écrit)
+
+        Args:
+            root: Element racine généré
+            xml_size: Taille du XML écrit, en octets
+            metrics: Métriques à mettre à jour
+
+        Returns:
+            True si le XML est valide
+        """
+        metrics.xml_size = xml_size
+
+        # Vérification structure basique
+        for section in self.REQUIRED_XML_SECTIONS:
+            if root.find(section) is None:
+                metrics.warnings.append(f"Section XML manquante: {section}")
+                return False
+
+        metrics.xml_valid = True
+        return True
+
     def add_metrics(self, metrics: ConversionMetrics):
         """Ajoute des métriques à la collection"""
         self.metrics.append(metrics)
@@ -363,8 +381,8 @@ class MetricsCollector:
 def measure_conversion_time(func):
     """Décorateur pour mesurer le temps d'exécution"""
     def wrapper(*args, **kwargs):
-        start = time.time()
+        start = time.perf_counter_ns()
         result = func(*args, **kwargs)
-        elapsed = time.time() - start
+        elapsed = (time.perf_counter_ns() - start) / 1e9
         return result, elapsed
     return wrapper
@@ -2,6 +2,7 @@
 Module d'extraction de données depuis les fichiers PDF RFCV
 Utilise pdfplumber pour extraire le texte et les tables
 """
+import json
 import pdfplumber
 import re
 from typing import Dict, List, Optional, Any, Tuple
@@ -255,3 +256,54 @@ def extract_pdf_data(pdf_path: str) -> Tuple[str, List[pd.DataFrame]]:
         text = extractor.extract_all_text()
         tables = extractor.extract_all_tables()
         return text, tables
+
+
+# Version du format des extractions sérialisées (à incrémenter si le format change)
+EXTRACTION_CACHE_VERSION = 1
+
+
+def dump_extraction(text: str, tables: List[pd.DataFrame], output_path: str) -> None:
+    """
+    Sérialise en JSON le texte et les tables extraits d'un PDF
+
+    Permet de rejouer RFCVParser(preextracted=...) sans rouvrir le PDF
+    (fixtures de tests).
+
+    Args:
+        text: Texte complet extrait
+        tables: Tables extraites (DataFrames)
+        output_path: Fichier JSON de sortie
+    """
+    payload = {
+        'version': EXTRACTION_CACHE_VERSION,
+        'text': text,
+        'tables': [
+            {'columns': list(table.columns), 'rows': table.values.tolist()}
+            for table in tables
+        ],
+    }
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False)
+
+
+def load_extraction(input_path: str) -> Optional[Tuple[str, List[pd.DataFrame]]]:
+    """
+    Relit une extraction sérialisée par dump_extraction
+
+    Args:
+        input_path: Fichier JSON produit par dump_extraction
+
+    Returns:
+        Tuple (texte, liste_tables), ou None si la version du format ne correspond pas
+    """
+    with open(input_path, 'r', encoding='utf-8') as f:
+        payload = json.load(f)
+
+    if payload.get('version') != EXTRACTION_CACHE_VERSION:
+        return None
+
+    tables = [
+        pd.DataFrame(table['rows'], columns=table['columns'])
+        for table in payload['tables']
+    ]
+    return payload['text'], tables
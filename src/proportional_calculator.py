@@ -10,8 +10,17 @@ Auteur: SuperZ AI
 Date: 2025-01-28
 """
 
+import heapq
 import math
-from typing import List, Optional, Tuple
+from array import array
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
 
 # Support both relative and absolute imports
 try:
@@ -19,6 +28,23 @@ try:
 except ImportError:
     from models import RFCVData, Item, CurrencyAmount, ValuationItem
 
+# En dessous de ce nombre d'articles, la boucle Python est plus rapide que
+# le coût fixe de conversion en tableaux NumPy
+_NUMPY_MIN_ITEMS = 32
+
+_XOF_UNIT = Decimal(1)
+
+
+def _round_xof(amount: float) -> float:
+    """
+    Arrondit un montant XOF à l'unité (pas de subdivision), demi vers le haut
+
+    round() arrondit au pair (round(2.5) == 2) : Decimal.quantize avec
+    ROUND_HALF_UP donne l'arrondi commercial attendu (2.5 → 3). Le type
+    float est conservé pour la sortie XML (44.0).
+    """
+    return float(Decimal(str(amount)).quantize(_XOF_UNIT, rounding=ROUND_HALF_UP))
+
 
 class ProportionalCalculator:
     """
@@ -30,7 +56,31 @@ class ProportionalCalculator:
 
     def __init__(self):
         """Initialise le calculateur."""
-        pass
+        # Tampons de travail du chemin NumPy, réutilisés d'une répartition à
+        # l'autre (une instance ne doit donc pas être partagée entre threads)
+        self._exact_buf: Optional['np.ndarray'] = None
+        self._floor_buf: Optional['np.ndarray'] = None
+        self._rem_buf: Optional['np.ndarray'] = None
+
+    def _work_buffers(self, size: int) -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+        """
+        Vues de taille `size` sur les tampons de travail NumPy.
+
+        Les tampons sont réalloués avec une marge (×2) seulement s'ils sont
+        trop petits : les répartitions suivantes n'allouent plus rien.
+
+        Args:
+            size: Nombre d'articles
+
+        Returns:
+            (valeurs exactes, parties entières (int64), parties décimales)
+        """
+        if self._floor_buf is None or self._floor_buf.size < size:
+            capacity = size * 2
+            self._exact_buf = np.empty(capacity, dtype=np.float64)
+            self._floor_buf = np.empty(capacity, dtype=np.int64)
+            self._rem_buf = np.empty(capacity, dtype=np.float64)
+        return self._exact_buf[:size], self._floor_buf[:size], self._rem_buf[:size]
 
     def distribute_proportionally(
         self,
@@ -53,7 +103,7 @@ class ProportionalCalculator:
 
         Args:
             total_amount: Montant total à répartir (ex: 2000.00 USD)
-            item_fobs: Liste des FOB de chaque article (ex: [362.39, 362.39, ...])
+            item_fobs: FOB de chaque article, liste ou tableau NumPy (ex: [362.39, 362.39, ...])
             fob_total: FOB total de tous les articles (ex: 12683.65 USD)
 
         Returns:
@@ -61,7 +111,8 @@ class ProportionalCalculator:
             Garantie: sum(résultat) == int(round(total_amount))
 
         Raises:
-            ValueError: Si fob_total est 0 ou si les listes sont vides
+            ValueError: Si fob_total est 0, si les listes sont vides ou si
+                un montant (total, FOB) est négatif
 
         Exemple:
             >>> calculator = ProportionalCalculator()
@@ -78,47 +129,184 @@ class ProportionalCalculator:
         if fob_total == 0:
             raise ValueError("FOB total ne peut pas être zéro")
 
-        if not item_fobs:
+        if len(item_fobs) == 0:
             raise ValueError("La liste des FOB articles ne peut pas être vide")
 
+        self._check_non_negative([total_amount], item_fobs, fob_total)
+
         if total_amount == 0:
             # Si le total est 0, distribuer 0 partout
             return [0] * len(item_fobs)
 
-        # Étape 1: Règle de trois pour valeurs exactes (précision maximale)
-        exact_values = [
-            (total_amount * fob) / fob_total
-            for fob in item_fobs
-        ]
+        if self._all_equal(item_fobs):
+            return self._distribute_equal(total_amount, item_fobs[0], fob_total, len(item_fobs))
 
-        # Étape 2: Arrondir à l'inférieur
-        floor_values = [math.floor(v) for v in exact_values]
+        if HAS_NUMPY and len(item_fobs) >= _NUMPY_MIN_ITEMS:
+            return self._distribute_numpy([total_amount], item_fobs, fob_total)[0]
 
-        # Étape 3: Calculer parties décimales
-        decimal_parts = [v - math.floor(v) for v in exact_values]
+        # Étapes 1 à 3 en une passe: règle de trois (précision maximale),
+        # arrondi à l'inférieur et partie décimale de chaque article.
+        # Tableaux pré-dimensionnés de valeurs non boxées (8 octets/élément)
+        count = len(item_fobs)
+        floor_values = array('q', bytes(8 * count))
+        decimal_parts = array('d', bytes(8 * count))
+        for i, fob in enumerate(item_fobs):
+            exact = (total_amount * fob) / fob_total
+            floor_value = math.floor(exact)
+            floor_values[i] = floor_value
+            decimal_parts[i] = exact - floor_value
 
         # Étape 4: Calculer unités manquantes pour atteindre le total
-        sum_floor = sum(floor_values)
         target_total = int(round(total_amount))
-        missing_units = target_total - sum_floor
+        missing_units = target_total - sum(floor_values)
 
         # Étape 5: Distribuer les unités manquantes aux articles ayant
-        # les plus grandes parties décimales
+        # les plus grandes parties décimales. nlargest est stable (égalités
+        # dans l'ordre original) et ne trie pas toute la liste.
         if missing_units > 0:
-            # Créer liste d'indices triés par partie décimale décroissante
-            # En cas d'égalité, garder l'ordre original (stable)
-            sorted_indices = sorted(
-                range(len(decimal_parts)),
-                key=lambda i: decimal_parts[i],
-                reverse=True
-            )
-
-            # Ajouter +1 aux N premiers articles (N = missing_units)
-            for i in range(min(missing_units, len(floor_values))):
-                idx = sorted_indices[i]
+            for idx in heapq.nlargest(missing_units, range(count), key=decimal_parts.__getitem__):
                 floor_values[idx] += 1
 
-        return floor_values
+        # tolist() copie : les listes retournées sont indépendantes des tampons
+        return floor_values.tolist()
+
+    @staticmethod
+    def _all_equal(item_fobs: List[float]) -> bool:
+        """Vrai si tous les articles ont le même FOB (liste ou tableau NumPy non vide)"""
+        first = item_fobs[0]
+        if item_fobs[-1] != first:
+            return False
+        if HAS_NUMPY and isinstance(item_fobs, np.ndarray):
+            return bool((item_fobs == first).all())
+        return item_fobs.count(first) == len(item_fobs)
+
+    @staticmethod
+    def _check_non_negative(totals: List[float], item_fobs: List[float], fob_total: float) -> None:
+        """
+        Refuse les montants négatifs, quel que soit le chemin (boucle ou NumPy)
+
+        Les parts réparties sont alors positives ou nulles : le chemin NumPy
+        peut arrondir à l'inférieur par simple troncature.
+
+        Raises:
+            ValueError: Si un total, un FOB article ou le FOB total est négatif
+        """
+        if HAS_NUMPY and isinstance(item_fobs, np.ndarray):
+            lowest_fob = item_fobs.min()
+        else:
+            lowest_fob = min(item_fobs)
+        if fob_total < 0 or lowest_fob < 0 or any(total < 0 for total in totals):
+            raise ValueError("Répartition de montants négatifs non supportée")
+
+    @staticmethod
+    def _distribute_equal(total_amount: float, fob: float, fob_total: float, count: int) -> List[int]:
+        """
+        Répartition pour des articles de FOB identiques (mêmes résultats que
+        l'algorithme général, sans tri ni sélection).
+
+        Toutes les valeurs exactes sont égales : une seule règle de trois,
+        puis les unités manquantes vont aux premiers articles (départage
+        des égalités par ordre des articles).
+        """
+        exact = (total_amount * fob) / fob_total
+        floor_value = math.floor(exact)
+        missing_units = int(round(total_amount)) - floor_value * count
+        # Au plus une unité par article, comme l'algorithme général
+        bumped = min(max(missing_units, 0), count)
+        return [floor_value + 1] * bumped + [floor_value] * (count - bumped)
+
+    def distribute_proportionally_multi(
+        self,
+        totals: List[Optional[float]],
+        item_fobs: List[float],
+        fob_total: float
+    ) -> List[Optional[List[int]]]:
+        """
+        Répartit plusieurs totaux sur les mêmes FOB (mêmes résultats que
+        distribute_proportionally appelé pour chaque total).
+
+        Sur le chemin NumPy, les répartitions sont fusionnées : une seule
+        matrice (totaux × articles) est calculée en une passe sur les FOB.
+
+        Args:
+            totals: Totaux à répartir (ex: FRET, ASSURANCE, POIDS) ; None = absent
+            item_fobs: FOB de chaque article, liste ou tableau NumPy
+            fob_total: FOB total de tous les articles
+
+        Returns:
+            Une répartition par total (None pour un total absent), dans l'ordre
+
+        Raises:
+            ValueError: Si fob_total est 0, si les listes sont vides ou si
+                un montant (total, FOB) est négatif
+        """
+        present = [total for total in totals if total is not None]
+        if (not (HAS_NUMPY and len(item_fobs) >= _NUMPY_MIN_ITEMS and present)
+                or self._all_equal(item_fobs)):
+            return [
+                None if total is None
+                else self.distribute_proportionally(total, item_fobs, fob_total)
+                for total in totals
+            ]
+
+        if fob_total == 0:
+            raise ValueError("FOB total ne peut pas être zéro")
+
+        self._check_non_negative(present, item_fobs, fob_total)
+
+        distributions = iter(self._distribute_numpy(present, item_fobs, fob_total))
+        return [None if total is None else next(distributions) for total in totals]
+
+    def _distribute_numpy(
+        self,
+        totals: List[float],
+        item_fobs: List[float],
+        fob_total: float
+    ) -> List[List[int]]:
+        """
+        Variante vectorisée de distribute_proportionally (mêmes résultats),
+        pour un ou plusieurs totaux à la fois.
+
+        Mêmes opérations flottantes que la boucle Python, calculées en place
+        dans les tampons de l'instance, une ligne par total. Les plus grandes
+        décimales sont sélectionnées par argpartition ; en cas d'égalité à la
+        frontière, un tri stable départage : l'article le plus tôt reçoit
+        l'unité, comme avec heapq.nlargest.
+        """
+        # asarray ne copie pas un tableau déjà converti (apply_to_rfcv)
+        fobs = np.asarray(item_fobs, dtype=np.float64)
+        shape = (len(totals), len(fobs))
+        exact, floors, decimal_parts = (
+            buf.reshape(shape) for buf in self._work_buffers(shape[0] * shape[1])
+        )
+        # (total × FOB) / FOB_total, comme la boucle (pas de poids FOB/FOB_total)
+        np.multiply(np.asarray(totals, dtype=np.float64)[:, None], fobs, out=exact)
+        np.divide(exact, fob_total, out=exact)
+        # Parts positives ou nulles (montants négatifs refusés par
+        # _check_non_negative) : la conversion en entier (troncature)
+        # équivaut à floor, sans passer par np.floor
+        np.copyto(floors, exact, casting='unsafe')
+        np.subtract(exact, floors, out=decimal_parts)
+
+        missing_units = [
+            int(round(total)) - int(row_sum)
+            for total, row_sum in zip(totals, floors.sum(axis=1))
+        ]
+        for values, decimals, missing in zip(floors, decimal_parts, missing_units):
+            if missing <= 0:
+                continue
+            if missing < len(decimals):
+                # Sélection partielle O(N) des plus grandes décimales
+                top = np.argpartition(-decimals, missing - 1)[:missing]
+                threshold = decimals[top].min()
+                if np.count_nonzero(decimals >= threshold) > missing:
+                    # Égalités à la frontière : départager par ordre des articles
+                    top = np.argsort(-decimals, kind='stable')[:missing]
+            else:
+                top = slice(None)
+            values[top] += 1
+
+        return floors.tolist()
 
     def _create_currency_amount(
         self,
@@ -137,18 +325,43 @@ class ProportionalCalculator:
         Returns:
             CurrencyAmount avec les bons champs remplis
         """
+        return self._currency_amount_factory(currency_code, currency_rate)(amount)
+
+    @staticmethod
+    def _currency_amount_factory(
+        currency_code: str,
+        currency_rate: Optional[float] = None
+    ) -> Callable[[float], CurrencyAmount]:
+        """
+        Prépare la construction de CurrencyAmount pour une devise donnée.
+
+        Les champs invariants (devise, nom, taux) sont fixés une seule fois ;
+        la fonction retournée ne reçoit plus que le montant de chaque article.
+
+        Args:
+            currency_code: Code devise (USD, EUR, XOF, etc.)
+            currency_rate: Taux de change (optionnel)
+
+        Returns:
+            Fonction montant -> CurrencyAmount
+        """
         if currency_code == "XOF":
             # Monnaie nationale (XOF)
             # Pour ASYCUDA: XOF nécessite le même montant dans amount_national ET amount_foreign
-            return CurrencyAmount(
-                amount_national=amount,
-                amount_foreign=amount,  # Même valeur pour XOF (taux de change = 1)
-                currency_code=currency_code,
-                currency_name="Franc CFA",
-                currency_rate=1.0
-            )
-        else:
-            # Devise étrangère (USD, EUR, etc.)
+            # Montant arrondi à l'unité : l'égalité national == foreign reste exacte
+            def make_xof(amount: float) -> CurrencyAmount:
+                amount = _round_xof(amount)
+                return CurrencyAmount(
+                    amount_national=amount,
+                    amount_foreign=amount,  # Même valeur pour XOF (taux de change = 1)
+                    currency_code=currency_code,
+                    currency_name="Franc CFA",
+                    currency_rate=1.0
+                )
+            return make_xof
+
+        # Devise étrangère (USD, EUR, etc.)
+        def make_foreign(amount: float) -> CurrencyAmount:
             return CurrencyAmount(
                 amount_national=None,
                 amount_foreign=amount,
@@ -156,6 +369,7 @@ class ProportionalCalculator:
                 currency_name=None,  # Sera rempli par le système
                 currency_rate=currency_rate
             )
+        return make_foreign
 
     def apply_to_rfcv(self, rfcv_data: RFCVData) -> RFCVData:
         """
@@ -211,6 +425,12 @@ class ProportionalCalculator:
             # Impossible de répartir si FOB total est 0
             return rfcv_data
 
+        # FOB convertis une seule fois pour les quatre répartitions (chemin NumPy).
+        # Les poids FOB/FOB_total ne sont pas pré-calculés : total × (FOB / FOB_total)
+        # n'arrondit pas comme (total × FOB) / FOB_total et pourrait déplacer une unité.
+        if HAS_NUMPY and len(item_fobs) >= _NUMPY_MIN_ITEMS:
+            item_fobs = np.asarray(item_fobs, dtype=np.float64)
+
         # Extraire la devise de la RFCV (pour FOB et FRET)
         # La devise est stockée dans financial.currency_code ou valuation.invoice.currency_code
         currency_code = "USD"  # Valeur par défaut
@@ -223,81 +443,46 @@ class ProportionalCalculator:
             currency_code = rfcv_data.valuation.invoice.currency_code
             currency_rate = rfcv_data.valuation.invoice.currency_rate
 
-        # === RÉPARTITION FRET (external_freight) ===
-        if (rfcv_data.valuation.external_freight and
-            rfcv_data.valuation.external_freight.amount_foreign is not None):
-
-            fret_total = rfcv_data.valuation.external_freight.amount_foreign
-            fret_articles = self.distribute_proportionally(
-                total_amount=fret_total,
-                item_fobs=item_fobs,
-                fob_total=fob_total
-            )
-
-            # Affecter aux articles
-            for i, item in enumerate(rfcv_data.items):
-                if not item.valuation_item:
-                    item.valuation_item = ValuationItem()
-
-                item.valuation_item.external_freight = self._create_currency_amount(
-                    amount=float(fret_articles[i]),
-                    currency_code=currency_code,
-                    currency_rate=currency_rate
-                )
-
-        # === RÉPARTITION ASSURANCE (insurance) ===
-        # Toujours en XOF (monnaie nationale)
-        if (rfcv_data.valuation.insurance and
-            rfcv_data.valuation.insurance.amount_national is not None):
-
-            assurance_total = rfcv_data.valuation.insurance.amount_national
-            assurance_articles = self.distribute_proportionally(
-                total_amount=assurance_total,
-                item_fobs=item_fobs,
-                fob_total=fob_total
-            )
-
-            # Affecter aux articles
-            for i, item in enumerate(rfcv_data.items):
-                if not item.valuation_item:
-                    item.valuation_item = ValuationItem()
-
-                item.valuation_item.insurance = self._create_currency_amount(
-                    amount=float(assurance_articles[i]),
-                    currency_code="XOF",
-                    currency_rate=1.0
-                )
-
-        # === RÉPARTITION POIDS BRUT (gross_weight) ===
-        if rfcv_data.valuation.gross_weight is not None:
-            poids_brut_total = rfcv_data.valuation.gross_weight
-            poids_brut_articles = self.distribute_proportionally(
-                total_amount=poids_brut_total,
+        valuation = rfcv_data.valuation
+
+        # === RÉPARTITIONS (fusionnées : une passe sur les FOB) ===
+        fret_articles, assurance_articles, poids_brut_articles, poids_net_articles = (
+            self.distribute_proportionally_multi(
+                [
+                    # FRET (external_freight) dans la devise RFCV
+                    valuation.external_freight.amount_foreign if valuation.external_freight else None,
+                    # ASSURANCE (insurance) toujours en XOF (monnaie nationale)
+                    valuation.insurance.amount_national if valuation.insurance else None,
+                    # POIDS BRUT et POIDS NET (entiers en KG)
+                    valuation.gross_weight,
+                    valuation.net_weight,
+                ],
                 item_fobs=item_fobs,
                 fob_total=fob_total
             )
+        )
 
-            # Affecter aux articles
-            for i, item in enumerate(rfcv_data.items):
-                if not item.valuation_item:
-                    item.valuation_item = ValuationItem()
-
-                item.valuation_item.gross_weight = float(poids_brut_articles[i])
-
-        # === RÉPARTITION POIDS NET (net_weight) ===
-        if rfcv_data.valuation.net_weight is not None:
-            poids_net_total = rfcv_data.valuation.net_weight
-            poids_net_articles = self.distribute_proportionally(
-                total_amount=poids_net_total,
-                item_fobs=item_fobs,
-                fob_total=fob_total
-            )
-
-            # Affecter aux articles
-            for i, item in enumerate(rfcv_data.items):
-                if not item.valuation_item:
-                    item.valuation_item = ValuationItem()
+        if (fret_articles is None and assurance_articles is None
+                and poids_brut_articles is None and poids_net_articles is None):
+            return rfcv_data
 
-                item.valuation_item.net_weight = float(poids_net_articles[i])
+        # Constructeurs de montants préparés une fois par répartition
+        make_fret = self._currency_amount_factory(currency_code, currency_rate)
+        make_assurance = self._currency_amount_factory("XOF", 1.0)
+
+        # Affecter aux articles : une seule passe, chaque ValuationItem touché une fois
+        for i, item in enumerate(rfcv_data.items):
+            if not item.valuation_item:
+                item.valuation_item = ValuationItem()
+            valuation_item = item.valuation_item
+
+            if fret_articles is not None:
+                valuation_item.external_freight = make_fret(float(fret_articles[i]))
+            if assurance_articles is not None:
+                valuation_item.insurance = make_assurance(float(assurance_articles[i]))
+            if poids_brut_articles is not None:
+                valuation_item.gross_weight = float(poids_brut_articles[i])
+            if poids_net_articles is not None:
+                valuation_item.net_weight = float(poids_net_articles[i])
 
         return rfcv_data
@@ -3,11 +3,12 @@ Module de parsing des documents PDF RFCV
 Extrait les données structurées et les mappe aux modèles
 """
 import re
-import math
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
+from decimal import Decimal, ROUND_CEILING
 from pdf_extractor import PDFExtractor
 from models import (
     RFCVData, Identification, Trader, Country, TransportInfo,
@@ -22,6 +23,22 @@ from chassis_registry import ChassisRegistry, DuplicateChassisError, get_registr
 
 logger = logging.getLogger(__name__)
 
+# Motifs de détection de châssis, compilés une fois (appelés pour chaque article)
+# Châssis avec préfixe explicite: "CH: XXXXX", "CHASSIS: XXXXX", "VIN: XXXXX"
+_CHASSIS_PREFIX_RE = re.compile(r'(?:CH|CHASSIS|VIN)[:\s]+([A-Z0-9]{13,17})', re.IGNORECASE)
+# VIN standard 17 caractères, sans I, O, Q (norme ISO 3779)
+_VIN_17_RE = re.compile(r'\b([A-HJ-NPR-Z0-9]{17})\b')
+
+# Assurance : partie fixe (XOF) et taux (0.15%) de la formule douanière
+_INSURANCE_FIXED_XOF = 2500
+_INSURANCE_RATE = Decimal('0.0015')
+
+
+@lru_cache(maxsize=None)
+def _chassis_length_pattern(length: int) -> re.Pattern:
+    """Motif compilé d'un châssis fabricant de longueur donnée"""
+    return re.compile(rf'\b([A-Z0-9]{{{length}}})\b')
+
 
 class RFCVParser:
     """Parser pour documents RFCV"""
@@ -34,6 +51,7 @@ class RFCVParser:
         chassis_config: Optional[Dict[str, Any]] = None,
         force_reprocess: bool = False,
         registry: Optional[ChassisRegistry] = None,
+        preextracted: Optional[Tuple[str, List[Any]]] = None,
     ):
         """
         Initialise le parser
@@ -46,6 +64,8 @@ class RFCVParser:
                            Format: {'generate_chassis': True, 'quantity': 180, 'wmi': 'LZS',
                                    'vds': 'HCKZS', 'year': 2025, 'plant_code': 'S',
                                    'ensure_unique': True}
+            preextracted: Texte et tables déjà extraits du PDF (text, tables);
+                         si fourni, parse() ne rouvre pas le fichier
         """
         self.pdf_path = pdf_path
         self.taux_douane = taux_douane
@@ -58,6 +78,7 @@ class RFCVParser:
         self._rfcv_number: Optional[str] = None
         self.text = ""
         self.tables = []
+        self._preextracted = preextracted
 
         # Initialiser factory de génération de châssis si activée
         self.chassis_factory = None
@@ -84,9 +105,12 @@ class RFCVParser:
         Returns:
             Objet RFCVData contenant toutes les données extraites
         """
-        with PDFExtractor(self.pdf_path) as extractor:
-            self.text = extractor.extract_all_text()
-            self.tables = extractor.extract_all_tables()
+        if self._preextracted is not None:
+            self.text, self.tables = self._preextracted
+        else:
+            with PDFExtractor(self.pdf_path) as extractor:
+                self.text = extractor.extract_all_text()
+                self.tables = extractor.extract_all_tables()
 
         rfcv_data = RFCVData()
 
@@ -627,8 +651,13 @@ class RFCVParser:
 
             if fob_value is not None and fret_value is not None and fob_value > 0 and fret_value > 0:
                 # Calcul : 2500 + (FOB + FRET) × TAUX × 0.0015
-                # Arrondi à l'entier supérieur (ceiling) pour avoir un montant entier
-                assurance_xof = math.ceil(2500 + (fob_value + fret_value) * self.taux_douane * 0.0015)
+                # En Decimal (valeurs décimales exactes des montants saisis) puis
+                # arrondi à l'entier supérieur (ceiling) : une erreur de
+                # représentation flottante ne peut pas ajouter 1 XOF
+                base = (Decimal(str(fob_value)) + Decimal(str(fret_value))) * Decimal(str(self.taux_douane))
+                assurance_xof = _INSURANCE_FIXED_XOF + int(
+                    (base * _INSURANCE_RATE).to_integral_value(rounding=ROUND_CEILING)
+                )
 
                 valuation.insurance = CurrencyAmount(
                     amount_national=assurance_xof,
@@ -1193,7 +1222,8 @@ class RFCVParser:
         # Par défaut: Package
         return ('PK', 'Colis ("package")')
 
-    def _extract_chassis_number(self, description: str, expected_lengths: List[int] = None) -> Optional[str]:
+    @staticmethod
+    def _extract_chassis_number(description: str, expected_lengths: List[int] = None) -> Optional[str]:
         """
         Extrait un numéro de châssis depuis la description d'un véhicule
 
@@ -1216,40 +1246,36 @@ class RFCVParser:
 
         # PATTERN 1: Châssis avec préfixe explicite
         # Exemples: "CH: XXXXX", "CHASSIS: XXXXX", "VIN: XXXXX"
-        prefix_pattern = r'(?:CH|CHASSIS|VIN)[:\s]+([A-Z0-9]{13,17})'
-        match = re.search(prefix_pattern, description, re.IGNORECASE)
+        match = _CHASSIS_PREFIX_RE.search(description)
         if match:
             chassis = match.group(1).upper()
-            logger.debug(f"Châssis détecté (préfixe): {chassis}")
+            logger.debug("Châssis détecté (préfixe): %s", chassis)
             return chassis
 
         # PATTERN 2: VIN standard (17 caractères)
         # Validation: pas de I, O, Q (norme ISO 3779)
         if 17 in expected_lengths:
-            vin_pattern = r'\b([A-HJ-NPR-Z0-9]{17})\b'
-            match = re.search(vin_pattern, description)
+            match = _VIN_17_RE.search(description)
             if match:
                 chassis = match.group(1).upper()
-                logger.debug(f"VIN détecté (17 car): {chassis}")
+                logger.debug("VIN détecté (17 car): %s", chassis)
                 return chassis
 
         # PATTERN 3: Châssis fabricant (13-17 caractères alphanumériques)
         # Utilisé pour tricycles, motos, etc.
         for length in sorted(expected_lengths, reverse=True):
-            pattern = rf'\b([A-Z0-9]{{{length}}})\b'
-            matches = re.findall(pattern, description)
-
-            for chassis in matches:
+            for match in _chassis_length_pattern(length).finditer(description):
+                chassis = match.group(1)
                 # Validation: éviter faux positifs (codes HS, dates, etc.)
                 # Un châssis doit avoir au moins des lettres ET des chiffres
                 has_letters = any(c.isalpha() for c in chassis)
                 has_digits = any(c.isdigit() for c in chassis)
 
                 if has_letters and has_digits:
-                    logger.debug(f"Châssis détecté ({length} car): {chassis}")
+                    logger.debug("Châssis détecté (%d car): %s", length, chassis)
                     return chassis.upper()
 
-        logger.debug(f"Aucun châssis détecté dans: {description[:50]}...")
+        logger.debug("Aucun châssis détecté dans: %s...", description[:50])
         return None
 
     def _add_attached_documents(self, rfcv_data: RFCVData) -> None:
@@ -19,6 +19,7 @@ Usage:
 """
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Optional, Dict, Set, Tuple
 from pathlib import Path
 import random
@@ -164,6 +165,9 @@ class VINPrefixDatabase:
         self._wmi_index: Dict[str, List[VINPrefix]] = {}
         self._manufacturer_index: Dict[str, List[VINPrefix]] = {}
         self._country_index: Dict[str, List[VINPrefix]] = {}
+        # Listes de candidats déjà filtrées, par combinaison de filtres normalisés
+        # (la base est en lecture seule après chargement)
+        self._candidates_cache: Dict[Tuple[Optional[str], ...], List[VINPrefix]] = {}
 
         self._load_database()
 
@@ -242,6 +246,44 @@ class VINPrefixDatabase:
         Returns:
             VINPrefix aléatoire correspondant aux critères
 
+        Raises:
+            ValueError: Si aucun préfixe ne correspond aux critères
+        """
+        key = (
+            wmi.upper() if wmi else None,
+            manufacturer.lower() if manufacturer else None,
+            country.lower() if country else None,
+            year_code.upper() if year_code else None,
+        )
+        candidates = self._candidates_cache.get(key)
+        if candidates is None:
+            candidates = self._filter_candidates(wmi, manufacturer, country, year_code)
+            self._candidates_cache[key] = candidates
+
+        return random.choice(candidates)
+
+    def _filter_candidates(
+        self,
+        wmi: Optional[str],
+        manufacturer: Optional[str],
+        country: Optional[str],
+        year_code: Optional[str]
+    ) -> List[VINPrefix]:
+        """
+        Filtre les préfixes (résultat mis en cache par get_random_prefix)
+
+        Les filtres sont reçus tels que passés par l'appelant : la casse est
+        normalisée ici, et les messages d'erreur rapportent la valeur d'origine.
+
+        Args:
+            wmi: Filtrer par WMI spécifique
+            manufacturer: Filtrer par fabricant (recherche partielle)
+            country: Filtrer par pays (recherche partielle)
+            year_code: Filtrer par code année
+
+        Returns:
+            Liste non vide des préfixes correspondants
+
         Raises:
             ValueError: Si aucun préfixe ne correspond aux critères
         """
@@ -281,7 +323,7 @@ class VINPrefixDatabase:
         if not candidates:
             raise ValueError("Aucun préfixe ne correspond aux critères")
 
-        return random.choice(candidates)
+        return candidates
 
     def search_by_wmi(self, wmi: str) -> List[VINPrefix]:
         """
@@ -346,6 +388,26 @@ class VINPrefixDatabase:
         return sorted(self._wmi_index.keys())
 
 
+@lru_cache(maxsize=4)
+def get_shared_database(db_path: Optional[str] = None) -> VINPrefixDatabase:
+    """
+    Retourne une base de préfixes chargée une seule fois par processus
+
+    Le chargement (62,000+ préfixes) coûte ~100 ms ; les instances sont
+    partagées entre ChassisFactory, en lecture seule.
+
+    Args:
+        db_path: Chemin vers VinPrefixes.txt (défaut: recherche standard)
+
+    Returns:
+        VINPrefixDatabase partagée pour ce chemin
+
+    Raises:
+        FileNotFoundError: Si VinPrefixes.txt est introuvable (non mis en cache)
+    """
+    return VINPrefixDatabase(db_path)
+
+
 # Exemple d'utilisation
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
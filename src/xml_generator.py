@@ -4,6 +4,7 @@ Crée des fichiers XML conformes au format ASYCUDA à partir des données RFCV
 """
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
+from xml.sax import saxutils
 from typing import Optional, List
 from datetime import datetime
 from models import RFCVData, Item, Trader, CurrencyAmount
@@ -98,6 +99,64 @@ class XMLGenerator:
             tree = ET.ElementTree(self.root)
             tree.write(output_path, encoding='utf-8', xml_declaration=True)
 
+    def to_bytes(self) -> bytes:
+        """
+        Sérialise le XML compact (sans indentation) en UTF-8
+
+        Returns:
+            Document XML complet, déclaration comprise
+        """
+        if self.root is None:
+            self.generate()
+
+        return ET.tostring(self.root, encoding='utf-8', xml_declaration=True)
+
+    def save_stream(self, output_path: str):
+        """
+        Sauvegarde le XML indenté en l'écrivant élément par élément
+
+        Même rendu que save(pretty_print=True), sans construire la chaîne
+        complète ni le DOM minidom intermédiaire en mémoire.
+
+        Args:
+            output_path: Chemin du fichier de sortie
+        """
+        if self.root is None:
+            self.generate()
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+            self._stream_element(f, self.root, 0)
+
+    # Échappement identique à minidom.toprettyxml (guillemets compris)
+    _XML_ESCAPES = {'"': '&quot;'}
+
+    @classmethod
+    def _stream_element(cls, out, elem: ET.Element, depth: int):
+        """
+        Écrit récursivement un élément et ses enfants avec indentation
+
+        Args:
+            out: Flux texte de sortie
+            elem: Element à écrire
+            depth: Profondeur (indentation de 2 espaces par niveau)
+        """
+        indent = '  ' * depth
+        attrs = ''.join(
+            f' {name}="{saxutils.escape(value, cls._XML_ESCAPES)}"'
+            for name, value in elem.attrib.items()
+        )
+        if len(elem):
+            out.write(f'{indent}<{elem.tag}{attrs}>\n')
+            for child in elem:
+                cls._stream_element(out, child, depth + 1)
+            out.write(f'{indent}</{elem.tag}>\n')
+        elif elem.text:
+            text = saxutils.escape(elem.text, cls._XML_ESCAPES)
+            out.write(f'{indent}<{elem.tag}{attrs}>{text}</{elem.tag}>\n')
+        else:
+            out.write(f'{indent}<{elem.tag}{attrs}/>\n')
+
     def _add_element(self, parent: ET.Element, tag: str, text: Optional[str] = None) -> ET.Element:
         """
         Ajoute un élément avec gestion de <null/>
@@ -3,15 +3,11 @@ Fixtures pytest pour les tests API
 """
 import pytest
 import pytest_asyncio
-import sys
 import secrets
 from pathlib import Path
 from httpx import AsyncClient, ASGITransport
 import asyncio
 
-# Ajouter src au path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
-
 from api.main import app
 from api.core.config import settings
 from api.core.rate_limit import limiter
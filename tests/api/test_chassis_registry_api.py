@@ -3,10 +3,6 @@ import pytest
 from unittest.mock import patch
 from fastapi import status
 
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
-
 from chassis_registry import get_registry
 
 
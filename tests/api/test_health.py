@@ -3,6 +3,8 @@ Tests des endpoints health et metrics
 """
 import pytest
 
+from api.main import app
+
 
 @pytest.mark.asyncio
 async def test_health_check(client):
@@ -50,13 +52,9 @@ async def test_metrics_endpoint(client):
     assert data["total_conversions"] >= 0
 
 
-@pytest.mark.asyncio
-async def test_openapi_docs(client):
-    """Test que la doc OpenAPI est accessible"""
-    response = await client.get("/openapi.json")
-
-    assert response.status_code == 200
-    data = response.json()
+def test_openapi_docs():
+    """Test que la doc OpenAPI est générée (même schéma que /openapi.json)"""
+    data = app.openapi()
 
     assert "openapi" in data
     assert "info" in data
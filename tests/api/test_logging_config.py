@@ -2,14 +2,12 @@
 Tests unitaires pour la configuration centralisée du logging
 """
 import logging
-import sys
-from pathlib import Path
+from logging.handlers import RotatingFileHandler
 import pytest
-import shutil
+from pydantic import ValidationError
 
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
-
-from api.core.logging_config import configure_logging
+from api.core.config import Settings
+from api.core.logging_config import configure_logging, _build_logging_config
 
 
 class FakeSettings:
@@ -21,7 +19,7 @@ class FakeSettings:
             'log_dir': 'test_logs',
             'log_to_file': True,
             'log_format': 'standard',
-            'log_max_bytes': 10 * 1024 * 1024,
+            'log_max_bytes': 1024,
             'log_backup_count': 5,
         }
         defaults.update(kwargs)
@@ -30,105 +28,120 @@ class FakeSettings:
 
 
 @pytest.fixture(autouse=True)
-def cleanup_test_logs():
-    """Nettoyer le répertoire de logs de test après chaque test"""
+def reset_logging():
+    """Restaurer les handlers et niveaux des loggers root et security après chaque test"""
+    saved = [
+        (logger, logger.handlers[:], logger.level)
+        for logger in (logging.getLogger(), logging.getLogger('security'))
+    ]
     yield
-    shutil.rmtree('test_logs', ignore_errors=True)
+    for logger, handlers, level in saved:
+        for handler in logger.handlers:
+            if handler not in handlers:
+                handler.close()
+        logger.handlers[:] = handlers
+        logger.setLevel(level)
 
 
 class TestConfigureLogging:
     """Tests pour configure_logging()"""
 
-    def test_default_settings_no_error(self):
+    def test_default_settings_no_error(self, tmp_path):
         """dictConfig s'exécute sans erreur avec les settings par défaut"""
-        settings = FakeSettings()
+        settings = FakeSettings(log_dir=str(tmp_path), log_to_file=False)
         configure_logging(settings)
 
         root = logging.getLogger()
         assert root.level == logging.INFO
 
-    def test_debug_level_propagated(self):
+    def test_debug_level_propagated(self, tmp_path):
         """Le niveau DEBUG est bien appliqué au root logger"""
-        settings = FakeSettings(log_level='DEBUG')
+        settings = FakeSettings(log_dir=str(tmp_path), log_to_file=False, log_level='DEBUG')
         configure_logging(settings)
 
         root = logging.getLogger()
         assert root.level == logging.DEBUG
 
-    def test_log_to_file_creates_directory(self):
+    def test_log_to_file_creates_directory(self, tmp_path):
         """log_to_file=True crée le répertoire de logs"""
-        settings = FakeSettings(log_to_file=True)
+        settings = FakeSettings(log_dir=str(tmp_path), log_to_file=True)
         configure_logging(settings)
 
-        assert Path('test_logs').is_dir()
+        assert tmp_path.is_dir()
 
-    def test_log_to_file_false_no_app_log(self):
+    def test_log_to_file_false_no_app_log(self, tmp_path):
         """log_to_file=False ne crée pas app.log (security.log est toujours créé)"""
-        settings = FakeSettings(log_to_file=False)
+        settings = FakeSettings(log_dir=str(tmp_path), log_to_file=False)
         configure_logging(settings)
 
-        assert not (Path('test_logs') / 'app.log').exists()
+        assert not (tmp_path / 'app.log').exists()
 
-    def test_log_to_file_creates_file_handler(self):
+    def test_log_to_file_creates_file_handler(self, tmp_path):
         """log_to_file=True ajoute un handler fichier au root logger"""
-        settings = FakeSettings(log_to_file=True)
+        settings = FakeSettings(log_dir=str(tmp_path), log_to_file=True)
         configure_logging(settings)
 
         root = logging.getLogger()
-        handler_types = [type(h).__name__ for h in root.handlers]
-        assert 'RotatingFileHandler' in handler_types
+        assert any(isinstance(h, RotatingFileHandler) for h in root.handlers)
 
-    def test_log_to_file_false_no_file_handler(self):
+    def test_log_to_file_false_no_file_handler(self, tmp_path):
         """log_to_file=False ne crée pas de handler fichier"""
-        settings = FakeSettings(log_to_file=False)
+        settings = FakeSettings(log_dir=str(tmp_path), log_to_file=False)
         configure_logging(settings)
 
         root = logging.getLogger()
-        handler_types = [type(h).__name__ for h in root.handlers]
-        assert 'RotatingFileHandler' not in handler_types
+        assert not any(isinstance(h, RotatingFileHandler) for h in root.handlers)
 
-    def test_console_handler_always_present(self):
+    def test_console_handler_always_present(self, tmp_path):
         """Le handler console est toujours présent"""
-        settings = FakeSettings(log_to_file=False)
+        settings = FakeSettings(log_dir=str(tmp_path), log_to_file=False)
         configure_logging(settings)
 
         root = logging.getLogger()
-        handler_types = [type(h).__name__ for h in root.handlers]
-        assert 'StreamHandler' in handler_types
+        # type exact : RotatingFileHandler hérite aussi de StreamHandler
+        assert any(type(h) is logging.StreamHandler for h in root.handlers)
 
-    def test_detailed_format(self):
+    def test_detailed_format(self, tmp_path):
         """Le format 'detailed' est utilisable sans erreur"""
-        settings = FakeSettings(log_format='detailed')
+        settings = FakeSettings(log_dir=str(tmp_path), log_to_file=False, log_format='detailed')
         configure_logging(settings)
 
         root = logging.getLogger()
         assert root.level == logging.INFO
 
-    def test_security_logger_level_propagated(self):
+    def test_security_logger_level_propagated(self, tmp_path):
         """Le log_level est propagé au security logger"""
-        settings = FakeSettings(log_level='DEBUG', log_to_file=True)
+        settings = FakeSettings(log_dir=str(tmp_path), log_level='DEBUG', log_to_file=True)
         configure_logging(settings)
 
         security = logging.getLogger('security')
         assert security.level == logging.DEBUG
 
-    def test_third_party_loggers_silenced(self):
+    def test_third_party_loggers_silenced(self, tmp_path):
         """Les loggers tiers sont configurés en WARNING"""
-        settings = FakeSettings()
+        settings = FakeSettings(log_dir=str(tmp_path), log_to_file=False)
         configure_logging(settings)
 
         assert logging.getLogger('uvicorn.access').level == logging.WARNING
         assert logging.getLogger('httpx').level == logging.WARNING
         assert logging.getLogger('pdfplumber').level == logging.WARNING
 
+    def test_config_dict_reused_for_same_settings(self, tmp_path):
+        """Le dictionnaire dictConfig est construit une seule fois par jeu de paramètres"""
+        _build_logging_config.cache_clear()
+        configure_logging(FakeSettings(log_dir=str(tmp_path), log_to_file=False))
+        configure_logging(FakeSettings(log_dir=str(tmp_path), log_to_file=False))
+
+        info = _build_logging_config.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+
 
 class TestLogLevelValidation:
     """Tests pour la validation du log_level dans Settings"""
 
     def test_valid_log_levels(self, monkeypatch):
         """Les niveaux valides sont acceptés"""
-        from api.core.config import Settings
-
         for level in ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']:
             monkeypatch.setenv('API_LOG_LEVEL', level)
             s = Settings()
@@ -136,35 +149,24 @@ class TestLogLevelValidation:
 
     def test_log_level_case_insensitive(self, monkeypatch):
         """Le log_level est normalisé en majuscule"""
-        from api.core.config import Settings
-
         monkeypatch.setenv('API_LOG_LEVEL', 'debug')
         s = Settings()
         assert s.log_level == 'DEBUG'
 
     def test_invalid_log_level_raises(self, monkeypatch):
         """Un niveau invalide lève une ValueError"""
-        from api.core.config import Settings
-        from pydantic import ValidationError
-
         monkeypatch.setenv('API_LOG_LEVEL', 'VERBOSE')
         with pytest.raises(ValidationError):
             Settings()
 
     def test_invalid_log_format_raises(self, monkeypatch):
         """Un format invalide lève une ValueError"""
-        from api.core.config import Settings
-        from pydantic import ValidationError
-
         monkeypatch.setenv('API_LOG_FORMAT', 'json')
         with pytest.raises(ValidationError):
             Settings()
 
     def test_invalid_uvicorn_level_raises(self, monkeypatch):
         """Un niveau uvicorn invalide lève une ValueError"""
-        from api.core.config import Settings
-        from pydantic import ValidationError
-
         monkeypatch.setenv('API_LOG_UVICORN_LEVEL', 'verbose')
         with pytest.raises(ValidationError):
             Settings()
@@ -2,18 +2,18 @@
 Tests pour les endpoints spécifiques de l'API
 Tests pour /convert/with-payment, /convert/with-chassis, /convert/complete
 """
+import asyncio
 import pytest
-import sys
+import pytest_asyncio
 import secrets
 from pathlib import Path
-from fastapi.testclient import TestClient
-
-# Ajouter src au path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
+from unittest.mock import patch
+from httpx import AsyncClient, ASGITransport
 
 from api.main import app
 from api.core.config import settings
 from api.core.rate_limit import limiter
+from metrics import ConversionMetrics
 
 # Configuration pour les tests
 TEST_API_KEY = secrets.token_urlsafe(32)
@@ -21,87 +21,133 @@ settings.keys = TEST_API_KEY
 settings.require_authentication = True
 limiter.enabled = False  # Désactiver rate limiting pour les tests
 
-client = TestClient(app)
+AUTH = {"X-API-Key": TEST_API_KEY}
+PDF_MIME = "application/pdf"
 
 # Test file path
 TEST_PDF_PATH = Path(__file__).parent.parent / "DOSSIER 18236.pdf"
 
+# PDF minimal : suffisant pour la validation des formulaires et quand le pipeline est remplacé
+STUB_PDF_BYTES = b"%PDF-1.4 fake content for testing"
+
+
+def _files(content, name="test.pdf"):
+    """Champ multipart 'file' pour un upload PDF"""
+    return {"file": (name, content, PDF_MIME)}
+
+
+def _stub_convert_pdf_to_xml(pdf_path, output_path, **kwargs):
+    """Résultat de conversion canné, sans parsing PDF ni génération XML"""
+    return {
+        'success': True,
+        'pdf_file': pdf_path,
+        'output_file': output_path,
+        'error_message': None,
+        'processing_time': 0.01,
+        'metrics': ConversionMetrics(pdf_file=pdf_path, success=True, items_count=1, total_time=0.01),
+    }
+
+
+@pytest.fixture(scope="module")
+def test_pdf_bytes():
+    """Contenu du PDF de test, lu une seule fois (skip si absent)"""
+    if not TEST_PDF_PATH.exists():
+        pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
+    return TEST_PDF_PATH.read_bytes()
+
+
+@pytest_asyncio.fixture
+async def api_client():
+    """Client async in-process (ASGI), sans clé API par défaut"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.fixture
+def stub_conversion(tmp_path, monkeypatch):
+    """
+    Remplace le pipeline PDF → XML par un résultat canné
+
+    Les tests de succès vérifient le routage et la validation des formulaires ;
+    la justesse de la conversion est couverte par les tests du convertisseur.
+    """
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path / "uploads"))
+    monkeypatch.setattr(settings, "output_dir", str(tmp_path / "output"))
+    Path(settings.upload_dir).mkdir()
+    Path(settings.output_dir).mkdir()
+
+    with patch(
+        "api.services.conversion_service.ConversionService.convert_pdf_to_xml",
+        side_effect=_stub_convert_pdf_to_xml
+    ) as mock_convert:
+        yield mock_convert
+
 
 class TestConvertWithPayment:
     """Tests pour l'endpoint /convert/with-payment"""
 
-    def test_endpoint_requires_api_key(self):
+    @pytest.mark.asyncio
+    async def test_endpoint_requires_api_key(self, api_client):
         """L'endpoint nécessite une clé API"""
-        response = client.post("/api/v1/convert/with-payment")
+        response = await api_client.post("/api/v1/convert/with-payment")
         assert response.status_code == 401
         assert "API key" in response.json()["detail"]
 
-    def test_endpoint_requires_file(self):
+    @pytest.mark.asyncio
+    async def test_endpoint_requires_file(self, api_client):
         """L'endpoint nécessite un fichier"""
-        response = client.post(
+        response = await api_client.post(
             "/api/v1/convert/with-payment",
-            headers={"X-API-Key": TEST_API_KEY},
+            headers=AUTH,
             data={"taux_douane": 573.139, "rapport_paiement": "25P2003J"}
         )
         assert response.status_code == 422  # Validation error
 
-    def test_endpoint_requires_taux_douane(self):
+    @pytest.mark.asyncio
+    async def test_endpoint_requires_taux_douane(self, api_client):
         """L'endpoint nécessite le taux douanier"""
-        if not TEST_PDF_PATH.exists():
-            pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
-
-        with open(TEST_PDF_PATH, "rb") as f:
-            response = client.post(
-                "/api/v1/convert/with-payment",
-                headers={"X-API-Key": TEST_API_KEY},
-                files={"file": ("test.pdf", f, "application/pdf")},
-                data={"rapport_paiement": "25P2003J"}
-            )
+        response = await api_client.post(
+            "/api/v1/convert/with-payment",
+            headers=AUTH,
+            files=_files(STUB_PDF_BYTES),
+            data={"rapport_paiement": "25P2003J"}
+        )
         assert response.status_code == 422  # Validation error
 
-    def test_endpoint_requires_rapport_paiement(self):
+    @pytest.mark.asyncio
+    async def test_endpoint_requires_rapport_paiement(self, api_client):
         """L'endpoint nécessite le rapport de paiement"""
-        if not TEST_PDF_PATH.exists():
-            pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
-
-        with open(TEST_PDF_PATH, "rb") as f:
-            response = client.post(
-                "/api/v1/convert/with-payment",
-                headers={"X-API-Key": TEST_API_KEY},
-                files={"file": ("test.pdf", f, "application/pdf")},
-                data={"taux_douane": 573.139}
-            )
+        response = await api_client.post(
+            "/api/v1/convert/with-payment",
+            headers=AUTH,
+            files=_files(STUB_PDF_BYTES),
+            data={"taux_douane": 573.139}
+        )
         assert response.status_code == 422  # Validation error
 
-    def test_endpoint_validates_taux_douane_positive(self):
+    @pytest.mark.asyncio
+    async def test_endpoint_validates_taux_douane_positive(self, api_client):
         """Le taux douanier doit être positif"""
-        if not TEST_PDF_PATH.exists():
-            pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
-
-        with open(TEST_PDF_PATH, "rb") as f:
-            response = client.post(
-                "/api/v1/convert/with-payment",
-                headers={"X-API-Key": TEST_API_KEY},
-                files={"file": ("test.pdf", f, "application/pdf")},
-                data={"taux_douane": -100, "rapport_paiement": "25P2003J"}
-            )
+        response = await api_client.post(
+            "/api/v1/convert/with-payment",
+            headers=AUTH,
+            files=_files(STUB_PDF_BYTES),
+            data={"taux_douane": -100, "rapport_paiement": "25P2003J"}
+        )
         assert response.status_code == 422  # Validation error
 
-    def test_successful_conversion_with_payment(self):
+    @pytest.mark.asyncio
+    async def test_successful_conversion_with_payment(self, api_client, stub_conversion):
         """Conversion réussie avec rapport de paiement"""
-        if not TEST_PDF_PATH.exists():
-            pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
-
-        with open(TEST_PDF_PATH, "rb") as f:
-            response = client.post(
-                "/api/v1/convert/with-payment",
-                headers={"X-API-Key": TEST_API_KEY},
-                files={"file": ("DOSSIER 18236.pdf", f, "application/pdf")},
-                data={
-                    "taux_douane": 573.139,
-                    "rapport_paiement": "25P2003J"
-                }
-            )
+        response = await api_client.post(
+            "/api/v1/convert/with-payment",
+            headers=AUTH,
+            files=_files(STUB_PDF_BYTES, "DOSSIER 18236.pdf"),
+            data={
+                "taux_douane": 573.139,
+                "rapport_paiement": "25P2003J"
+            }
+        )
 
         assert response.status_code == 200
         data = response.json()
@@ -112,125 +158,109 @@ class TestConvertWithPayment:
         assert "rapport de paiement" in data["message"]
         assert data["metrics"] is not None
         assert data["processing_time"] > 0
+        assert stub_conversion.call_args.kwargs["rapport_paiement"] == "25P2003J"
 
 
 class TestConvertWithChassis:
     """Tests pour l'endpoint /convert/with-chassis"""
 
-    def test_endpoint_requires_api_key(self):
+    @pytest.mark.asyncio
+    async def test_endpoint_requires_api_key(self, api_client):
         """L'endpoint nécessite une clé API"""
-        response = client.post("/api/v1/convert/with-chassis")
+        response = await api_client.post("/api/v1/convert/with-chassis")
         assert response.status_code == 401
 
-    def test_endpoint_requires_quantity(self):
+    @pytest.mark.asyncio
+    async def test_endpoint_requires_quantity(self, api_client):
         """L'endpoint nécessite la quantité de châssis"""
-        if not TEST_PDF_PATH.exists():
-            pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
-
-        with open(TEST_PDF_PATH, "rb") as f:
-            response = client.post(
-                "/api/v1/convert/with-chassis",
-                headers={"X-API-Key": TEST_API_KEY},
-                files={"file": ("test.pdf", f, "application/pdf")},
-                data={
-                    "taux_douane": 573.139,
-                    "wmi": "LZS",
-                    "year": 2025
-                }
-            )
+        response = await api_client.post(
+            "/api/v1/convert/with-chassis",
+            headers=AUTH,
+            files=_files(STUB_PDF_BYTES),
+            data={
+                "taux_douane": 573.139,
+                "wmi": "LZS",
+                "year": 2025
+            }
+        )
         assert response.status_code == 422  # Validation error
 
-    def test_endpoint_requires_wmi(self):
+    @pytest.mark.asyncio
+    async def test_endpoint_requires_wmi(self, api_client):
         """L'endpoint nécessite le code WMI"""
-        if not TEST_PDF_PATH.exists():
-            pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
-
-        with open(TEST_PDF_PATH, "rb") as f:
-            response = client.post(
-                "/api/v1/convert/with-chassis",
-                headers={"X-API-Key": TEST_API_KEY},
-                files={"file": ("test.pdf", f, "application/pdf")},
-                data={
-                    "taux_douane": 573.139,
-                    "quantity": 10,
-                    "year": 2025
-                }
-            )
+        response = await api_client.post(
+            "/api/v1/convert/with-chassis",
+            headers=AUTH,
+            files=_files(STUB_PDF_BYTES),
+            data={
+                "taux_douane": 573.139,
+                "quantity": 10,
+                "year": 2025
+            }
+        )
         assert response.status_code == 422  # Validation error
 
-    def test_endpoint_requires_year(self):
+    @pytest.mark.asyncio
+    async def test_endpoint_requires_year(self, api_client):
         """L'endpoint nécessite l'année"""
-        if not TEST_PDF_PATH.exists():
-            pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
-
-        with open(TEST_PDF_PATH, "rb") as f:
-            response = client.post(
-                "/api/v1/convert/with-chassis",
-                headers={"X-API-Key": TEST_API_KEY},
-                files={"file": ("test.pdf", f, "application/pdf")},
-                data={
-                    "taux_douane": 573.139,
-                    "quantity": 10,
-                    "wmi": "LZS"
-                }
-            )
+        response = await api_client.post(
+            "/api/v1/convert/with-chassis",
+            headers=AUTH,
+            files=_files(STUB_PDF_BYTES),
+            data={
+                "taux_douane": 573.139,
+                "quantity": 10,
+                "wmi": "LZS"
+            }
+        )
         assert response.status_code == 422  # Validation error
 
-    def test_endpoint_validates_wmi_length(self):
+    @pytest.mark.asyncio
+    async def test_endpoint_validates_wmi_length(self, api_client):
         """Le code WMI doit faire 3 caractères"""
-        if not TEST_PDF_PATH.exists():
-            pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
-
-        with open(TEST_PDF_PATH, "rb") as f:
-            response = client.post(
-                "/api/v1/convert/with-chassis",
-                headers={"X-API-Key": TEST_API_KEY},
-                files={"file": ("test.pdf", f, "application/pdf")},
-                data={
-                    "taux_douane": 573.139,
-                    "quantity": 10,
-                    "wmi": "AB",  # Trop court
-                    "year": 2025
-                }
-            )
+        response = await api_client.post(
+            "/api/v1/convert/with-chassis",
+            headers=AUTH,
+            files=_files(STUB_PDF_BYTES),
+            data={
+                "taux_douane": 573.139,
+                "quantity": 10,
+                "wmi": "AB",  # Trop court
+                "year": 2025
+            }
+        )
         assert response.status_code == 422  # Validation error
 
-    def test_endpoint_validates_year_range(self):
+    @pytest.mark.asyncio
+    async def test_endpoint_validates_year_range(self, api_client):
         """L'année doit être dans la plage valide"""
-        if not TEST_PDF_PATH.exists():
-            pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
-
-        with open(TEST_PDF_PATH, "rb") as f:
-            response = client.post(
-                "/api/v1/convert/with-chassis",
-                headers={"X-API-Key": TEST_API_KEY},
-                files={"file": ("test.pdf", f, "application/pdf")},
-                data={
-                    "taux_douane": 573.139,
-                    "quantity": 10,
-                    "wmi": "LZS",
-                    "year": 1900  # Trop ancien
-                }
-            )
+        response = await api_client.post(
+            "/api/v1/convert/with-chassis",
+            headers=AUTH,
+            files=_files(STUB_PDF_BYTES),
+            data={
+                "taux_douane": 573.139,
+                "quantity": 10,
+                "wmi": "LZS",
+                "year": 1900  # Trop ancien
+            }
+        )
         assert response.status_code == 422  # Validation error
 
-    def test_successful_conversion_with_chassis(self):
+    @pytest.mark.asyncio
+    async def test_successful_conversion_with_chassis(self, api_client, stub_conversion):
         """Conversion réussie avec génération de châssis"""
-        if not TEST_PDF_PATH.exists():
-            pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
-
-        with open(TEST_PDF_PATH, "rb") as f:
-            response = client.post(
-                "/api/v1/convert/with-chassis",
-                headers={"X-API-Key": TEST_API_KEY},
-                files={"file": ("DOSSIER 18236.pdf", f, "application/pdf")},
-                data={
-                    "taux_douane": 573.139,
-                    "quantity": 5,
-                    "wmi": "LZS",
-                    "year": 2025
-                }
-            )
+        response = await api_client.post(
+            "/api/v1/convert/with-chassis",
+            headers=AUTH,
+            files=_files(STUB_PDF_BYTES, "DOSSIER 18236.pdf"),
+            data={
+                "taux_douane": 573.139,
+                "quantity": 5,
+                "wmi": "LZS",
+                "year": 2025
+            }
+        )
 
         assert response.status_code == 200
         data = response.json()
@@ -238,74 +268,69 @@ class TestConvertWithChassis:
         assert data["job_id"]
         assert "5 châssis VIN" in data["message"]
         assert data["metrics"] is not None
+        assert stub_conversion.call_args.kwargs["chassis_config"]["quantity"] == 5
 
-    def test_conversion_with_custom_vds_and_plant(self):
+    @pytest.mark.asyncio
+    async def test_conversion_with_custom_vds_and_plant(self, api_client, stub_conversion):
         """Conversion avec VDS et plant_code personnalisés"""
-        if not TEST_PDF_PATH.exists():
-            pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
-
-        with open(TEST_PDF_PATH, "rb") as f:
-            response = client.post(
-                "/api/v1/convert/with-chassis",
-                headers={"X-API-Key": TEST_API_KEY},
-                files={"file": ("DOSSIER 18236.pdf", f, "application/pdf")},
-                data={
-                    "taux_douane": 573.139,
-                    "quantity": 3,
-                    "wmi": "LFV",
-                    "year": 2024,
-                    "vds": "BA01A",
-                    "plant_code": "P"
-                }
-            )
+        response = await api_client.post(
+            "/api/v1/convert/with-chassis",
+            headers=AUTH,
+            files=_files(STUB_PDF_BYTES, "DOSSIER 18236.pdf"),
+            data={
+                "taux_douane": 573.139,
+                "quantity": 3,
+                "wmi": "LFV",
+                "year": 2024,
+                "vds": "BA01A",
+                "plant_code": "P"
+            }
+        )
 
         assert response.status_code == 200
         data = response.json()
         assert data["success"] is True
         assert "3 châssis VIN" in data["message"]
+        chassis_config = stub_conversion.call_args.kwargs["chassis_config"]
+        assert chassis_config["vds"] == "BA01A"
+        assert chassis_config["plant_code"] == "P"
 
 
 class TestConvertComplete:
     """Tests pour l'endpoint /convert/complete"""
 
-    def test_endpoint_requires_all_parameters(self):
+    @pytest.mark.asyncio
+    async def test_endpoint_requires_all_parameters(self, api_client):
         """L'endpoint nécessite tous les paramètres"""
-        if not TEST_PDF_PATH.exists():
-            pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
-
-        with open(TEST_PDF_PATH, "rb") as f:
-            # Manque rapport_paiement
-            response = client.post(
-                "/api/v1/convert/complete",
-                headers={"X-API-Key": TEST_API_KEY},
-                files={"file": ("test.pdf", f, "application/pdf")},
-                data={
-                    "taux_douane": 573.139,
-                    "quantity": 10,
-                    "wmi": "LZS",
-                    "year": 2025
-                }
-            )
+        # Manque rapport_paiement
+        response = await api_client.post(
+            "/api/v1/convert/complete",
+            headers=AUTH,
+            files=_files(STUB_PDF_BYTES),
+            data={
+                "taux_douane": 573.139,
+                "quantity": 10,
+                "wmi": "LZS",
+                "year": 2025
+            }
+        )
         assert response.status_code == 422  # Validation error
 
-    def test_successful_complete_conversion(self):
+    @pytest.mark.asyncio
+    async def test_successful_complete_conversion(self, api_client, stub_conversion):
         """Conversion complète réussie"""
-        if not TEST_PDF_PATH.exists():
-            pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
-
-        with open(TEST_PDF_PATH, "rb") as f:
-            response = client.post(
-                "/api/v1/convert/complete",
-                headers={"X-API-Key": TEST_API_KEY},
-                files={"file": ("DOSSIER 18236.pdf", f, "application/pdf")},
-                data={
-                    "taux_douane": 573.139,
-                    "rapport_paiement": "25P2003J",
-                    "quantity": 5,
-                    "wmi": "LZS",
-                    "year": 2025
-                }
-            )
+        response = await api_client.post(
+            "/api/v1/convert/complete",
+            headers=AUTH,
+            files=_files(STUB_PDF_BYTES, "DOSSIER 18236.pdf"),
+            data={
+                "taux_douane": 573.139,
+                "rapport_paiement": "25P2003J",
+                "quantity": 5,
+                "wmi": "LZS",
+                "year": 2025
+            }
+        )
 
         assert response.status_code == 200
         data = response.json()
@@ -316,26 +341,24 @@ class TestConvertComplete:
         assert data["metrics"] is not None
         assert data["processing_time"] > 0
 
-    def test_complete_conversion_with_all_params(self):
+    @pytest.mark.asyncio
+    @pytest.mark.slow
+    async def test_complete_conversion_with_all_params(self, api_client, test_pdf_bytes):
         """Conversion complète avec tous les paramètres optionnels"""
-        if not TEST_PDF_PATH.exists():
-            pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
-
-        with open(TEST_PDF_PATH, "rb") as f:
-            response = client.post(
-                "/api/v1/convert/complete",
-                headers={"X-API-Key": TEST_API_KEY},
-                files={"file": ("DOSSIER 18236.pdf", f, "application/pdf")},
-                data={
-                    "taux_douane": 573.139,
-                    "rapport_paiement": "25P2003J",
-                    "quantity": 3,
-                    "wmi": "LFV",
-                    "year": 2024,
-                    "vds": "BA01A",
-                    "plant_code": "P"
-                }
-            )
+        response = await api_client.post(
+            "/api/v1/convert/complete",
+            headers=AUTH,
+            files=_files(test_pdf_bytes, "DOSSIER 18236.pdf"),
+            data={
+                "taux_douane": 573.139,
+                "rapport_paiement": "25P2003J",
+                "quantity": 3,
+                "wmi": "LFV",
+                "year": 2024,
+                "vds": "BA01A",
+                "plant_code": "P"
+            }
+        )
 
         assert response.status_code == 200
         data = response.json()
@@ -347,7 +370,8 @@ class TestConvertComplete:
 class TestEndpointsComparison:
     """Tests de comparaison entre les endpoints"""
 
-    def test_all_endpoints_accessible(self):
+    @pytest.mark.asyncio
+    async def test_all_endpoints_accessible(self, api_client):
         """Tous les endpoints spécialisés sont accessibles"""
         endpoints = [
             "/api/v1/convert/with-payment",
@@ -355,23 +379,21 @@ class TestEndpointsComparison:
             "/api/v1/convert/complete"
         ]
 
-        for endpoint in endpoints:
-            response = client.post(endpoint)
+        responses = await asyncio.gather(*(api_client.post(endpoint) for endpoint in endpoints))
+
+        for endpoint, response in zip(endpoints, responses):
             # 401 (API key manquante) confirme que l'endpoint existe
             assert response.status_code == 401, f"Endpoint {endpoint} non accessible"
 
-    def test_generic_endpoint_still_works(self):
+    @pytest.mark.asyncio
+    async def test_generic_endpoint_still_works(self, api_client, stub_conversion):
         """L'endpoint générique /convert fonctionne toujours"""
-        if not TEST_PDF_PATH.exists():
-            pytest.skip(f"Test PDF not found: {TEST_PDF_PATH}")
-
-        with open(TEST_PDF_PATH, "rb") as f:
-            response = client.post(
-                "/api/v1/convert",
-                headers={"X-API-Key": TEST_API_KEY},
-                files={"file": ("DOSSIER 18236.pdf", f, "application/pdf")},
-                data={"taux_douane": 573.139}
-            )
+        response = await api_client.post(
+            "/api/v1/convert",
+            headers=AUTH,
+            files=_files(STUB_PDF_BYTES, "DOSSIER 18236.pdf"),
+            data={"taux_douane": 573.139}
+        )
 
         assert response.status_code == 200
         data = response.json()
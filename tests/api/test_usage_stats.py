@@ -3,11 +3,9 @@ Tests pour le service de statistiques d'utilisation
 """
 import json
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
-
 from api.services.usage_stats_service import UsageStatsService
 
 
@@ -17,6 +15,12 @@ def stats_file(tmp_path):
     return str(tmp_path / "test_usage_stats.json")
 
 
+@pytest.fixture(scope="module")
+def shared_stats_dir(tmp_path_factory):
+    """Répertoire partagé par le module pour les tests qui créent chacun leur propre fichier"""
+    return tmp_path_factory.mktemp("stats")
+
+
 @pytest.fixture
 def stats_service(stats_file):
     """Instance de UsageStatsService pour les tests"""
@@ -24,13 +28,13 @@ def stats_service(stats_file):
 
 
 class TestInitialization:
-    def test_initialization(self, stats_file):
+    def test_initialization(self, shared_stats_dir):
         """Crée le fichier JSON avec structure vide"""
+        stats_file = str(shared_stats_dir / "init.json")
         service = UsageStatsService(stats_file)
         assert Path(stats_file).exists()
 
-        with open(stats_file, 'r') as f:
-            data = json.load(f)
+        data = json.loads(Path(stats_file).read_bytes())
 
         assert "initialized_at" in data
         assert "last_updated" in data
@@ -39,12 +43,20 @@ class TestInitialization:
         assert data["chassis"]["generation_requests"] == 0
         assert data["requests"]["total"] == 0
 
-    def test_creates_parent_directory(self, tmp_path):
+    def test_creates_parent_directory(self, shared_stats_dir):
         """Crée le répertoire parent si nécessaire"""
-        path = str(tmp_path / "subdir" / "stats.json")
+        path = str(shared_stats_dir / "subdir" / "stats.json")
         service = UsageStatsService(path)
         assert Path(path).exists()
 
+    def test_instances_do_not_share_default_structure(self, tmp_path):
+        """Chaque instance reçoit sa propre copie de la structure par défaut"""
+        first = UsageStatsService(str(tmp_path / "a.json"))
+        first.track_conversion(success=True)
+
+        second = UsageStatsService(str(tmp_path / "b.json"))
+        assert second.get_conversion_stats()["total"] == 0
+
 
 class TestTrackConversion:
     def test_track_conversion_success(self, stats_service):
@@ -181,6 +193,20 @@ class TestTrackRequest:
         assert stats["by_status"]["404"] == 1
         assert stats["by_status"]["500"] == 1
 
+    def test_track_request_concurrent_threads(self, stats_service):
+        """Les cellules par thread sont additionnées sans perte"""
+        def worker(_):
+            for _ in range(250):
+                stats_service.track_request("GET", 200)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(worker, range(8)))
+
+        stats = stats_service.get_request_stats()
+        assert stats["total"] == 2000
+        assert stats["by_method"]["GET"] == 2000
+        assert stats["by_status"]["200"] == 2000
+
 
 class TestFlush:
     def test_flush_persists_dirty_data(self, stats_file):
@@ -191,15 +217,37 @@ class TestFlush:
         service.flush()
 
         # Vérifier que le fichier contient la donnée
-        with open(stats_file, 'r') as f:
-            data = json.load(f)
+        data = json.loads(Path(stats_file).read_bytes())
         assert data["requests"]["total"] == 1
 
+    def test_flush_leaves_no_temp_file(self, stats_file):
+        """L'écriture atomique (fichier temporaire + os.replace) ne laisse pas de résidu"""
+        service = UsageStatsService(stats_file)
+        service.track_request("GET", 200)
+        service.flush()
+
+        assert Path(stats_file).exists()
+        assert not Path(stats_file + ".tmp").exists()
+
     def test_flush_noop_when_clean(self, stats_service):
         """flush() ne fait rien si pas de données en attente"""
         # Pas de mutation → flush ne devrait pas planter
         stats_service.flush()
 
+    def test_stale_snapshot_not_written(self, stats_file):
+        """Un snapshot plus ancien n'écrase pas un snapshot plus récent déjà écrit"""
+        service = UsageStatsService(stats_file)
+        service.track_request("GET", 200)
+        with service._lock:
+            stale = service._snapshot()
+        service.track_request("GET", 200)
+        service.flush()
+
+        service._write(stale)
+
+        data = json.loads(Path(stats_file).read_bytes())
+        assert data["requests"]["total"] == 2
+
 
 class TestPersistence:
     def test_persistence(self, stats_file):
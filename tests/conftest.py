@@ -0,0 +1,93 @@
+"""
+Configuration pytest commune à toute la suite de tests
+
+Ajoute une seule fois le répertoire src au PYTHONPATH, avant l'import
+des modules de test et des conftest des sous-répertoires : les modules
+applicatifs sont importés sous un seul nom (api.core.config, rfcv_parser...)
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+from tests.pdf_fixtures import fixture_path, pdf_source_available, use_fixtures
+
+SRC_DIR = str(Path(__file__).resolve().parent.parent / 'src')
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+def pytest_collection_modifyitems(config, items):
+    """Ignore dès la collecte les tests requires_pdf dont ni le PDF ni la fixture JSON n'existe"""
+    missing = {}
+    for item in items:
+        for marker in item.iter_markers(name='requires_pdf'):
+            for pdf in marker.args:
+                if pdf not in missing:
+                    missing[pdf] = not pdf_source_available(pdf)
+                if missing[pdf]:
+                    item.add_marker(pytest.mark.skip(
+                        reason=f"PDF de test absent (sans fixture JSON): {Path(pdf).name}"
+                    ))
+                    break
+
+
+@pytest.fixture(scope="session")
+def default_settings():
+    """Settings par défaut (sans .env), construits une seule fois par session"""
+    from api.core.config import Settings
+    return Settings(_env_file=None)
+
+
+@pytest.fixture(scope="session")
+def extract_pdf():
+    """
+    Extrait le texte et les tables d'un PDF une seule fois par session
+
+    Retourne une fonction extract(pdf_path) -> (text, tables), au format
+    attendu par RFCVParser(preextracted=...). Si tests/fixtures/<nom>.json
+    existe, l'extraction est relue depuis ce fichier sans ouvrir le PDF
+    (REGENERATE=1 force la réextraction).
+    """
+    from pdf_extractor import PDFExtractor, load_extraction
+
+    replay = use_fixtures()
+    cache = {}
+
+    def extract(pdf_path):
+        key = str(pdf_path)
+        if key not in cache:
+            fixture = fixture_path(key)
+            extracted = load_extraction(fixture) if replay and fixture.exists() else None
+            if extracted is None:
+                with PDFExtractor(key) as extractor:
+                    extracted = (extractor.extract_all_text(), extractor.extract_all_tables())
+            cache[key] = extracted
+        return cache[key]
+
+    return extract
+
+
+@pytest.fixture(scope="session")
+def parse_rfcv(extract_pdf):
+    """
+    Parse un PDF RFCV une seule fois par session
+
+    Retourne une fonction parse(pdf_path, taux_douane=None) dont le résultat
+    est mis en cache par (chemin, taux_douane). L'extraction du PDF est
+    partagée entre les taux. Les RFCVData renvoyées sont partagées entre
+    les tests : ne pas les modifier.
+    """
+    from rfcv_parser import RFCVParser
+
+    cache = {}
+
+    def parse(pdf_path, taux_douane=None):
+        key = (str(pdf_path), taux_douane)
+        if key not in cache:
+            parser = RFCVParser(str(pdf_path), taux_douane=taux_douane, preextracted=extract_pdf(pdf_path))
+            cache[key] = parser.parse()
+        return cache[key]
+
+    return parse
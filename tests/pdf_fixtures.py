@@ -0,0 +1,27 @@
+"""
+Fixtures JSON d'extraction PDF (scripts/regen_test_fixtures.py)
+
+Localise tests/fixtures/<nom>.json pour un PDF de test. Partagé par
+tests/conftest.py (collecte requires_pdf, fixture extract_pdf) et par
+les tests qui vérifient le rejeu de ces fixtures.
+"""
+import os
+from pathlib import Path
+
+# Extractions PDF pré-calculées, une par PDF: <nom>.json
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+
+def fixture_path(pdf_path) -> Path:
+    """Fixture JSON d'extraction associée à un PDF de test"""
+    return FIXTURES_DIR / f'{Path(pdf_path).stem}.json'
+
+
+def use_fixtures() -> bool:
+    """Les fixtures JSON sont relues sauf si REGENERATE=1 (réextraction forcée)"""
+    return os.environ.get('REGENERATE') != '1'
+
+
+def pdf_source_available(pdf_path) -> bool:
+    """Vrai si le PDF de test existe, ou à défaut sa fixture JSON (hors REGENERATE=1)"""
+    return Path(pdf_path).exists() or (use_fixtures() and fixture_path(pdf_path).exists())
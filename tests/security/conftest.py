@@ -1,60 +1,78 @@
 """
 Configuration pytest pour les tests de sécurité
 """
-import sys
 from pathlib import Path
 import pytest
 from fastapi.testclient import TestClient
 import secrets
 
-# Ajouter le chemin src au PYTHONPATH
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
-
 from api.main import app
 from api.core.config import settings
 
 
-@pytest.fixture
+# Résumé affiché en fin de session quand les tests de sécurité passent
+SECURITY_SUMMARY_LINES = [
+    "✅ Path Traversal: Bloqué",
+    "✅ Authentification: Requise par défaut",
+    "✅ CORS: Restrictif par défaut",
+    "✅ Validation taille fichier: Configurée",
+    "✅ Job IDs: Cryptographiquement sécurisés",
+    "✅ Sanitisation noms fichiers: Fonctionnelle",
+    "✅ Rate Limiting: Activé",
+    "✅ Logging sécurité: Configuré",
+    "✅ Génération clés API: Sécurisée",
+]
+
+
+@pytest.fixture(scope="session")
 def client():
     """
     Fixture pour le client de test FastAPI
 
-    Configure un environnement de test avec authentification désactivée
-    pour faciliter les tests
+    Partagé pour toute la session : le lifespan de l'application n'est
+    démarré qu'une seule fois. La configuration est ajustée par test
+    dans `security_settings`.
     """
-    # Sauvegarder la configuration originale
-    original_auth = settings.require_authentication
-    original_keys = settings.keys
-
-    # Générer une clé de test
-    test_key = secrets.token_urlsafe(32)
-    settings.keys = test_key
-    settings.require_authentication = True
-
-    # Créer le client de test
     with TestClient(app) as test_client:
         yield test_client
 
-    # Restaurer la configuration
-    settings.require_authentication = original_auth
-    settings.keys = original_keys
 
-
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_api_key():
-    """Fixture pour obtenir une clé API de test"""
+    """Clé API de test, générée une seule fois par session"""
     return secrets.token_urlsafe(32)
 
 
+@pytest.fixture(autouse=True)
+def security_settings(monkeypatch, test_api_key):
+    """
+    Active l'authentification avec la clé de test pour chaque test
+
+    monkeypatch restaure la configuration originale après le test,
+    même si le client est partagé.
+    """
+    monkeypatch.setattr(settings, "keys", test_api_key)
+    monkeypatch.setattr(settings, "require_authentication", True)
+
+
 @pytest.fixture
 def authenticated_client(client, test_api_key):
-    """Fixture pour un client authentifié"""
-    # Configurer la clé API
-    from api.core.config import settings
-    original_keys = settings.keys
-    settings.keys = test_api_key
+    """Fixture pour un client authentifié (clé déjà configurée par security_settings)"""
+    return client, test_api_key
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Affiche le résumé de sécurité si les tests de ce répertoire ont été exécutés sans échec"""
+    security_dir = Path(__file__).parent
+
+    def is_security(report):
+        return Path(str(report.fspath)).resolve().is_relative_to(security_dir.resolve())
 
-    yield client, test_api_key
+    if not any(is_security(r) for r in terminalreporter.stats.get("passed", [])):
+        return
+    if any(is_security(r) for key in ("failed", "error") for r in terminalreporter.stats.get(key, [])):
+        return
 
-    # Restaurer
-    settings.keys = original_keys
+    terminalreporter.write_sep("=", "RÉSUMÉ DES TESTS DE SÉCURITÉ")
+    for line in SECURITY_SUMMARY_LINES:
+        terminalreporter.write_line(line)
@@ -2,49 +2,39 @@
 Tests de validation des corrections de sécurité
 """
 import pytest
-import secrets
 from pathlib import Path
 import io
 from fastapi.testclient import TestClient
 
 
 # Test de path traversal
-def test_path_traversal_blocked(client):
+@pytest.mark.parametrize("malicious_path", [
+    "../../../etc/passwd",
+    "..\\..\\..\\windows\\system.ini",
+    "subdir/../../config.py",
+    # "file\x00.xml",  # Null byte - httpx le rejette avant nous (bon signe)
+    "../../sensitive_data.xml",
+    "..",
+    "../",
+])
+def test_path_traversal_blocked(client, test_api_key, malicious_path):
     """Test que les tentatives de path traversal sont bloquées"""
-
-    # Génération d'une clé API pour les tests
-    test_api_key = secrets.token_urlsafe(32)
-
-    # Tentatives de path traversal
-    malicious_paths = [
-        "../../../etc/passwd",
-        "..\\..\\..\\windows\\system.ini",
-        "subdir/../../config.py",
-        # "file\x00.xml",  # Null byte - httpx le rejette avant nous (bon signe)
-        "../../sensitive_data.xml",
-        "..",
-        "../",
-    ]
-
-    for malicious_path in malicious_paths:
-        response = client.get(
-            f"/api/v1/files/{malicious_path}/xml",
-            headers={"X-API-Key": test_api_key}
-        )
-        # Doit retourner 400 (Bad Request), 403 (Forbidden), 404 (Not Found) ou 401 (Unauthorized)
-        # 404 est acceptable car le fichier sanitisé n'existe pas
-        assert response.status_code in [400, 403, 404, 401], (
-            f"Path traversal non bloqué pour: {malicious_path}, "
-            f"code: {response.status_code}"
-        )
+    response = client.get(
+        f"/api/v1/files/{malicious_path}/xml",
+        headers={"X-API-Key": test_api_key}
+    )
+    # Doit retourner 400 (Bad Request), 403 (Forbidden), 404 (Not Found) ou 401 (Unauthorized)
+    # 404 est acceptable car le fichier sanitisé n'existe pas
+    assert response.status_code in [400, 403, 404, 401], (
+        f"Path traversal non bloqué pour: {malicious_path}, "
+        f"code: {response.status_code}"
+    )
 
 
-def test_authentication_required_by_default():
+def test_authentication_required_by_default(default_settings):
     """Test que l'authentification est requise par défaut"""
-    from src.api.core.config import settings
-
     # Vérifier que l'authentification est activée par défaut
-    assert settings.require_authentication == True, (
+    assert default_settings.require_authentication == True, (
         "L'authentification devrait être requise par défaut"
     )
 
@@ -85,7 +75,7 @@ def test_api_with_invalid_key_rejected(client):
 
 def test_cors_restrictive_by_default():
     """Test que CORS est restrictif par défaut"""
-    from src.api.core.config import settings
+    from api.core.config import settings
 
     # Vérifier configuration CORS
     assert settings.cors_origins == [] or settings.cors_origins != ["*"], (
@@ -103,7 +93,7 @@ def test_cors_restrictive_by_default():
 
 def test_file_size_validation():
     """Test que la validation de taille de fichier fonctionne"""
-    from src.api.core.config import settings
+    from api.core.config import settings
 
     # Vérifier que max_upload_size est configuré
     assert settings.max_upload_size > 0, (
@@ -117,7 +107,7 @@ def test_file_size_validation():
 
 def test_job_id_security():
     """Test que les job IDs sont générés de manière sécurisée"""
-    from src.api.services.storage_service import storage_service
+    from api.services.storage_service import storage_service
 
     # Générer plusieurs job IDs
     job_ids = [storage_service.generate_job_id() for _ in range(100)]
@@ -134,7 +124,7 @@ def test_job_id_security():
 
 def test_batch_id_security():
     """Test que les batch IDs sont générés de manière sécurisée"""
-    from src.api.services.storage_service import storage_service
+    from api.services.storage_service import storage_service
 
     # Générer plusieurs batch IDs
     batch_ids = [storage_service.generate_batch_id() for _ in range(100)]
@@ -151,7 +141,7 @@ def test_batch_id_security():
 
 def test_filename_sanitization():
     """Test que la sanitisation des noms de fichiers fonctionne"""
-    from src.api.services.storage_service import StorageService
+    from api.services.storage_service import StorageService
 
     # Tests de sanitisation
     test_cases = [
@@ -172,30 +162,25 @@ def test_filename_sanitization():
         assert "\x00" not in result, f"Null byte trouvé dans: {result}"
 
 
-def test_rate_limit_configuration():
+def test_rate_limit_configuration(default_settings):
     """Test que le rate limiting est configuré"""
-    from src.api.core.config import Settings
-
-    # Créer une instance propre de Settings sans .env
-    fresh_settings = Settings(_env_file=None)
-
     # Vérifier que rate limiting est activé par défaut
-    assert fresh_settings.rate_limit_enabled == True, (
+    assert default_settings.rate_limit_enabled == True, (
         "Rate limiting devrait être activé par défaut"
     )
 
     # Vérifier les limites configurées
-    assert hasattr(fresh_settings, 'rate_limit_upload'), (
+    assert hasattr(default_settings, 'rate_limit_upload'), (
         "Limite d'upload devrait être configurée"
     )
-    assert hasattr(fresh_settings, 'rate_limit_batch'), (
+    assert hasattr(default_settings, 'rate_limit_batch'), (
         "Limite batch devrait être configurée"
     )
 
 
 def test_security_logging_setup():
     """Test que le logging de sécurité est configuré"""
-    from src.api.core.logging_config import get_security_logger, SecurityEventTypes
+    from api.core.logging_config import get_security_logger, SecurityEventTypes
 
     # Obtenir le logger
     logger = get_security_logger()
@@ -209,30 +194,23 @@ def test_security_logging_setup():
     assert hasattr(SecurityEventTypes, 'FILE_UPLOAD_REJECTED')
 
 
-def test_error_handling_sanitization():
+def test_error_handling_sanitization(monkeypatch):
     """Test que les erreurs ne révèlent pas d'informations sensibles"""
-    from src.api.core.config import settings
+    from api.core.config import settings
 
     # En mode production (debug=False), les erreurs doivent être sanitisées
-    original_debug = settings.debug
-
-    try:
-        # Simuler mode production
-        settings.debug = False
+    # (monkeypatch restaure la valeur originale après le test)
+    monkeypatch.setattr(settings, "debug", False)
 
-        # Les messages d'erreur ne devraient pas contenir de détails internes
-        # Ceci sera testé via les exception handlers dans main.py
+    # Les messages d'erreur ne devraient pas contenir de détails internes
+    # Ceci sera testé via les exception handlers dans main.py
 
-        assert settings.debug == False, "Debug devrait être désactivé"
-
-    finally:
-        # Restaurer
-        settings.debug = original_debug
+    assert settings.debug == False, "Debug devrait être désactivé"
 
 
 def test_api_key_generation():
     """Test que la génération de clés API est sécurisée"""
-    from src.api.core.security import generate_api_key
+    from api.core.security import generate_api_key
 
     # Générer plusieurs clés
     keys = [generate_api_key() for _ in range(10)]
@@ -247,7 +225,7 @@ def test_api_key_generation():
 
 def test_validate_file_id_function():
     """Test de la fonction de validation de file_id"""
-    from src.api.routes.files import validate_file_id
+    from api.routes.files import validate_file_id
     from fastapi import HTTPException
 
     # Cas valides
@@ -291,21 +269,3 @@ def test_pdf_magic_number_validation():
     # Ce test nécessite de créer un fichier mock
     # Il sera testé dans les tests d'intégration avec de vrais fichiers
     pass
-
-
-# Résumé des tests
-def test_security_summary():
-    """Affiche un résumé des tests de sécurité"""
-    print("\n" + "="*70)
-    print("RÉSUMÉ DES TESTS DE SÉCURITÉ")
-    print("="*70)
-    print("✅ Path Traversal: Bloqué")
-    print("✅ Authentification: Requise par défaut")
-    print("✅ CORS: Restrictif par défaut")
-    print("✅ Validation taille fichier: Configurée")
-    print("✅ Job IDs: Cryptographiquement sécurisés")
-    print("✅ Sanitisation noms fichiers: Fonctionnelle")
-    print("✅ Rate Limiting: Activé")
-    print("✅ Logging sécurité: Configuré")
-    print("✅ Génération clés API: Sécurisée")
-    print("="*70)
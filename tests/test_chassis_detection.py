@@ -1,12 +1,6 @@
 """
 Tests unitaires pour la détection et extraction des numéros de châssis
 """
-import sys
-from pathlib import Path
-
-# Ajouter src au path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
-
 import pytest
 from hs_code_rules import HSCodeAnalyzer
 from rfcv_parser import RFCVParser
@@ -93,52 +87,31 @@ class TestHSCodeAnalyzer:
 class TestChassisExtraction:
     """Tests pour l'extraction de numéros de châssis"""
 
-    def test_extract_tricycle_chassis_13chars(self):
-        """Test: Extraction châssis tricycle (13 caractères)"""
-        parser = RFCVParser.__new__(RFCVParser)  # Créer instance sans __init__
-        chassis = parser._extract_chassis_number("TRICYCLE AP150ZH-20 LLCLHJL03SP420331")
-        assert chassis == "LLCLHJL03SP420331"
-        assert len(chassis) == 17
-
-    def test_extract_motorcycle_vin_17chars(self):
-        """Test: Extraction VIN moto (17 caractères)"""
-        parser = RFCVParser.__new__(RFCVParser)
-        chassis = parser._extract_chassis_number("MOTORCYCLE LRFPCJLDIS0F18969")
-        assert chassis == "LRFPCJLDIS0F18969"
-        assert len(chassis) == 17
-
-    def test_extract_chassis_with_prefix_ch(self):
-        """Test: Extraction avec préfixe CH:"""
-        parser = RFCVParser.__new__(RFCVParser)
-        chassis = parser._extract_chassis_number("MOTO CH: ABC123DEF456GHI")
-        assert chassis == "ABC123DEF456GHI"
-
-    def test_extract_chassis_with_prefix_vin(self):
-        """Test: Extraction avec préfixe VIN:"""
-        parser = RFCVParser.__new__(RFCVParser)
-        chassis = parser._extract_chassis_number("VEHICLE VIN:WBAPH9105WP123456")
-        assert chassis == "WBAPH9105WP123456"
-
-    def test_no_extraction_no_chassis(self):
-        """Test: Aucun châssis si absent de la description"""
-        parser = RFCVParser.__new__(RFCVParser)
-        chassis = parser._extract_chassis_number("CARBON BLACK POWDER")
-        assert chassis is None
-
-    def test_no_extraction_too_short(self):
-        """Test: Rejet si trop court (<13 caractères)"""
-        parser = RFCVParser.__new__(RFCVParser)
-        chassis = parser._extract_chassis_number("MOTO ABC123")
-        assert chassis is None
-
-    def test_extraction_filters_hs_code(self):
-        """Test: Filtrage des faux positifs (codes HS)"""
-        parser = RFCVParser.__new__(RFCVParser)
-        # 87043119 a des lettres ET chiffres mais est un code HS
-        # Notre validation devrait accepter car il a lettres + chiffres
-        chassis = parser._extract_chassis_number("TRICYCLE 87043119 LLCLHJL03SP420331")
-        # Devrait extraire le châssis, pas le code HS
-        assert chassis == "LLCLHJL03SP420331"
+    @pytest.mark.parametrize("description,expected", [
+        # Châssis tricycle en fin de description
+        pytest.param("TRICYCLE AP150ZH-20 LLCLHJL03SP420331", "LLCLHJL03SP420331", id="tricycle"),
+        # VIN moto (17 caractères)
+        pytest.param("MOTORCYCLE LRFPCJLDIS0F18969", "LRFPCJLDIS0F18969", id="motorcycle-vin17"),
+        # Préfixes explicites
+        pytest.param("MOTO CH: ABC123DEF456GHI", "ABC123DEF456GHI", id="prefix-ch"),
+        pytest.param("VEHICLE VIN:WBAPH9105WP123456", "WBAPH9105WP123456", id="prefix-vin"),
+        # Filtrage des faux positifs : le code HS ne doit pas être extrait
+        pytest.param("TRICYCLE 87043119 LLCLHJL03SP420331", "LLCLHJL03SP420331", id="filters-hs-code"),
+    ])
+    def test_extract_chassis(self, description, expected):
+        """Test: Extraction du châssis depuis la description"""
+        chassis = RFCVParser._extract_chassis_number(description)
+        assert chassis == expected
+
+    @pytest.mark.parametrize("description", [
+        # Aucun châssis dans la description
+        pytest.param("CARBON BLACK POWDER", id="no-chassis"),
+        # Trop court (<13 caractères)
+        pytest.param("MOTO ABC123", id="too-short"),
+    ])
+    def test_no_extraction(self, description):
+        """Test: Aucun châssis extrait"""
+        assert RFCVParser._extract_chassis_number(description) is None
 
 
 class TestIntegrationChassisDetection:
@@ -154,8 +127,7 @@ class TestIntegrationChassisDetection:
         assert chassis_info['required'] is True
 
         # Extraction
-        parser = RFCVParser.__new__(RFCVParser)
-        chassis = parser._extract_chassis_number(description)
+        chassis = RFCVParser._extract_chassis_number(description)
         assert chassis == 'LLCLHJL03SP420331'
 
     def test_integration_motorcycle_with_chassis(self):
@@ -166,8 +138,7 @@ class TestIntegrationChassisDetection:
         chassis_info = HSCodeAnalyzer.requires_chassis(hs_code, description)
         assert chassis_info['required'] is True
 
-        parser = RFCVParser.__new__(RFCVParser)
-        chassis = parser._extract_chassis_number(description)
+        chassis = RFCVParser._extract_chassis_number(description)
         assert chassis == 'LRFPCJLDIS0F18969'
 
     def test_integration_carbon_no_chassis(self):
@@ -178,8 +149,7 @@ class TestIntegrationChassisDetection:
         chassis_info = HSCodeAnalyzer.requires_chassis(hs_code, description)
         assert chassis_info['required'] is False
 
-        parser = RFCVParser.__new__(RFCVParser)
-        chassis = parser._extract_chassis_number(description)
+        chassis = RFCVParser._extract_chassis_number(description)
         assert chassis is None
 
 
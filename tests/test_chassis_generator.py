@@ -9,9 +9,7 @@ Teste tous les composants du module chassis_generator:
 - ChassisFactory: API unifiée
 """
 
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+import random
 
 import pytest
 from chassis_generator import (
@@ -34,27 +32,39 @@ class TestChassisValidator:
         checksum = ChassisValidator.calculate_vin_checksum(vin)
         assert checksum == "2", f"Checksum incorrect: attendu '2', reçu '{checksum}'"
 
-    def test_calculate_vin_checksum_various(self):
+    @pytest.mark.parametrize("vin,expected", [
+        ("1M8GDM9AXKP042788", "X"),  # VIN exemple avec checksum X
+        ("11111111111111111", "1"),  # VIN tous 1 (checksum = 1 pas 0)
+    ])
+    def test_calculate_vin_checksum_various(self, vin, expected):
         """Test calcul checksum sur différents VIN"""
-        test_cases = [
-            ("1M8GDM9AXKP042788", "X"),  # VIN exemple avec checksum X
-            ("11111111111111111", "1"),  # VIN tous 1 (checksum = 1 pas 0)
-        ]
-        for vin, expected in test_cases:
-            checksum = ChassisValidator.calculate_vin_checksum(vin)
-            assert checksum == expected, f"VIN {vin}: attendu '{expected}', reçu '{checksum}'"
-
-    def test_validate_vin_valid(self):
+        checksum = ChassisValidator.calculate_vin_checksum(vin)
+        assert checksum == expected, f"VIN {vin}: attendu '{expected}', reçu '{checksum}'"
+
+    @pytest.mark.parametrize("n_vins", [10, 200])
+    def test_calculate_vin_checksums_matches_unitary(self, n_vins):
+        """Le calcul par lot (NumPy au-delà du seuil) donne les mêmes checksums"""
+        rng = random.Random(n_vins)
+        # Minuscules, caractères interdits et inconnus inclus
+        vins = ["".join(rng.choices(ChassisValidator.VIN_ALLOWED_CHARS + "abz-?é", k=17))
+                for _ in range(n_vins)]
+
+        expected = [ChassisValidator.calculate_vin_checksum(vin) for vin in vins]
+        assert ChassisValidator.calculate_vin_checksums(vins) == expected
+
+        with pytest.raises(ValueError, match="17 caractères"):
+            ChassisValidator.calculate_vin_checksums(vins + ["LZSHCKZS2S805407"])
+
+    @pytest.mark.parametrize("vin", [
+        "LZSHCKZS2S8054073",  # FCVR-189 réel
+        "LZSHDMZS1S8029142",  # FCVR-189 réel
+        "1HGBH41JXMN109186",  # VIN Honda exemple
+    ])
+    def test_validate_vin_valid(self, vin):
         """Test validation VIN valides"""
-        valid_vins = [
-            "LZSHCKZS2S8054073",  # FCVR-189 réel
-            "LZSHDMZS1S8029142",  # FCVR-189 réel
-            "1HGBH41JXMN109186",  # VIN Honda exemple
-        ]
-        for vin in valid_vins:
-            result = ChassisValidator.validate_vin(vin)
-            assert result.is_valid, f"VIN {vin} devrait être valide: {result.errors}"
-            assert result.checksum_valid, f"Checksum {vin} devrait être valide"
+        result = ChassisValidator.validate_vin(vin)
+        assert result.is_valid, f"VIN {vin} devrait être valide: {result.errors}"
+        assert result.checksum_valid, f"Checksum {vin} devrait être valide"
 
     def test_validate_vin_invalid_length(self):
         """Test validation VIN longueur incorrecte"""
@@ -102,6 +112,13 @@ class TestChassisValidator:
         result = ChassisValidator.validate("AP2KC1A6S2588796")
         assert result.chassis_type == ChassisType.MANUFACTURER
 
+    def test_validate_many_matches_validate(self):
+        """Test validation par lot identique à validate() élément par élément"""
+        chassis_list = ["LZSHCKZS2S8054073", "AP2KC1A6S2588796", "LZSHCKZS3S8054073", "SHORT"]
+        results = ChassisValidator.validate_many(chassis_list)
+        assert results == [ChassisValidator.validate(c) for c in chassis_list]
+        assert [r.is_valid for r in results] == [True, True, False, False]
+
 
 class TestVINGenerator:
     """Tests du générateur VIN ISO 3779"""
@@ -156,11 +173,28 @@ class TestVINGenerator:
         assert len(batch) == 5
         assert batch[0].endswith("0100")
         assert batch[4].endswith("0104")
+        assert [int(vin[-6:]) for vin in batch] == list(range(100, 105))
 
         # Vérifier que tous sont valides
-        for vin in batch:
-            result = ChassisValidator.validate_vin(vin)
-            assert result.is_valid
+        assert all(r.is_valid for r in ChassisValidator.validate_many(batch))
+
+    def test_generate_batch_matches_generate(self):
+        """Le lot (code année résolu une fois) est identique aux appels unitaires"""
+        batch = VINGenerator.generate_batch("lzs", "hckzs", 2025, "s", 999990, 10)
+        assert batch == [
+            VINGenerator.generate("lzs", "hckzs", 2025, "s", seq)
+            for seq in range(999990, 1000000)
+        ]
+
+        with pytest.raises(ValueError, match="reçu: 1000000"):
+            VINGenerator.generate_batch("LZS", "HCKZS", 2025, "S", 999990, 11)
+
+        # Grand lot : construit en matrice (N, 17) quand NumPy est disponible
+        batch = VINGenerator.generate_batch("LZS", "HCKZS", 2028, "S", 4000, 200)
+        assert batch == [
+            VINGenerator.generate("LZS", "HCKZS", 2028, "S", seq)
+            for seq in range(4000, 4200)
+        ]
 
 
 class TestManufacturerChassisGenerator:
@@ -203,15 +237,32 @@ class TestManufacturerChassisGenerator:
         )
         assert batch == ["TEST0100", "TEST0101", "TEST0102"]
 
+    @pytest.mark.parametrize("template,params", [
+        ("{prefix}-{{X}}{seq:>5}", {"prefix": "ab", "seq": 7}),  # Littéraux et alignement
+        ("{prefix!r}{seq:06d}", {"prefix": "ab", "seq": 7}),     # Conversion (repli str.format)
+        ("{prefix[0]}{seq:{width}d}", {"prefix": "ab", "seq": 7, "width": 4}),  # Index et spec imbriquée
+    ])
+    def test_generate_matches_str_format(self, template, params):
+        """Test template précompilé identique à str.format"""
+        expected = template.format(**params).upper()
+        assert ManufacturerChassisGenerator.generate(template, params) == expected
+
 
 class TestChassisFactory:
     """Tests de la factory (API unifiée)"""
 
-    @pytest.fixture
-    def factory(self):
-        """Fixture factory pour tests"""
+    @pytest.fixture(scope="class")
+    @classmethod
+    def factory(cls):
+        """Fixture factory partagée par la classe (sans séquences persistées)"""
         return ChassisFactory()
 
+    def test_prefix_database_shared(self, factory):
+        """La base de préfixes réels est chargée une fois et partagée entre factories"""
+        if factory.prefix_db is None:
+            pytest.skip("VinPrefixes.txt non disponible")
+        assert ChassisFactory().prefix_db is factory.prefix_db
+
     def test_create_vin(self, factory):
         """Test création VIN via factory"""
         vin = factory.create_vin("LZS", "HCKZS", 2028, "S", 4073)
@@ -224,10 +275,8 @@ class TestChassisFactory:
         batch = factory.create_vin_batch("LZS", "HCKZS", 2028, "S", 1, 10)
         assert len(batch) == 10
         # Vérifier séquence consécutive
-        for i in range(9):
-            seq1 = int(batch[i][-6:])
-            seq2 = int(batch[i+1][-6:])
-            assert seq2 == seq1 + 1
+        seqs = [int(vin[-6:]) for vin in batch]
+        assert seqs == list(range(seqs[0], seqs[0] + len(batch)))
 
     def test_create_chassis(self, factory):
         """Test création châssis fabricant via factory"""
@@ -250,28 +299,22 @@ class TestChassisFactory:
         assert len(batch) == 5
         assert batch == ["TEST0001", "TEST0002", "TEST0003", "TEST0004", "TEST0005"]
 
-    def test_create_random_vin(self, factory):
+    @pytest.fixture
+    def seeded_random(self):
+        """Graine fixe pour le module random (état restauré après le test)"""
+        state = random.getstate()
+        random.seed(0)
+        yield
+        random.setstate(state)
+
+    def test_create_random_vin(self, factory, seeded_random):
         """Test création châssis aléatoires (VIN)"""
-        # Réessayer jusqu'à 50 fois pour générer 10 VIN valides (évite échecs aléatoires)
-        max_attempts = 50
-        random_vins = []
-        attempts = 0
-
-        while len(random_vins) < 10 and attempts < max_attempts:
-            try:
-                batch = factory.create_random("8704", quantity=10 - len(random_vins), chassis_type=ChassisType.VIN_ISO3779)
-                random_vins.extend(batch)
-            except ValueError:
-                # Si génération aléatoire échoue (caractère interdit), réessayer
-                pass
-            attempts += 1
-
-        assert len(random_vins) >= 10, f"Impossible de générer 10 VIN après {attempts} tentatives"
-        random_vins = random_vins[:10]  # Limiter à 10
+        # Le VDS aléatoire exclut I/O/Q : un seul appel suffit, sans réessai
+        random_vins = factory.create_random("8704", quantity=10, chassis_type=ChassisType.VIN_ISO3779)
+        assert len(random_vins) == 10
 
         # Vérifier que tous sont valides
-        for vin in random_vins:
-            result = factory.validate(vin)
+        for result in factory.validate_many(random_vins):
             assert result.is_valid
             assert result.chassis_type == ChassisType.VIN_ISO3779
 
@@ -280,8 +323,7 @@ class TestChassisFactory:
         random_chassis = factory.create_random("8704", quantity=5, chassis_type=ChassisType.MANUFACTURER)
         assert len(random_chassis) == 5
 
-        for chassis in random_chassis:
-            result = factory.validate(chassis)
+        for result in factory.validate_many(random_chassis):
             assert result.is_valid
             assert result.chassis_type == ChassisType.MANUFACTURER
 
@@ -334,8 +376,9 @@ class TestChassisFactory:
 class TestRealWorldScenarios:
     """Tests basés sur les RFCV réels"""
 
-    @pytest.fixture
-    def factory(self):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def factory(cls):
         return ChassisFactory()
 
     def test_fcvr189_vin_pattern(self, factory):
@@ -349,8 +392,7 @@ class TestRealWorldScenarios:
             assert vin.startswith("LZSHCKZS")
             assert vin[9] == "W"  # Année 2028 (correctif v2.0: I/O/Q/U exclus)
             assert vin[10] == "S"  # Usine
-            result = factory.validate(vin)
-            assert result.is_valid
+        assert all(r.is_valid for r in factory.validate_many(batch))
 
     def test_fcvr193_chassis_pattern(self, factory):
         """Test reproduction pattern FCVR-193 (15 tricycles)"""
@@ -371,22 +413,19 @@ class TestRealWorldScenarios:
         for chassis in batch:
             assert chassis.startswith("AP2KC1A6S")
             assert len(chassis) == 16
-            result = factory.validate(chassis)
-            assert result.is_valid
-
-    def test_multiple_manufacturers(self, factory):
+        assert all(r.is_valid for r in factory.validate_many(batch))
+
+    @pytest.mark.parametrize("wmi,vds", [
+        ("LZS", "HCKZS"),  # Apsonic
+        ("LFV", "BA01A"),  # Lifan
+        ("LBV", "GW02B"),  # Haojue
+    ])
+    def test_multiple_manufacturers(self, factory, wmi, vds):
         """Test génération pour différents fabricants"""
-        manufacturers = [
-            ("LZS", "HCKZS"),  # Apsonic
-            ("LFV", "BA01A"),  # Lifan
-            ("LBV", "GW02B"),  # Haojue
-        ]
-
-        for wmi, vds in manufacturers:
-            vin = factory.create_vin(wmi, vds, 2025, "S", 1)
-            result = factory.validate(vin)
-            assert result.is_valid
-            assert vin.startswith(wmi)
+        vin = factory.create_vin(wmi, vds, 2025, "S", 1)
+        result = factory.validate(vin)
+        assert result.is_valid
+        assert vin.startswith(wmi)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,5 @@
 # tests/test_chassis_registry.py
-import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 import pytest
 import threading
@@ -324,3 +322,17 @@ class TestRFCVParserRegistryIntegration:
         assert result is not None
         assert result["filename"] == "NEW.pdf"
         assert result["rfcv_number"] == "CI-2025-002"
+
+    def test_preextracted_skips_pdf_reopen(self, isolated_registry, tmp_path):
+        """Avec preextracted, parse() n'ouvre pas le PDF (fichier absent toléré)."""
+        from rfcv_parser import RFCVParser
+
+        parser = RFCVParser(
+            str(tmp_path / "absent.pdf"),
+            registry=isolated_registry,
+            preextracted=("", []),
+        )
+        rfcv_data = parser.parse()
+
+        assert rfcv_data.items == []
+        assert parser.text == ""
@@ -7,27 +7,28 @@ Teste le gestionnaire de séquences uniques pour garantir qu'aucun
 numéro de châssis ne soit généré deux fois.
 """
 
-import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 import pytest
 import json
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from chassis_sequence_manager import ChassisSequenceManager
+from chassis_generator import ChassisFactory
+
+
+@pytest.fixture(scope="module")
+def shared_storage(tmp_path_factory):
+    """Fichier de séquences partagé par le module, pour les tests indifférents à son contenu"""
+    return str(tmp_path_factory.mktemp("seq") / "seq.json")
 
 
 class TestChassisSequenceManager:
     """Tests du gestionnaire de séquences"""
 
     @pytest.fixture
-    def temp_storage(self):
-        """Fixture pour fichier temporaire de persistance"""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as f:
-            temp_path = f.name
-        yield temp_path
-        # Cleanup
-        Path(temp_path).unlink(missing_ok=True)
+    def temp_storage(self, tmp_path):
+        """Fixture pour fichier temporaire de persistance (non créé)"""
+        return str(tmp_path / "seq.json")
 
     @pytest.fixture
     def manager(self, temp_storage):
@@ -162,19 +163,23 @@ class TestChassisSequenceManager:
 
     def test_get_statistics_with_data(self, manager):
         """Test statistiques avec données"""
-        # Générer séquences
-        for _ in range(50):
-            manager.get_next_sequence("LZSHCKZS2")
-        for _ in range(30):
-            manager.get_next_sequence("LFVBA01A5")
-        for _ in range(20):
-            manager.get_next_sequence("LBVGW02B7")
+        # Injecter l'état directement (une seule sauvegarde)
+        manager.bulk_set({"LZSHCKZS2": 50, "LFVBA01A5": 30, "LBVGW02B7": 20})
 
         stats = manager.get_statistics()
         assert stats["total_prefixes"] == 3
         assert stats["total_vins_generated"] == 100
         assert stats["max_sequence"] == 50
-        assert stats["average_sequence"] == 33.33
+        assert stats["average_sequence"] == pytest.approx(33.33, abs=0.01)
+
+    def test_bulk_set_persisted(self, temp_storage):
+        """Test bulk_set sauvegarde les séquences et la suite continue"""
+        manager1 = ChassisSequenceManager(temp_storage)
+        manager1.bulk_set({"LZSHCKZS2": 50, "LFVBA01A5": 30})
+
+        manager2 = ChassisSequenceManager(temp_storage)
+        assert manager2.get_all_sequences() == {"LZSHCKZS2": 50, "LFVBA01A5": 30}
+        assert manager2.get_next_sequence("LZSHCKZS2") == 51
 
     def test_sequence_limit_warning(self, manager, caplog):
         """Test avertissement limite 999999"""
@@ -189,41 +194,45 @@ class TestChassisSequenceManager:
         assert seq2 == 1000000  # Dépasse limite mais continue
 
         # Vérifier avertissement dans logs
-        assert "atteint limite" in caplog.text.lower()
-
-    def test_thread_safety(self, manager):
-        """Test thread-safety basique (structure)"""
-        import threading
-
-        def generate_sequences(prefix, count):
-            for _ in range(count):
-                manager.get_next_sequence(prefix)
-
-        # Créer 10 threads générant 100 séquences chacun
-        threads = []
-        for i in range(10):
-            t = threading.Thread(
-                target=generate_sequences,
-                args=("LZSHCKZS2", 100)
-            )
-            threads.append(t)
-            t.start()
-
-        # Attendre fin de tous les threads
-        for t in threads:
-            t.join()
+        assert any("atteint limite" in r.getMessage().lower() for r in caplog.records)
+
+    def test_reserve_sequences_block(self, manager):
+        """Test réservation d'un bloc de séquences consécutives"""
+        assert manager.reserve_sequences("LZSHCKZS2", 10) == 1
+        assert manager.get_current_sequence("LZSHCKZS2") == 10
+        assert manager.get_next_sequence("LZSHCKZS2") == 11
+
+        with pytest.raises(ValueError):
+            manager.reserve_sequences("LZSHCKZS2", 0)
+
+    @pytest.mark.parametrize("per_thread", [
+        pytest.param(10, id="quick"),
+        pytest.param(100, id="stress", marks=pytest.mark.slow),
+    ])
+    def test_thread_safety(self, manager, per_thread):
+        """Test thread-safety basique (10 threads, stress complet via -m slow)"""
+        def generate_sequences(_):
+            for _ in range(per_thread):
+                manager.get_next_sequence("LZSHCKZS2")
+
+        # 10 workers générant per_thread séquences chacun
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            list(executor.map(generate_sequences, range(10)))
 
         # Vérifier total
-        assert manager.get_current_sequence("LZSHCKZS2") == 1000
+        assert manager.get_current_sequence("LZSHCKZS2") == 10 * per_thread
 
-    def test_json_file_format(self, temp_storage, manager):
+    def test_json_file_format(self, manager, monkeypatch):
         """Test format du fichier JSON"""
+        # Capturer les écritures en mémoire (la persistance disque est couverte ailleurs)
+        writes = []
+        monkeypatch.setattr(manager, "_write_bytes", writes.append)
+
         manager.get_next_sequence("LZSHCKZS2")
         manager.get_next_sequence("LFVBA01A5")
 
-        # Lire fichier JSON
-        with open(temp_storage, 'r') as f:
-            data = json.load(f)
+        # Dernier contenu écrit
+        data = json.loads(writes[-1])
 
         assert isinstance(data, dict)
         assert "LZSHCKZS2" in data
@@ -235,34 +244,25 @@ class TestChassisFactoryIntegration:
     """Tests d'intégration avec ChassisFactory"""
 
     @pytest.fixture
-    def temp_storage(self):
-        """Fixture pour fichier temporaire"""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as f:
-            temp_path = f.name
-        yield temp_path
-        Path(temp_path).unlink(missing_ok=True)
-
-    def test_factory_unique_mode_enabled(self, temp_storage):
-        """Test factory avec mode unique activé"""
-        from chassis_generator import ChassisFactory
+    def temp_storage(self, tmp_path):
+        """Fixture pour fichier temporaire (non créé)"""
+        return str(tmp_path / "seq.json")
 
+    def test_factory_unique_mode_enabled(self, shared_storage):
+        """Test factory avec mode unique activé"""
         factory = ChassisFactory(
             ensure_unique=True,
-            sequence_storage_path=temp_storage
+            sequence_storage_path=shared_storage
         )
         assert factory.sequence_manager is not None
 
     def test_factory_unique_mode_disabled(self):
         """Test factory avec mode unique désactivé"""
-        from chassis_generator import ChassisFactory
-
         factory = ChassisFactory(ensure_unique=False)
         assert factory.sequence_manager is None
 
     def test_create_unique_vin_basic(self, temp_storage):
         """Test création VIN unique"""
-        from chassis_generator import ChassisFactory
-
         factory = ChassisFactory(
             ensure_unique=True,
             sequence_storage_path=temp_storage
@@ -286,8 +286,6 @@ class TestChassisFactoryIntegration:
 
     def test_create_unique_vin_batch(self, temp_storage):
         """Test création lot VIN uniques"""
-        from chassis_generator import ChassisFactory
-
         factory = ChassisFactory(
             ensure_unique=True,
             sequence_storage_path=temp_storage
@@ -299,18 +297,14 @@ class TestChassisFactoryIntegration:
         assert len(batch) == 50
 
         # Vérifier unicité
-        assert len(set(batch)) == 50
+        assert len({*batch}) == 50
 
         # Vérifier séquences consécutives
-        for i in range(49):
-            seq1 = int(batch[i][-6:])
-            seq2 = int(batch[i+1][-6:])
-            assert seq2 == seq1 + 1
+        seqs = [int(vin[-6:]) for vin in batch]
+        assert seqs == list(range(seqs[0], seqs[0] + len(batch)))
 
     def test_unique_mode_without_init_raises(self):
         """Test erreur si mode unique non activé"""
-        from chassis_generator import ChassisFactory
-
         factory = ChassisFactory(ensure_unique=False)
 
         with pytest.raises(RuntimeError, match="ensure_unique=True"):
@@ -318,8 +312,6 @@ class TestChassisFactoryIntegration:
 
     def test_persistence_across_factory_instances(self, temp_storage):
         """Test persistance entre instances factory"""
-        from chassis_generator import ChassisFactory
-
         # Factory 1
         factory1 = ChassisFactory(
             ensure_unique=True,
@@ -341,8 +333,6 @@ class TestChassisFactoryIntegration:
 
     def test_get_sequence_statistics(self, temp_storage):
         """Test statistiques via factory"""
-        from chassis_generator import ChassisFactory
-
         factory = ChassisFactory(
             ensure_unique=True,
             sequence_storage_path=temp_storage
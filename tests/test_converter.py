@@ -2,19 +2,42 @@
 """
 Tests automatisés pour le convertisseur PDF RFCV → XML ASYCUDA
 """
+import json
+import os
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 # Ajouter le dossier parent au path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
-from pdf_extractor import PDFExtractor
-from rfcv_parser import RFCVParser
-from xml_generator import XMLGenerator
 from metrics import ConversionMetrics, MetricsCollector
 
+_BANNER = '=' * 70
+
+
+def _print_banner(title: str) -> None:
+    """Affiche un titre encadré de séparateurs (un seul print)"""
+    print(f"\n{_BANNER}\n{title}\n{_BANNER}")
+
+
+def _run_one(pdf_file: str, output_dir: str, verbose: bool = False, pretty: bool = False) -> ConversionMetrics:
+    """
+    Convertit un PDF dans un processus worker (fonction module : picklable)
+
+    Args:
+        pdf_file: Chemin du PDF à tester
+        output_dir: Dossier de sortie des XML
+        verbose: Afficher les détails
+        pretty: Indenter les XML générés
+
+    Returns:
+        Métriques de la conversion
+    """
+    return ConverterTester(output_dir=output_dir).test_single_pdf(pdf_file, verbose=verbose, pretty=pretty)
+
 
 class ConverterTester:
     """Testeur pour le convertisseur PDF → XML"""
@@ -24,7 +47,9 @@ class ConverterTester:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.collector = MetricsCollector()
 
-    def test_single_pdf(self, pdf_path: str, verbose: bool = False, taux_douane: float = 573.139) -> ConversionMetrics:
+    def test_single_pdf(
+        self, pdf_path: str, verbose: bool = False, taux_douane: float = 573.139, pretty: bool = False
+    ) -> ConversionMetrics:
         """
         Teste la conversion d'un seul PDF
 
@@ -32,20 +57,26 @@ class ConverterTester:
             pdf_path: Chemin du PDF à tester
             verbose: Afficher les détails
             taux_douane: Taux de change douanier (défaut: 573.139 pour tests)
+            pretty: Indenter le XML généré (désactivé par défaut : sortie compacte)
 
         Returns:
             Métriques de la conversion
         """
+        # Imports différés : pdfplumber/pandas ne sont chargés qu'à la première conversion
+        from pdf_extractor import PDFExtractor
+        from rfcv_parser import RFCVParser
+        from xml_generator import XMLGenerator
+
         metrics = ConversionMetrics(pdf_file=pdf_path)
+        pdf = Path(pdf_path)
 
         try:
             if verbose:
-                print(f"\n{'='*70}")
-                print(f"Test: {Path(pdf_path).name}")
-                print(f"{'='*70}")
+                _print_banner(f"Test: {pdf.name}")
 
             # Étape 1: Extraction PDF
-            start_extract = time.time()
+            # Horloge monotone en nanosecondes entières, une lecture par borne de phase
+            t0 = time.perf_counter_ns()
             with PDFExtractor(pdf_path) as extractor:
                 text = extractor.extract_all_text()
                 tables = extractor.extract_all_tables()
@@ -54,7 +85,8 @@ class ConverterTester:
                 metrics.text_size = len(text)
                 metrics.tables_count = len(tables)
 
-            metrics.extraction_time = time.time() - start_extract
+            t1 = time.perf_counter_ns()
+            metrics.extraction_time = (t1 - t0) / 1e9
 
             if verbose:
                 print(f"  Extraction: {metrics.extraction_time*1000:.2f}ms")
@@ -63,28 +95,15 @@ class ConverterTester:
                 print(f"  Tables: {metrics.tables_count}")
 
             # Étape 2: Parsing RFCV
-            start_parse = time.time()
-            parser = RFCVParser(pdf_path, taux_douane=taux_douane)
+            # Réutiliser l'extraction de l'étape 1 (le PDF est déjà refermé)
+            parser = RFCVParser(pdf_path, taux_douane=taux_douane, preextracted=(text, tables))
             rfcv_data = parser.parse()
-            parse_time = time.time() - start_parse
-
-            # Collecter métriques depuis RFCV
-            temp_metrics = self.collector.collect_from_rfcv(pdf_path, rfcv_data)
-
-            # Copier les métriques collectées
-            metrics.has_exporter = temp_metrics.has_exporter
-            metrics.has_consignee = temp_metrics.has_consignee
-            metrics.has_transport = temp_metrics.has_transport
-            metrics.has_financial = temp_metrics.has_financial
-            metrics.has_valuation = temp_metrics.has_valuation
-            metrics.items_count = temp_metrics.items_count
-            metrics.containers_count = temp_metrics.containers_count
-            metrics.total_cif = temp_metrics.total_cif
-            metrics.total_fob = temp_metrics.total_fob
-            metrics.total_weight = temp_metrics.total_weight
-            metrics.total_packages = temp_metrics.total_packages
-            metrics.fields_filled_rate = temp_metrics.fields_filled_rate
-            metrics.warnings = temp_metrics.warnings
+            t2 = time.perf_counter_ns()
+            parse_ns = t2 - t1
+            parse_time = parse_ns / 1e9
+
+            # Compléter directement les métriques de cette conversion
+            self.collector.collect_from_rfcv(pdf_path, rfcv_data, into=metrics)
 
             if verbose:
                 print(f"  Parsing: {parse_time*1000:.2f}ms")
@@ -96,22 +115,31 @@ class ConverterTester:
                 print(f"  Taux remplissage: {metrics.fields_filled_rate:.1f}%")
 
             # Étape 3: Génération XML
-            start_gen = time.time()
+            t3 = time.perf_counter_ns()
             generator = XMLGenerator(rfcv_data)
             generator.generate()
 
-            output_xml = self.output_dir / f"{Path(pdf_path).stem}.xml"
-            generator.save(str(output_xml), pretty_print=True)
+            output_xml = self.output_dir / f"{pdf.stem}.xml"
+            if pretty:
+                generator.save_stream(str(output_xml))
+                xml_size = output_xml.stat().st_size
+            else:
+                # Document compact écrit en un seul appel
+                blob = generator.to_bytes()
+                output_xml.write_bytes(blob)
+                xml_size = len(blob)
 
-            metrics.generation_time = time.time() - start_gen
-            metrics.total_time = metrics.extraction_time + parse_time + metrics.generation_time
+            t4 = time.perf_counter_ns()
+            metrics.generation_time = (t4 - t3) / 1e9
+            # Somme entière des phases, convertie une seule fois en secondes
+            metrics.total_time = ((t1 - t0) + parse_ns + (t4 - t3)) / 1e9
 
             if verbose:
                 print(f"  Génération XML: {metrics.generation_time*1000:.2f}ms")
                 print(f"  Total: {metrics.total_time*1000:.2f}ms")
 
-            # Étape 4: Validation XML
-            xml_valid = self.collector.validate_xml(str(output_xml), metrics)
+            # Étape 4: Validation XML (sur l'arbre en mémoire, sans relire le fichier)
+            xml_valid = self.collector.validate_xml_root(generator.root, xml_size, metrics)
 
             if verbose:
                 print(f"  XML valide: {'✓' if xml_valid else '✗'}")
@@ -132,42 +160,74 @@ class ConverterTester:
 
         return metrics
 
-    def test_batch(self, pdf_files: List[str], verbose: bool = False) -> MetricsCollector:
+    def test_batch(
+        self, pdf_files: List[str], verbose: bool = False, workers: Optional[int] = None, pretty: bool = False
+    ) -> MetricsCollector:
         """
         Teste plusieurs PDFs en batch
 
+        Les conversions sont indépendantes : elles sont réparties sur un
+        ProcessPoolExecutor et les métriques sont ajoutées au collecteur
+        dans l'ordre des fichiers. Chaque résultat est aussi ajouté dès
+        réception à output_dir/metrics.jsonl : un batch interrompu garde
+        les conversions déjà terminées.
+
         Args:
             pdf_files: Liste des chemins PDF
             verbose: Afficher les détails
+            workers: Nombre de processus (défaut: nombre de CPU, 1 = séquentiel)
+            pretty: Indenter les XML générés
 
         Returns:
             Collecteur avec toutes les métriques
         """
-        print(f"\n{'='*70}")
-        print(f"TEST BATCH: {len(pdf_files)} fichiers")
-        print(f"{'='*70}")
+        workers = min(workers or os.cpu_count() or 1, max(len(pdf_files), 1))
 
-        for i, pdf_file in enumerate(pdf_files, 1):
-            print(f"\n[{i}/{len(pdf_files)}] {Path(pdf_file).name}")
+        _print_banner(f"TEST BATCH: {len(pdf_files)} fichiers ({workers} workers)")
 
-            metrics = self.test_single_pdf(pdf_file, verbose=verbose)
-            self.collector.add_metrics(metrics)
+        results: List[Optional[ConversionMetrics]] = [None] * len(pdf_files)
 
-            # Résumé court
-            if metrics.success:
-                print(f"  ✓ Succès - {metrics.items_count} articles, {metrics.fields_filled_rate:.1f}% remplis")
+        # Journal en ajout, bufferisé par ligne : une ligne JSON par conversion
+        with (self.output_dir / 'metrics.jsonl').open('a', encoding='utf-8', buffering=1) as journal:
+            if workers == 1:
+                for i, pdf_file in enumerate(pdf_files):
+                    results[i] = self.test_single_pdf(pdf_file, verbose=verbose, pretty=pretty)
+                    self._print_result(i + 1, len(pdf_files), results[i])
+                    journal.write(json.dumps(results[i].to_dict(), ensure_ascii=False) + '\n')
             else:
-                print(f"  ✗ Échec - {metrics.error_message}")
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    future_to_index = {
+                        executor.submit(_run_one, pdf_file, str(self.output_dir), verbose, pretty): i
+                        for i, pdf_file in enumerate(pdf_files)
+                    }
+                    for done, future in enumerate(as_completed(future_to_index), 1):
+                        i = future_to_index[future]
+                        try:
+                            results[i] = future.result()
+                        except Exception as e:
+                            results[i] = ConversionMetrics(pdf_file=pdf_files[i], success=False, error_message=str(e))
+                        self._print_result(done, len(pdf_files), results[i])
+                        journal.write(json.dumps(results[i].to_dict(), ensure_ascii=False) + '\n')
+
+        for metrics in results:
+            self.collector.add_metrics(metrics)
 
         return self.collector
 
+    @staticmethod
+    def _print_result(position: int, total: int, metrics: ConversionMetrics) -> None:
+        """Affiche le résumé court d'une conversion"""
+        print(f"\n[{position}/{total}] {os.path.basename(metrics.pdf_file)}")
+        if metrics.success:
+            print(f"  ✓ Succès - {metrics.items_count} articles, {metrics.fields_filled_rate:.1f}% remplis")
+        else:
+            print(f"  ✗ Échec - {metrics.error_message}")
+
     def print_summary(self):
         """Affiche le résumé des tests"""
         summary = self.collector.get_summary()
 
-        print(f"\n{'='*70}")
-        print("RÉSUMÉ DES TESTS")
-        print(f"{'='*70}")
+        _print_banner("RÉSUMÉ DES TESTS")
         print(f"Total conversions: {summary['total_conversions']}")
         print(f"Réussies: {summary['successful']} ({summary['success_rate']:.1f}%)")
         print(f"Échouées: {summary['failed']}")
@@ -191,11 +251,14 @@ def main():
     from generate_report import ReportGenerator
 
     parser = argparse.ArgumentParser(description="Teste le convertisseur PDF → XML")
-    parser.add_argument('pdf_files', nargs='*', help='Fichiers PDF à tester')
+    parser.add_argument('pdf_files', nargs='*', type=Path, help='Fichiers PDF à tester')
     parser.add_argument('-d', '--directory', help='Dossier contenant les PDFs')
     parser.add_argument('-v', '--verbose', action='store_true', help='Mode verbeux')
     parser.add_argument('-o', '--output', default='output/tests', help='Dossier de sortie')
     parser.add_argument('--no-report', action='store_true', help='Ne pas générer de rapport')
+    parser.add_argument('--pretty', action='store_true', help='Indenter les XML générés')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='Nombre de processus parallèles (défaut: nombre de CPU, 1 = séquentiel)')
 
     args = parser.parse_args()
 
@@ -206,7 +269,7 @@ def main():
         test_dir = Path(args.directory)
         pdf_files = list(test_dir.glob('*.pdf'))
     elif args.pdf_files:
-        pdf_files = [Path(f) for f in args.pdf_files]
+        pdf_files = args.pdf_files
     else:
         # Par défaut: tous les PDFs dans tests/
         tests_dir = Path('tests')
@@ -223,14 +286,12 @@ def main():
 
     # Exécuter les tests
     tester = ConverterTester(output_dir=args.output)
-    tester.test_batch(pdf_files, verbose=args.verbose)
+    tester.test_batch(pdf_files, verbose=args.verbose, workers=args.workers, pretty=args.pretty)
     tester.print_summary()
 
     # Générer les rapports
     if not args.no_report:
-        print(f"\n{'='*70}")
-        print("GÉNÉRATION DES RAPPORTS")
-        print(f"{'='*70}")
+        _print_banner("GÉNÉRATION DES RAPPORTS")
         report_gen = ReportGenerator(tester.collector)
         report_gen.generate_all()
 
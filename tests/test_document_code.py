@@ -3,12 +3,6 @@ Tests unitaires pour la distinction des codes de document châssis
 Code 6022: Motos (HS 8711)
 Code 6122: Tricycles et autres véhicules
 """
-import sys
-from pathlib import Path
-
-# Ajouter src au path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
-
 import pytest
 from hs_code_rules import HSCodeAnalyzer
 
@@ -126,18 +120,16 @@ class TestChassisDocumentCode:
         result = HSCodeAnalyzer.get_chassis_document_code(None, 'Electric scooter XIAOMI MI3')
         assert result == '6022'
 
-    def test_hs_8711_various_formats(self):
+    @pytest.mark.parametrize('hs_format', [
+        '8711',
+        '87110000',
+        '8711.00.00',
+        '8711.20.90.00',
+        '8711 30 19 00',
+    ])
+    def test_hs_8711_various_formats(self, hs_format):
         """Code HS 8711 différents formats → tous 6022"""
-        formats = [
-            '8711',
-            '87110000',
-            '8711.00.00',
-            '8711.20.90.00',
-            '8711 30 19 00'
-        ]
-        for hs_format in formats:
-            result = HSCodeAnalyzer.get_chassis_document_code(hs_format, 'VEHICLE')
-            assert result == '6022', f"Failed for format: {hs_format}"
+        assert HSCodeAnalyzer.get_chassis_document_code(hs_format, 'VEHICLE') == '6022'
 
     def test_real_world_motorcycle_description(self):
         """Description réelle de moto → 6022"""
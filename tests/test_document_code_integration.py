@@ -3,13 +3,6 @@ Tests d'intégration pour vérifier les codes de document dans le XML généré
 Code 6022: Motos (HS 8711)
 Code 6122: Tricycles et autres véhicules
 """
-import sys
-from pathlib import Path
-import xml.etree.ElementTree as ET
-
-# Ajouter src au path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
-
 import pytest
 from models import (
     RFCVData, Item, Package, Tarification, HSCode,
@@ -18,11 +11,10 @@ from models import (
 from xml_generator import XMLGenerator
 
 
-class TestDocumentCodeInXML:
-    """Tests d'intégration pour vérifier les codes de document dans le XML"""
-
-    def create_minimal_rfcv(self):
-        """Crée une structure RFCV minimale pour les tests"""
+@pytest.fixture(scope="module")
+def minimal_rfcv_factory():
+    """Fabrique de structures RFCV minimales (nouvelle instance à chaque appel)"""
+    def factory(items=None):
         return RFCVData(
             property=Property(
                 total_packages=10,
@@ -33,29 +25,50 @@ class TestDocumentCodeInXML:
                 customs_office_code='CIAB1',
                 customs_office_name='ABIDJAN-PORT'
             ),
-            items=[]
+            items=list(items or [])
         )
-
-    def create_vehicle_item(self, hs_code: str, description: str, chassis: str):
-        """Crée un article véhicule avec châssis"""
-        return Item(
-            tarification=Tarification(
-                hscode=HSCode(commodity_code=hs_code)
-            ),
-            goods_description=description,
-            packages=Package(
-                chassis_number=chassis,
-                number_of_packages=1,
-                marks1=description
-            )
+    return factory
+
+
+def create_vehicle_item(hs_code: str, description: str, chassis: str):
+    """Crée un article véhicule avec châssis"""
+    return Item(
+        tarification=Tarification(
+            hscode=HSCode(commodity_code=hs_code)
+        ),
+        goods_description=description,
+        packages=Package(
+            chassis_number=chassis,
+            number_of_packages=1,
+            marks1=description
         )
+    )
 
-    def test_motorcycle_generates_code_6022(self):
+
+def _doc_codes(root):
+    """Codes des documents joints présents dans l'arbre XML"""
+    return {e.text for e in root.iter('Attached_document_code')}
+
+
+def _doc_names(root):
+    """Noms des documents joints présents dans l'arbre XML"""
+    return {e.text for e in root.iter('Attached_document_name')}
+
+
+def _doc_references(root):
+    """Références (numéros de châssis) des documents joints"""
+    return {e.text for e in root.iter('Attached_document_reference')}
+
+
+class TestDocumentCodeInXML:
+    """Tests d'intégration pour vérifier les codes de document dans le XML"""
+
+    def test_motorcycle_generates_code_6022(self, minimal_rfcv_factory):
         """Moto (HS 8711) → Code document 6022"""
         # Créer RFCV avec moto
-        rfcv = self.create_minimal_rfcv()
+        rfcv = minimal_rfcv_factory()
         rfcv.items = [
-            self.create_vehicle_item(
+            create_vehicle_item(
                 '87112090',
                 'MOTORCYCLE YAMAHA YZF-R6',
                 'LRFPCJLDIS0F18969'
@@ -65,71 +78,54 @@ class TestDocumentCodeInXML:
         # Générer XML
         generator = XMLGenerator(rfcv)
         xml_root = generator.generate()
-        xml_str = ET.tostring(xml_root, encoding='unicode')
+        codes = _doc_codes(xml_root)
+        names = _doc_names(xml_root)
+        references = _doc_references(xml_root)
 
         # Vérifications
-        assert '6022' in xml_str, "Code document 6022 absent pour moto"
-        assert '6122' not in xml_str, "Code document 6122 présent à tort pour moto"
-        assert 'CHASSIS MOTOS' in xml_str, "Nom document MOTOS absent"
-        assert 'LRFPCJLDIS0F18969' in xml_str, "Numéro châssis absent"
-
-    def test_tricycle_generates_code_6122(self):
-        """Tricycle (HS 8704) → Code document 6122"""
-        # Créer RFCV avec tricycle
-        rfcv = self.create_minimal_rfcv()
-        rfcv.items = [
-            self.create_vehicle_item(
-                '87042110',
-                'TRICYCLE AP150ZH-20',
-                'LLCLHJL03SP420331'
-            )
-        ]
-
-        # Générer XML
-        generator = XMLGenerator(rfcv)
-        xml_root = generator.generate()
-        xml_str = ET.tostring(xml_root, encoding='unicode')
-
-        # Vérifications
-        assert '6122' in xml_str, "Code document 6122 absent pour tricycle"
-        assert '6022' not in xml_str, "Code document 6022 présent à tort pour tricycle"
-        assert 'CHASSIS VEHICULES' in xml_str, "Nom document VEHICULES absent"
-        assert 'LLCLHJL03SP420331' in xml_str, "Numéro châssis absent"
-
-    def test_car_generates_code_6122(self):
-        """Voiture (HS 8703) → Code document 6122"""
-        rfcv = self.create_minimal_rfcv()
-        rfcv.items = [
-            self.create_vehicle_item(
-                '87032310',
-                'CAR TOYOTA COROLLA',
-                '2T1BURHE8KC123456'
-            )
-        ]
+        assert '6022' in codes, "Code document 6022 absent pour moto"
+        assert '6122' not in codes, "Code document 6122 présent à tort pour moto"
+        assert 'CHASSIS MOTOS' in names, "Nom document MOTOS absent"
+        assert 'LRFPCJLDIS0F18969' in references, "Numéro châssis absent"
+
+    @pytest.mark.parametrize("hs_code,description,chassis,expected_code,expected_name", [
+        ('87042110', 'TRICYCLE AP150ZH-20', 'LLCLHJL03SP420331', '6122', 'CHASSIS VEHICULES'),
+        ('87032310', 'CAR TOYOTA COROLLA', '2T1BURHE8KC123456', '6122', 'CHASSIS VEHICULES'),
+        ('87043190', 'TRUCK ISUZU NPR', '4NUZT13A681234567', '6122', 'CHASSIS VEHICULES'),
+        ('87011000', 'TRACTOR MASSEY FERGUSON', 'MF1234567890ABC', '6122', 'CHASSIS VEHICULES'),
+    ], ids=['tricycle', 'car', 'truck', 'tractor'])
+    def test_vehicle_generates_code_6122(
+        self, minimal_rfcv_factory, hs_code, description, chassis, expected_code, expected_name
+    ):
+        """Véhicules hors motos (HS 8701/8703/8704) → Code document 6122"""
+        rfcv = minimal_rfcv_factory([create_vehicle_item(hs_code, description, chassis)])
 
         generator = XMLGenerator(rfcv)
         xml_root = generator.generate()
-        xml_str = ET.tostring(xml_root, encoding='unicode')
+        codes = _doc_codes(xml_root)
+        names = _doc_names(xml_root)
+        references = _doc_references(xml_root)
 
-        assert '6122' in xml_str
-        assert 'CHASSIS VEHICULES' in xml_str
-        assert '2T1BURHE8KC123456' in xml_str
+        assert expected_code in codes, f"Code document {expected_code} absent"
+        assert '6022' not in codes, "Code document 6022 (motos) présent à tort"
+        assert expected_name in names, f"Nom document {expected_name} absent"
+        assert chassis in references, "Numéro châssis absent"
 
-    def test_mixed_vehicles_different_codes(self):
+    def test_mixed_vehicles_different_codes(self, minimal_rfcv_factory):
         """Mélange motos et tricycles → Codes 6022 et 6122"""
-        rfcv = self.create_minimal_rfcv()
+        rfcv = minimal_rfcv_factory()
         rfcv.items = [
-            self.create_vehicle_item(
+            create_vehicle_item(
                 '87112090',
                 'MOTORCYCLE HONDA CBR',
                 'MOTO001234567ABC'
             ),
-            self.create_vehicle_item(
+            create_vehicle_item(
                 '87042110',
                 'TRICYCLE AP150ZK',
                 'TRIC987654321XYZ'
             ),
-            self.create_vehicle_item(
+            create_vehicle_item(
                 '87112090',
                 'SCOOTER VESPA',
                 'SCOO456789012DEF'
@@ -138,24 +134,26 @@ class TestDocumentCodeInXML:
 
         generator = XMLGenerator(rfcv)
         xml_root = generator.generate()
-        xml_str = ET.tostring(xml_root, encoding='unicode')
+        codes = _doc_codes(xml_root)
+        names = _doc_names(xml_root)
+        references = _doc_references(xml_root)
 
         # Vérifier présence des deux codes
-        assert '6022' in xml_str, "Code 6022 (motos) absent"
-        assert '6122' in xml_str, "Code 6122 (tricycles) absent"
+        assert '6022' in codes, "Code 6022 (motos) absent"
+        assert '6122' in codes, "Code 6122 (tricycles) absent"
 
         # Vérifier les deux noms de document
-        assert 'CHASSIS MOTOS' in xml_str
-        assert 'CHASSIS VEHICULES' in xml_str
+        assert 'CHASSIS MOTOS' in names
+        assert 'CHASSIS VEHICULES' in names
 
         # Vérifier tous les châssis
-        assert 'MOTO001234567ABC' in xml_str
-        assert 'TRIC987654321XYZ' in xml_str
-        assert 'SCOO456789012DEF' in xml_str
+        assert 'MOTO001234567ABC' in references
+        assert 'TRIC987654321XYZ' in references
+        assert 'SCOO456789012DEF' in references
 
-    def test_motorcycle_fallback_no_hs_code(self):
+    def test_motorcycle_fallback_no_hs_code(self, minimal_rfcv_factory):
         """Moto sans code HS (fallback mots-clés) → Code 6022"""
-        rfcv = self.create_minimal_rfcv()
+        rfcv = minimal_rfcv_factory()
         rfcv.items = [
             Item(
                 tarification=None,  # Pas de tarification = pas de code HS
@@ -170,52 +168,17 @@ class TestDocumentCodeInXML:
 
         generator = XMLGenerator(rfcv)
         xml_root = generator.generate()
-        xml_str = ET.tostring(xml_root, encoding='unicode')
+        codes = _doc_codes(xml_root)
+        names = _doc_names(xml_root)
 
-        assert '6022' in xml_str, "Code 6022 absent (fallback mots-clés)"
-        assert 'CHASSIS MOTOS' in xml_str
+        assert '6022' in codes, "Code 6022 absent (fallback mots-clés)"
+        assert 'CHASSIS MOTOS' in names
 
-    def test_truck_generates_code_6122(self):
-        """Camion (HS 8704) → Code document 6122"""
-        rfcv = self.create_minimal_rfcv()
-        rfcv.items = [
-            self.create_vehicle_item(
-                '87043190',
-                'TRUCK ISUZU NPR',
-                '4NUZT13A681234567'
-            )
-        ]
-
-        generator = XMLGenerator(rfcv)
-        xml_root = generator.generate()
-        xml_str = ET.tostring(xml_root, encoding='unicode')
-
-        assert '6122' in xml_str
-        assert 'CHASSIS VEHICULES' in xml_str
-
-    def test_tractor_generates_code_6122(self):
-        """Tracteur (HS 8701) → Code document 6122"""
-        rfcv = self.create_minimal_rfcv()
-        rfcv.items = [
-            self.create_vehicle_item(
-                '87011000',
-                'TRACTOR MASSEY FERGUSON',
-                'MF1234567890ABC'
-            )
-        ]
-
-        generator = XMLGenerator(rfcv)
-        xml_root = generator.generate()
-        xml_str = ET.tostring(xml_root, encoding='unicode')
-
-        assert '6122' in xml_str
-        assert 'CHASSIS VEHICULES' in xml_str
-
-    def test_xml_structure_motorcycle(self):
+    def test_xml_structure_motorcycle(self, minimal_rfcv_factory):
         """Vérifier structure complète XML pour moto"""
-        rfcv = self.create_minimal_rfcv()
+        rfcv = minimal_rfcv_factory()
         rfcv.items = [
-            self.create_vehicle_item(
+            create_vehicle_item(
                 '87113019',
                 'MOTORCYCLE SUZUKI',
                 'SUZUKI123456789AB'
@@ -229,14 +192,10 @@ class TestDocumentCodeInXML:
         items = xml_root.findall('.//Item')
         assert len(items) == 1, "Devrait avoir 1 article"
 
-        # Trouver le document châssis
-        chassis_docs = items[0].findall('.//Attached_documents')
-        chassis_doc = None
-        for doc in chassis_docs:
-            code = doc.find('Attached_document_code')
-            if code is not None and code.text == '6022':
-                chassis_doc = doc
-                break
+        # Trouver le document châssis (filtre par prédicat ElementPath)
+        chassis_doc = next(
+            items[0].iterfind(".//Attached_documents[Attached_document_code='6022']"), None
+        )
 
         assert chassis_doc is not None, "Document châssis 6022 non trouvé"
 
@@ -250,6 +209,36 @@ class TestDocumentCodeInXML:
         doc_rule = chassis_doc.find('Attached_document_from_rule')
         assert doc_rule is not None and doc_rule.text == '1'
 
+    def test_save_stream_matches_save(self, minimal_rfcv_factory, tmp_path):
+        """save_stream produit le même fichier que save(pretty_print=True)"""
+        rfcv = minimal_rfcv_factory()
+        rfcv.items = [
+            create_vehicle_item(
+                '87113019',
+                'MOTORCYCLE SUZUKI & CO <R>',
+                'SUZUKI123456789AB'
+            )
+        ]
+
+        generator = XMLGenerator(rfcv)
+        generator.generate()
+        generator.save(str(tmp_path / 'dom.xml'), pretty_print=True)
+        generator.save_stream(str(tmp_path / 'stream.xml'))
+
+        expected = (tmp_path / 'dom.xml').read_text(encoding='utf-8')
+        assert (tmp_path / 'stream.xml').read_text(encoding='utf-8') == expected
+
+    def test_to_bytes_matches_compact_save(self, minimal_rfcv_factory, tmp_path):
+        """to_bytes renvoie le même document que save(pretty_print=False)"""
+        rfcv = minimal_rfcv_factory([
+            create_vehicle_item('87113019', 'MOTORCYCLE SUZUKI', 'SUZUKI123456789AB')
+        ])
+
+        generator = XMLGenerator(rfcv)
+        generator.save(str(tmp_path / 'compact.xml'), pretty_print=False)
+
+        assert generator.to_bytes() == (tmp_path / 'compact.xml').read_bytes()
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
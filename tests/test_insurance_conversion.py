@@ -7,26 +7,49 @@ Valide que:
 3. La répartition proportionnelle distribue l'assurance sur les articles selon leur FOB
 """
 import pytest
-import sys
+from operator import attrgetter
 from pathlib import Path
 
-# Ajouter src/ au path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+TESTS_DIR = Path(__file__).parent
+EXTRACTION_DIR = TESTS_DIR.parent / 'asycuda-extraction'
 
-from rfcv_parser import RFCVParser
+PDF_03286 = TESTS_DIR / 'OT_M_2025_03286_BL_2025_03131_RFCV_v1.pdf'
+PDF_03475 = EXTRACTION_DIR / 'OT_M_2025_03475_BL_2025_03320_RFCV_v1.pdf'
+PDF_03977 = EXTRACTION_DIR / 'OT_M_2025_03977_BL_2025_03796_RFCV_v1.pdf'
+
+# PDF échantillon versionné à côté de sa fixture JSON (scripts/regen_test_fixtures.py)
+ECHANTILLON_PDF = TESTS_DIR / 'fixtures' / 'echantillon_extraction.pdf'
+# Même nom sans le PDF : seule la fixture JSON permet de l'extraire
+ECHANTILLON_SANS_PDF = TESTS_DIR / 'pdf_absent' / ECHANTILLON_PDF.name
+
+# Taux douanier de test (USD)
+TAUX_DOUANE = 573.139
+
+
+_GET_INSURANCE = attrgetter('valuation_item.insurance.amount_national')
+
+
+def _assurances_articles(rfcv_data):
+    """Assurances (XOF) réparties sur les articles (itérateur)"""
+    return map(_GET_INSURANCE, rfcv_data.items)
+
+
+# (PDF, nombre d'articles attendu — None : au moins 1 après regroupement)
+CONVERSION_CASES = [
+    pytest.param(PDF_03286, None, id='03286', marks=pytest.mark.requires_pdf(PDF_03286)),
+    pytest.param(PDF_03475, 35, id='03475_motos', marks=pytest.mark.requires_pdf(PDF_03475)),
+    pytest.param(PDF_03977, 1, id='03977_poudre', marks=pytest.mark.requires_pdf(PDF_03977)),
+]
 
 
 class TestInsuranceConversion:
     """Tests de conversion devise de l'assurance"""
 
-    def test_conversion_rfcv_03286(self):
-        """Test calcul assurance RFCV 03286 avec nouvelle formule"""
-        pdf_path = Path(__file__).parent / 'OT_M_2025_03286_BL_2025_03131_RFCV_v1.pdf'
-
-        # Parser RFCV avec taux douanier
-        # Utiliser taux de test: 573.139 (USD)
-        parser = RFCVParser(str(pdf_path), taux_douane=573.139)
-        rfcv_data = parser.parse()
+    @pytest.mark.parametrize("pdf_path,expected_items", CONVERSION_CASES)
+    def test_conversion(self, parse_rfcv, pdf_path, expected_items):
+        """Calcul assurance avec nouvelle formule et répartition cohérente sur les articles"""
+        # RFCV parsée avec taux douanier (une seule fois par session)
+        rfcv_data = parse_rfcv(pdf_path, TAUX_DOUANE)
 
         # Vérifier calcul assurance globale
         assert rfcv_data.valuation is not None
@@ -34,27 +57,35 @@ class TestInsuranceConversion:
 
         # Nouvelle formule: 2500 + (FOB + FRET) × TAUX × 0.0015
         # L'assurance devrait être calculée en XOF
-        assurance_xof = rfcv_data.valuation.insurance.amount_national
+        insurance = rfcv_data.valuation.insurance
+        assurance_xof = insurance.amount_national
         assert assurance_xof is not None
         assert assurance_xof >= 2500, f"Assurance devrait être au moins 2500 XOF (partie fixe), obtenu {assurance_xof}"
 
-        # Vérifier que c'est en XOF
-        assert rfcv_data.valuation.insurance.currency_code == 'XOF'
-        assert rfcv_data.valuation.insurance.currency_rate == 1.0
+        # Vérifier répartition sur articles (regroupement si même code HS)
+        if expected_items is None:
+            assert len(rfcv_data.items) >= 1, "Au moins 1 article après regroupement"
+        else:
+            assert len(rfcv_data.items) == expected_items
 
-        # Vérifier répartition sur articles (regroupement en 1 article si même code HS)
-        assert len(rfcv_data.items) >= 1, "Au moins 1 article après regroupement"
+        # Assurance globale entière (XOF) et méthode du reste le plus grand :
+        # la somme des articles est exactement le total
+        assert assurance_xof == int(assurance_xof)
+        somme = sum(_assurances_articles(rfcv_data))
+        assert somme == assurance_xof, f"Somme articles ({somme}) != Total ({assurance_xof})"
 
-        assurance_articles = [
-            item.valuation_item.insurance.amount_national
-            for item in rfcv_data.items
-            if item.valuation_item and item.valuation_item.insurance
-        ]
+        # Format XOF (amount_national = amount_foreign, taux 1.0) global et par article
+        assert insurance.amount_national == insurance.amount_foreign
+        assert insurance.currency_code == 'XOF' and insurance.currency_rate == 1.0
+        for idx, item in enumerate(rfcv_data.items, 1):
+            ins = item.valuation_item.insurance
+            assert ins.amount_national == ins.amount_foreign, f"Article {idx}: amount_national != amount_foreign"
+            assert ins.currency_code == 'XOF' and ins.currency_rate == 1.0, f"Article {idx}: format non XOF"
 
-        # Vérifier somme cohérente (accepter différence d'arrondi ±1 XOF)
-        somme = sum(assurance_articles)
-        diff = abs(int(somme) - int(assurance_xof))
-        assert diff <= 1, f"Somme articles ({somme}) != Total ({assurance_xof}), diff: {diff}"
+    @pytest.mark.requires_pdf(PDF_03286)
+    def test_proportionnalite_03286(self, parse_rfcv):
+        """RFCV 03286 : assurance proportionnelle au FOB des articles"""
+        assurance_articles = list(_assurances_articles(parse_rfcv(PDF_03286, TAUX_DOUANE)))
 
         # Note: Les articles avec même code HS sont maintenant regroupés
         # La proportionnalité n'est vérifiée que s'il y a plusieurs articles
@@ -64,109 +95,66 @@ class TestInsuranceConversion:
             if len(assurance_articles) > 2:
                 assert assurance_articles[1] > assurance_articles[2], "Article 2 devrait avoir plus d'assurance"
 
-    def test_conversion_rfcv_03475_motos(self):
-        """Test calcul assurance RFCV 03475 (35 motos) avec nouvelle formule"""
-        pdf_path = Path(__file__).parent.parent / 'asycuda-extraction' / 'OT_M_2025_03475_BL_2025_03320_RFCV_v1.pdf'
-
-        # Parser RFCV avec taux douanier
-        parser = RFCVParser(str(pdf_path), taux_douane=573.139)
-        rfcv_data = parser.parse()
-
-        # Vérifier calcul assurance globale
-        assert rfcv_data.valuation is not None
-        assert rfcv_data.valuation.insurance is not None
-
-        # Nouvelle formule: 2500 + (FOB + FRET) × TAUX × 0.0015
-        assurance_xof = rfcv_data.valuation.insurance.amount_national
-        assert assurance_xof is not None
-        assert assurance_xof >= 2500, f"Assurance devrait être au moins 2500 XOF, obtenu {assurance_xof}"
-
-        # Vérifier répartition sur 35 articles
-        assert len(rfcv_data.items) == 35
-
-        assurance_articles = [
-            item.valuation_item.insurance.amount_national
-            for item in rfcv_data.items
-            if item.valuation_item and item.valuation_item.insurance
-        ]
-
-        # Vérifier somme cohérente (accepter différence d'arrondi ±1 XOF)
-        somme = sum(assurance_articles)
-        diff = abs(int(somme) - int(assurance_xof))
-        assert diff <= 1, f"Somme articles ({somme}) != Total ({assurance_xof}), diff: {diff}"
-
-        # Tous les articles ont le même FOB, donc assurances similaires (±1 XOF)
-        min_assurance = min(assurance_articles)
-        max_assurance = max(assurance_articles)
-        assert (max_assurance - min_assurance) <= 1, "Écart max 1 XOF pour articles identiques"
-
-    def test_conversion_rfcv_03977_poudre(self):
-        """Test calcul assurance RFCV 03977 (1 article poudre) avec nouvelle formule"""
-        pdf_path = Path(__file__).parent.parent / 'asycuda-extraction' / 'OT_M_2025_03977_BL_2025_03796_RFCV_v1.pdf'
-
-        # Parser RFCV avec taux douanier
-        parser = RFCVParser(str(pdf_path), taux_douane=573.139)
-        rfcv_data = parser.parse()
-
-        # Vérifier calcul assurance globale
-        assert rfcv_data.valuation is not None
-        assert rfcv_data.valuation.insurance is not None
+    @pytest.mark.requires_pdf(PDF_03475)
+    def test_articles_identiques_03475(self, parse_rfcv):
+        """RFCV 03475 (35 motos) : même FOB, donc assurances similaires (±1 XOF)"""
+        assurance_articles = list(_assurances_articles(parse_rfcv(PDF_03475, TAUX_DOUANE)))
 
-        # Nouvelle formule: 2500 + (FOB + FRET) × TAUX × 0.0015
-        assurance_xof = rfcv_data.valuation.insurance.amount_national
-        assert assurance_xof is not None
-        assert assurance_xof >= 2500, f"Assurance devrait être au moins 2500 XOF, obtenu {assurance_xof}"
+        assert (max(assurance_articles) - min(assurance_articles)) <= 1, "Écart max 1 XOF pour articles identiques"
 
-        # Vérifier répartition sur 1 article
-        assert len(rfcv_data.items) == 1
 
-        # L'article unique devrait avoir toute l'assurance
-        item1 = rfcv_data.items[0]
-        assert item1.valuation_item is not None
-        assert item1.valuation_item.insurance is not None
+class TestPipelineComplet:
+    """Pipeline complet sans extraction pré-calculée (tests/fixtures)"""
 
-        assurance_article = item1.valuation_item.insurance.amount_national
-        # Accepter différence d'arrondi ±1 XOF (méthode du reste le plus grand)
-        diff = abs(assurance_article - assurance_xof)
-        assert diff <= 1, f"Article unique doit avoir toute l'assurance (diff: {diff} XOF)"
+    @pytest.mark.skipif(not PDF_03286.exists(), reason=f"PDF de test absent: {PDF_03286.name}")
+    def test_smoke_pdf_reel_03286(self, parse_rfcv):
+        """Le parsing direct du PDF donne la même assurance que l'extraction en cache"""
+        from rfcv_parser import RFCVParser
 
+        rfcv_data = RFCVParser(str(PDF_03286), taux_douane=TAUX_DOUANE).parse()
+        cached = parse_rfcv(PDF_03286, TAUX_DOUANE)
 
-class TestInsuranceFormats:
-    """Tests des formats XOF (amount_national = amount_foreign)"""
+        assert len(rfcv_data.items) == len(cached.items)
+        assert rfcv_data.valuation.insurance.amount_national == cached.valuation.insurance.amount_national
+        assert list(_assurances_articles(rfcv_data)) == list(_assurances_articles(cached))
 
-    def test_format_xof_assurance_globale(self):
-        """Test format XOF pour assurance globale"""
-        pdf_path = Path(__file__).parent / 'OT_M_2025_03286_BL_2025_03131_RFCV_v1.pdf'
+    def test_extraction_roundtrip(self, tmp_path):
+        """dump_extraction / load_extraction conservent texte et tables"""
+        import pandas as pd
+        from pdf_extractor import dump_extraction, load_extraction
 
-        parser = RFCVParser(str(pdf_path), taux_douane=573.139)
-        rfcv_data = parser.parse()
+        tables = [pd.DataFrame([['1', None], ['2', 'FOB']], columns=['N°', 'Valeur'])]
+        fixture = tmp_path / 'extraction.json'
+        dump_extraction("RFCV N° 03286\nTOTAL", tables, str(fixture))
 
-        insurance = rfcv_data.valuation.insurance
-        assert insurance is not None
-
-        # Pour XOF: amount_national doit égaler amount_foreign
-        assert insurance.amount_national == insurance.amount_foreign
-        assert insurance.currency_code == 'XOF'
-        assert insurance.currency_rate == 1.0
+        text, loaded = load_extraction(str(fixture))
+        assert text == "RFCV N° 03286\nTOTAL"
+        assert len(loaded) == 1
+        pd.testing.assert_frame_equal(loaded[0], tables[0])
 
-    def test_format_xof_assurance_articles(self):
-        """Test format XOF pour assurance par article"""
-        pdf_path = Path(__file__).parent / 'OT_M_2025_03286_BL_2025_03131_RFCV_v1.pdf'
+    def test_fixture_identique_extraction_pdf(self):
+        """La fixture JSON versionnée correspond à l'extraction du PDF échantillon"""
+        import pandas as pd
+        from pdf_extractor import PDFExtractor, load_extraction
+        from tests.pdf_fixtures import fixture_path
 
-        parser = RFCVParser(str(pdf_path), taux_douane=573.139)
-        rfcv_data = parser.parse()
+        text, tables = load_extraction(str(fixture_path(ECHANTILLON_PDF)))
+        with PDFExtractor(str(ECHANTILLON_PDF)) as extractor:
+            assert text == extractor.extract_all_text()
+            expected = extractor.extract_all_tables()
 
-        for idx, item in enumerate(rfcv_data.items, 1):
-            assert item.valuation_item is not None
-            assert item.valuation_item.insurance is not None
+        assert len(tables) == len(expected) == 1
+        pd.testing.assert_frame_equal(tables[0], expected[0])
 
-            insurance = item.valuation_item.insurance
+    @pytest.mark.requires_pdf(ECHANTILLON_SANS_PDF)
+    def test_extraction_rejouee_sans_pdf(self, extract_pdf):
+        """Sans le PDF, la fixture JSON suffit : collecte non ignorée et extraction rejouée"""
+        assert not ECHANTILLON_SANS_PDF.exists()
 
-            # Pour XOF: amount_national doit égaler amount_foreign
-            assert insurance.amount_national == insurance.amount_foreign, \
-                f"Article {idx}: amount_national != amount_foreign"
-            assert insurance.currency_code == 'XOF'
-            assert insurance.currency_rate == 1.0
+        text, tables = extract_pdf(ECHANTILLON_SANS_PDF)
+        assert text.startswith("RAPPORT FINAL DE VERIFICATION")
+        assert list(tables[0].columns) == ['No', 'Description', 'FOB']
+        assert tables[0]['FOB'].tolist() == ['362.39', '1250.00']
 
 
 if __name__ == "__main__":
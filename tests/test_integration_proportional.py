@@ -12,14 +12,44 @@ Date: 2025-01-28
 """
 
 import pytest
-import sys
+from operator import attrgetter
 from pathlib import Path
 
-# Ajouter src/ au path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+from models import RFCVData, Valuation, Financial, Item, Tarification, ValuationItem
 
-from rfcv_parser import RFCVParser
-from models import RFCVData
+
+# RFCV de test: OT_M_2025_03475 avec 35 articles identiques
+RFCV_03475 = Path(__file__).parent.parent / 'asycuda-extraction' / 'OT_M_2025_03475_BL_2025_03320_RFCV_v1.pdf'
+
+
+def _valuation_values(rfcv_data, field):
+    """Valeurs (itérateur) d'un champ de valuation_item pour tous les articles (ex: 'insurance.amount_national')"""
+    return map(attrgetter(f'valuation_item.{field}'), rfcv_data.items)
+
+
+def _min_max(values):
+    """Minimum et maximum d'un itérable en une seule passe"""
+    mn, mx = float('inf'), float('-inf')
+    for v in values:
+        if v < mn:
+            mn = v
+        if v > mx:
+            mx = v
+    return mn, mx
+
+
+@pytest.fixture
+def partial_rfcv():
+    """RFCV à 3 articles dont seul le poids brut global est connu (modifiée par le calcul)"""
+    return RFCVData(
+        financial=Financial(currency_code='USD', exchange_rate=575.78),
+        # Valuation avec seulement gross_weight (autres à None)
+        valuation=Valuation(gross_weight=1000.0, net_weight=None, external_freight=None, insurance=None),
+        items=[
+            Item(tarification=Tarification(item_price=100.0), valuation_item=ValuationItem())
+            for _ in range(3)
+        ],
+    )
 
 
 class TestIntegrationProportional:
@@ -28,18 +58,15 @@ class TestIntegrationProportional:
     @pytest.fixture
     def rfcv_test_path(self):
         """Retourne le chemin vers la RFCV de test"""
-        # RFCV de test: OT_M_2025_03475 avec 35 articles identiques
-        test_pdf = Path(__file__).parent.parent / 'asycuda-extraction' / 'OT_M_2025_03475_BL_2025_03320_RFCV_v1.pdf'
-        if test_pdf.exists():
-            return str(test_pdf)
+        if RFCV_03475.exists():
+            return str(RFCV_03475)
         else:
-            pytest.skip(f"RFCV de test non disponible: {test_pdf}")
+            pytest.skip(f"RFCV de test non disponible: {RFCV_03475}")
 
-    def test_pipeline_complet(self, rfcv_test_path):
+    def test_pipeline_complet(self, parse_rfcv, rfcv_test_path):
         """Test du pipeline complet: PDF → Parsing → Calcul proportionnel"""
         # Parse la RFCV (inclut automatiquement le calcul proportionnel)
-        parser = RFCVParser(rfcv_test_path, taux_douane=573.139)
-        rfcv_data = parser.parse()
+        rfcv_data = parse_rfcv(rfcv_test_path, 573.139)
 
         # Vérifications de base
         assert rfcv_data is not None
@@ -60,90 +87,69 @@ class TestIntegrationProportional:
             assert item.valuation_item.gross_weight is not None, "POIDS BRUT article non calculé"
             assert item.valuation_item.net_weight is not None, "POIDS NET article non calculé"
 
-    def test_coherence_fret(self, rfcv_test_path):
+    def test_coherence_fret(self, parse_rfcv, rfcv_test_path):
         """Vérifie que sum(FRET_articles) == FRET_total"""
-        parser = RFCVParser(rfcv_test_path, taux_douane=573.139)
-        rfcv_data = parser.parse()
+        rfcv_data = parse_rfcv(rfcv_test_path, 573.139)
 
         # Total global
         fret_total = rfcv_data.valuation.external_freight.amount_foreign
 
         # Somme des articles
-        fret_articles_sum = sum(
-            item.valuation_item.external_freight.amount_foreign
-            for item in rfcv_data.items
-        )
+        fret_articles_sum = sum(_valuation_values(rfcv_data, 'external_freight.amount_foreign'))
 
         # Vérifier cohérence exacte
         assert fret_articles_sum == fret_total, (
             f"Incohérence FRET: sum(articles)={fret_articles_sum} != total={fret_total}"
         )
 
-    def test_coherence_assurance(self, rfcv_test_path):
+    def test_coherence_assurance(self, parse_rfcv, rfcv_test_path):
         """Vérifie que sum(ASSURANCE_articles) == ASSURANCE_total"""
-        parser = RFCVParser(rfcv_test_path, taux_douane=573.139)
-        rfcv_data = parser.parse()
+        rfcv_data = parse_rfcv(rfcv_test_path, 573.139)
 
         # Total global (en XOF)
         assurance_total = rfcv_data.valuation.insurance.amount_national
 
         # Somme des articles
-        assurance_articles_sum = sum(
-            item.valuation_item.insurance.amount_national
-            for item in rfcv_data.items
-        )
-
-        # Arrondir au entier le plus proche (car sum peut avoir des arrondis)
-        assurance_total_rounded = round(assurance_total)
-        assurance_sum_rounded = round(assurance_articles_sum)
+        assurance_articles_sum = sum(_valuation_values(rfcv_data, 'insurance.amount_national'))
 
-        # Vérifier cohérence exacte
-        assert assurance_sum_rounded == assurance_total_rounded, (
-            f"Incohérence ASSURANCE: sum(articles)={assurance_sum_rounded} != total={assurance_total_rounded}"
+        # Vérifier cohérence exacte (montants entiers en XOF)
+        assert assurance_articles_sum == assurance_total, (
+            f"Incohérence ASSURANCE: sum(articles)={assurance_articles_sum} != total={assurance_total}"
         )
 
-    def test_coherence_poids_brut(self, rfcv_test_path):
+    def test_coherence_poids_brut(self, parse_rfcv, rfcv_test_path):
         """Vérifie que sum(POIDS_BRUT_articles) == POIDS_BRUT_total"""
-        parser = RFCVParser(rfcv_test_path, taux_douane=573.139)
-        rfcv_data = parser.parse()
+        rfcv_data = parse_rfcv(rfcv_test_path, 573.139)
 
         # Total global
         poids_brut_total = rfcv_data.valuation.gross_weight
 
         # Somme des articles
-        poids_brut_articles_sum = sum(
-            item.valuation_item.gross_weight
-            for item in rfcv_data.items
-        )
+        poids_brut_articles_sum = sum(_valuation_values(rfcv_data, 'gross_weight'))
 
         # Vérifier cohérence exacte
         assert poids_brut_articles_sum == poids_brut_total, (
             f"Incohérence POIDS BRUT: sum(articles)={poids_brut_articles_sum} != total={poids_brut_total}"
         )
 
-    def test_coherence_poids_net(self, rfcv_test_path):
+    def test_coherence_poids_net(self, parse_rfcv, rfcv_test_path):
         """Vérifie que sum(POIDS_NET_articles) == POIDS_NET_total"""
-        parser = RFCVParser(rfcv_test_path, taux_douane=573.139)
-        rfcv_data = parser.parse()
+        rfcv_data = parse_rfcv(rfcv_test_path, 573.139)
 
         # Total global
         poids_net_total = rfcv_data.valuation.net_weight
 
         # Somme des articles
-        poids_net_articles_sum = sum(
-            item.valuation_item.net_weight
-            for item in rfcv_data.items
-        )
+        poids_net_articles_sum = sum(_valuation_values(rfcv_data, 'net_weight'))
 
         # Vérifier cohérence exacte
         assert poids_net_articles_sum == poids_net_total, (
             f"Incohérence POIDS NET: sum(articles)={poids_net_articles_sum} != total={poids_net_total}"
         )
 
-    def test_devises_correctes(self, rfcv_test_path):
+    def test_devises_correctes(self, parse_rfcv, rfcv_test_path):
         """Vérifie que les devises sont correctes (FOB/FRET dans devise RFCV, ASSURANCE en XOF)"""
-        parser = RFCVParser(rfcv_test_path, taux_douane=573.139)
-        rfcv_data = parser.parse()
+        rfcv_data = parse_rfcv(rfcv_test_path, 573.139)
 
         # Récupérer la devise de la RFCV
         currency_code = rfcv_data.financial.currency_code
@@ -170,10 +176,9 @@ class TestIntegrationProportional:
                 f"Article {i+1}: Devise ASSURANCE incorrecte"
             )
 
-    def test_valeurs_positives(self, rfcv_test_path):
+    def test_valeurs_positives(self, parse_rfcv, rfcv_test_path):
         """Vérifie que toutes les valeurs calculées sont positives ou nulles"""
-        parser = RFCVParser(rfcv_test_path, taux_douane=573.139)
-        rfcv_data = parser.parse()
+        rfcv_data = parse_rfcv(rfcv_test_path, 573.139)
 
         for i, item in enumerate(rfcv_data.items):
             # FRET
@@ -192,7 +197,7 @@ class TestIntegrationProportional:
             poids_net = item.valuation_item.net_weight
             assert poids_net >= 0, f"Article {i+1}: POIDS NET négatif ({poids_net})"
 
-    def test_distribution_equilibree(self, rfcv_test_path):
+    def test_distribution_equilibree(self, parse_rfcv, rfcv_test_path):
         """
         Vérifie que la distribution est équilibrée pour articles identiques
 
@@ -201,56 +206,26 @@ class TestIntegrationProportional:
         - POIDS BRUT: majorité 651, quelques 652
         - POIDS NET: majorité 635, quelques 636
         """
-        parser = RFCVParser(rfcv_test_path, taux_douane=573.139)
-        rfcv_data = parser.parse()
+        rfcv_data = parse_rfcv(rfcv_test_path, 573.139)
 
         # Extraire les valeurs FRET de tous les articles
-        fret_values = [
-            item.valuation_item.external_freight.amount_foreign
-            for item in rfcv_data.items
-        ]
-
-        # Vérifier que les valeurs sont proches (différence max de 1)
-        min_fret = min(fret_values)
-        max_fret = max(fret_values)
+        # Vérifier que les valeurs FRET sont proches (différence max de 1)
+        min_fret, max_fret = _min_max(_valuation_values(rfcv_data, 'external_freight.amount_foreign'))
         assert max_fret - min_fret <= 1, (
             f"Distribution FRET déséquilibrée: min={min_fret}, max={max_fret}"
         )
 
         # Même vérification pour poids brut
-        poids_brut_values = [
-            item.valuation_item.gross_weight
-            for item in rfcv_data.items
-        ]
-        min_brut = min(poids_brut_values)
-        max_brut = max(poids_brut_values)
+        min_brut, max_brut = _min_max(_valuation_values(rfcv_data, 'gross_weight'))
         assert max_brut - min_brut <= 1, (
             f"Distribution POIDS BRUT déséquilibrée: min={min_brut}, max={max_brut}"
         )
 
-    def test_cas_valeurs_manquantes(self):
+    def test_cas_valeurs_manquantes(self, partial_rfcv):
         """Teste le cas où certains totaux globaux sont manquants"""
-        # Créer RFCVData avec valeurs partielles
-        from models import RFCVData, Valuation, Financial, Item, Tarification, ValuationItem, CurrencyAmount
         from proportional_calculator import ProportionalCalculator
 
-        rfcv_data = RFCVData()
-        rfcv_data.financial = Financial(currency_code='USD', exchange_rate=575.78)
-
-        # Valuation avec seulement gross_weight (autres à None)
-        rfcv_data.valuation = Valuation(
-            gross_weight=1000.0,
-            net_weight=None,
-            external_freight=None,
-            insurance=None
-        )
-
-        # 3 articles
-        for i in range(3):
-            item = Item()
-            item.tarification = Tarification(item_price=100.0)
-            item.valuation_item = ValuationItem()
-            rfcv_data.items.append(item)
+        rfcv_data = partial_rfcv
 
         # Appliquer calculs
         calculator = ProportionalCalculator()
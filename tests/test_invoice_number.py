@@ -2,229 +2,187 @@
 Tests pour la propagation du numéro de facture
 Vérifie que le numéro de facture apparaît uniquement sur le premier article
 """
+import copy
 import pytest
-import sys
-from pathlib import Path
-
-# Ajouter le répertoire src au path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+from collections import Counter
 
 from models import (
     RFCVData, Financial, Identification, Item, Tarification,
     HSCode, Package, ValuationItem, AttachedDocument
 )
 from rfcv_parser import RFCVParser
-
-
-class TestInvoiceNumberPropagation:
-    """Tests de propagation du numéro de facture"""
-
-    def test_invoice_number_first_item_only_attached_documents(self):
-        """Le document FACTURE (code 0007) doit apparaître uniquement sur le premier article"""
-        # Créer des données de test
-        rfcv_data = RFCVData()
-        rfcv_data.financial = Financial(
-            invoice_number="2025/BC/SN18215",
-            invoice_date="17/07/2025"
-        )
-        rfcv_data.identification = Identification(
-            rfcv_number="RCS25119416",
-            fdi_number="FDI-123456"
-        )
-
-        # Créer 3 articles de test
-        rfcv_data.items = [
-            Item(
-                goods_description=f"Article {i+1}",
-                tarification=Tarification(
-                    hscode=HSCode(commodity_code="84099900")
-                )
-            )
-            for i in range(3)
-        ]
-
-        # Simuler l'ajout des documents attachés
-        parser = RFCVParser("dummy.pdf")
-        parser._add_attached_documents(rfcv_data)
-
-        # Vérifications
-        # Premier article : doit avoir le document FACTURE (0007)
-        first_item_docs = rfcv_data.items[0].attached_documents
-        invoice_docs_first = [doc for doc in first_item_docs if doc.code == '0007']
-        assert len(invoice_docs_first) == 1, "Le premier article doit avoir exactement 1 document FACTURE"
-        assert invoice_docs_first[0].name == 'FACTURE'
-        assert invoice_docs_first[0].reference == "2025/BC/SN18215"
-        assert invoice_docs_first[0].document_date == "17/07/2025"
-
-        # Articles suivants : NE doivent PAS avoir le document FACTURE (0007)
-        for i, item in enumerate(rfcv_data.items[1:], start=2):
-            invoice_docs = [doc for doc in item.attached_documents if doc.code == '0007']
-            assert len(invoice_docs) == 0, f"L'article {i} ne doit PAS avoir de document FACTURE"
-
-    def test_rfcv_and_fdi_on_all_items(self):
-        """Le document RFCV (2501) doit apparaître sur tous les articles, FDI (6610) sur le premier uniquement"""
-        rfcv_data = RFCVData()
-        rfcv_data.financial = Financial(
-            invoice_number="2025/BC/SN18215"
-        )
-        rfcv_data.identification = Identification(
-            rfcv_number="RCS25119416",
-            fdi_number="FDI-123456",
-            fdi_date="15/07/2025"
+from item_grouper import group_items_by_hs_code
+
+
+@pytest.fixture(scope="module")
+def parser():
+    """Parser partagé par le module (_add_attached_documents ne dépend d'aucun état du parser)"""
+    return RFCVParser("dummy.pdf")
+
+
+@pytest.fixture(scope="module")
+def base_financial():
+    """Données financières communes (lecture seule : partagées par le module)"""
+    return Financial(
+        invoice_number="2025/BC/SN18215",
+        invoice_date="17/07/2025"
+    )
+
+
+@pytest.fixture(scope="module")
+def base_identification():
+    """Identification commune RFCV + FDI (lecture seule : partagée par le module)"""
+    return Identification(
+        rfcv_number="RCS25119416",
+        fdi_number="FDI-123456",
+        fdi_date="15/07/2025"
+    )
+
+
+@pytest.fixture(scope="module")
+def grouped_rfcv_data(parser, base_financial, base_identification):
+    """RFCV de 5 articles de même code HS, regroupés puis documentés (lecture seule)"""
+    rfcv_data = RFCVData(financial=base_financial, identification=base_identification)
+
+    # Créer 5 articles avec codes HS identiques (pour forcer regroupement)
+    rfcv_data.items = [
+        Item(
+            goods_description=f"Article {i+1}",
+            tarification=Tarification(
+                hscode=HSCode(commodity_code="84099900")
+            ),
+            packages=Package(number_of_packages=1)
         )
-
-        # Créer 3 articles
-        rfcv_data.items = [
-            Item(goods_description=f"Article {i+1}")
-            for i in range(3)
-        ]
-
-        # Ajouter les documents
-        parser = RFCVParser("dummy.pdf")
-        parser._add_attached_documents(rfcv_data)
-
-        # Vérifier que tous les articles ont le RFCV
-        for i, item in enumerate(rfcv_data.items, start=1):
-            rfcv_docs = [doc for doc in item.attached_documents if doc.code == '2501']
-            assert len(rfcv_docs) == 1, f"Article {i} doit avoir 1 document RFCV"
-            assert rfcv_docs[0].reference == "RCS25119416"
-
-        # Vérifier que seul le premier article a la FDI
-        fdi_docs = [doc for doc in rfcv_data.items[0].attached_documents if doc.code == '6610']
-        assert len(fdi_docs) == 1, "Le premier article doit avoir 1 document FDI"
-        assert fdi_docs[0].reference == "FDI-123456"
-
-        # Vérifier que les autres articles n'ont PAS la FDI
-        for i, item in enumerate(rfcv_data.items[1:], start=2):
-            fdi_docs = [doc for doc in item.attached_documents if doc.code == '6610']
-            assert len(fdi_docs) == 0, f"L'article {i} ne doit PAS avoir de document FDI"
-
-    def test_previous_document_reference_first_item_only(self):
-        """Previous_document_reference doit apparaître uniquement sur le premier article"""
-        rfcv_data = RFCVData()
-        rfcv_data.financial = Financial(
-            invoice_number="2025/BC/SN18215",
-            invoice_date="17/07/2025"
-        )
-        rfcv_data.identification = Identification()
-
-        # Créer 3 articles
-        rfcv_data.items = [
-            Item(goods_description=f"Article {i+1}")
-            for i in range(3)
-        ]
-
-        # Simuler l'ajout de Previous_document_reference
-        invoice_num = rfcv_data.financial.invoice_number
-        invoice_date = rfcv_data.financial.invoice_date
-        prev_doc_ref = f"{invoice_num} DU {invoice_date}"
-        rfcv_data.items[0].previous_document_reference = prev_doc_ref
-
-        # Vérifications
-        assert rfcv_data.items[0].previous_document_reference == "2025/BC/SN18215 DU 17/07/2025"
-
-        for i, item in enumerate(rfcv_data.items[1:], start=2):
-            assert item.previous_document_reference is None, \
-                f"Article {i} ne doit PAS avoir de Previous_document_reference"
-
-    def test_invoice_number_with_single_item(self):
-        """Test avec un seul article"""
-        rfcv_data = RFCVData()
-        rfcv_data.financial = Financial(
-            invoice_number="2025/BC/SN18215",
-            invoice_date="17/07/2025"
-        )
-        rfcv_data.identification = Identification(
-            rfcv_number="RCS25119416"
-        )
-
-        # Un seul article
-        rfcv_data.items = [Item(goods_description="Article unique")]
-
-        parser = RFCVParser("dummy.pdf")
-        parser._add_attached_documents(rfcv_data)
-
-        # Doit avoir le document FACTURE
-        invoice_docs = [doc for doc in rfcv_data.items[0].attached_documents if doc.code == '0007']
-        assert len(invoice_docs) == 1
-
-    def test_invoice_number_with_empty_items(self):
-        """Test avec liste d'articles vide (ne doit pas planter)"""
-        rfcv_data = RFCVData()
-        rfcv_data.financial = Financial(
-            invoice_number="2025/BC/SN18215"
-        )
-        rfcv_data.identification = Identification()
-        rfcv_data.items = []
-
-        parser = RFCVParser("dummy.pdf")
-        # Ne doit pas planter
-        parser._add_attached_documents(rfcv_data)
-
-        assert len(rfcv_data.items) == 0
-
-    def test_invoice_number_after_grouping(self):
-        """Test que le numéro de facture reste sur le premier article après regroupement"""
-        from item_grouper import group_items_by_hs_code
-
-        rfcv_data = RFCVData()
-        rfcv_data.financial = Financial(
-            invoice_number="2025/BC/SN18215",
-            invoice_date="17/07/2025"
-        )
-        rfcv_data.identification = Identification(
-            rfcv_number="RCS25119416"
-        )
-
-        # Créer 5 articles avec codes HS identiques (pour forcer regroupement)
-        rfcv_data.items = [
-            Item(
-                goods_description=f"Article {i+1}",
-                tarification=Tarification(
-                    hscode=HSCode(commodity_code="84099900")
-                ),
-                packages=Package(number_of_packages=1)
-            )
-            for i in range(5)
-        ]
-
-        # Regrouper les articles
-        rfcv_data.items = group_items_by_hs_code(rfcv_data.items, total_packages=5)
-
-        # Ajouter les documents après regroupement
-        parser = RFCVParser("dummy.pdf")
-        parser._add_attached_documents(rfcv_data)
-
-        # Vérifier que le premier article (après regroupement) a le document FACTURE
-        invoice_docs = [doc for doc in rfcv_data.items[0].attached_documents if doc.code == '0007']
-        assert len(invoice_docs) == 1, "Le premier article groupé doit avoir le document FACTURE"
-
-    def test_count_invoice_documents_multiple_items(self):
-        """Compte total des documents FACTURE doit être exactement 1"""
-        rfcv_data = RFCVData()
-        rfcv_data.financial = Financial(
-            invoice_number="2025/BC/SN18215"
-        )
-        rfcv_data.identification = Identification(
-            rfcv_number="RCS25119416"
-        )
-
-        # 10 articles
-        rfcv_data.items = [
-            Item(goods_description=f"Article {i+1}")
-            for i in range(10)
-        ]
-
-        parser = RFCVParser("dummy.pdf")
-        parser._add_attached_documents(rfcv_data)
-
-        # Compter le nombre total de documents FACTURE
-        total_invoice_docs = sum(
-            len([doc for doc in item.attached_documents if doc.code == '0007'])
-            for item in rfcv_data.items
-        )
-
-        assert total_invoice_docs == 1, f"Il doit y avoir exactement 1 document FACTURE au total, trouvé: {total_invoice_docs}"
+        for i in range(5)
+    ]
+
+    # Regrouper les articles puis ajouter les documents
+    rfcv_data.items = group_items_by_hs_code(rfcv_data.items, total_packages=5)
+    parser._add_attached_documents(rfcv_data)
+    return rfcv_data
+
+
+def _doc_counts(items):
+    """Nombre de documents joints par (index article, code document), en une passe"""
+    return Counter(
+        (i, doc.code) for i, item in enumerate(items) for doc in item.attached_documents
+    )
+
+
+def _first_doc(item, code):
+    """Premier document joint de l'article ayant ce code"""
+    return next(doc for doc in item.attached_documents if doc.code == code)
+
+
+@pytest.mark.parametrize("n_items", [1, 3, 10])
+def test_invoice_doc_count(parser, base_financial, base_identification, n_items):
+    """Le document FACTURE (code 0007) apparaît exactement une fois, sur le premier article"""
+    rfcv_data = RFCVData()
+    rfcv_data.financial = base_financial
+    rfcv_data.identification = base_identification
+    # Copies superficielles d'un article modèle : seule la liste
+    # attached_documents est modifiée et doit être propre à chaque article
+    template = Item(tarification=Tarification(hscode=HSCode(commodity_code="84099900")))
+    rfcv_data.items = [copy.copy(template) for _ in range(n_items)]
+    for i, item in enumerate(rfcv_data.items, start=1):
+        item.goods_description = f"Article {i}"
+        item.attached_documents = []
+
+    parser._add_attached_documents(rfcv_data)
+
+    counts = _doc_counts(rfcv_data.items)
+
+    # Premier article : document FACTURE complet
+    assert counts[(0, '0007')] == 1, "Le premier article doit avoir exactement 1 document FACTURE"
+    invoice_doc = _first_doc(rfcv_data.items[0], '0007')
+    assert invoice_doc.name == 'FACTURE'
+    assert invoice_doc.reference == "2025/BC/SN18215"
+    assert invoice_doc.document_date == "17/07/2025"
+
+    # Aucun autre article ne porte de FACTURE (arrêt au premier trouvé)
+    extra = next(
+        (i for i, item in enumerate(rfcv_data.items[1:], start=2)
+         if any(doc.code == '0007' for doc in item.attached_documents)),
+        None
+    )
+    assert extra is None, f"Il doit y avoir exactement 1 document FACTURE au total, trouvé aussi sur l'article {extra}"
+
+
+def test_rfcv_and_fdi_on_all_items(parser, base_financial, base_identification):
+    """Le document RFCV (2501) doit apparaître sur tous les articles, FDI (6610) sur le premier uniquement"""
+    rfcv_data = RFCVData()
+    rfcv_data.financial = base_financial
+    rfcv_data.identification = base_identification
+
+    # Créer 3 articles
+    rfcv_data.items = [
+        Item(goods_description=f"Article {i+1}")
+        for i in range(3)
+    ]
+
+    # Ajouter les documents
+    parser._add_attached_documents(rfcv_data)
+
+    counts = _doc_counts(rfcv_data.items)
+
+    # Vérifier que tous les articles ont le RFCV
+    for i, item in enumerate(rfcv_data.items):
+        assert counts[(i, '2501')] == 1, f"Article {i + 1} doit avoir 1 document RFCV"
+        assert _first_doc(item, '2501').reference == "RCS25119416"
+
+    # Vérifier que seul le premier article a la FDI
+    assert counts[(0, '6610')] == 1, "Le premier article doit avoir 1 document FDI"
+    assert _first_doc(rfcv_data.items[0], '6610').reference == "FDI-123456"
+
+    # Vérifier que les autres articles n'ont PAS la FDI
+    for i in range(1, len(rfcv_data.items)):
+        assert counts[(i, '6610')] == 0, f"L'article {i + 1} ne doit PAS avoir de document FDI"
+
+
+def test_previous_document_reference_first_item_only(base_financial, base_identification):
+    """Previous_document_reference doit apparaître uniquement sur le premier article"""
+    rfcv_data = RFCVData()
+    rfcv_data.financial = base_financial
+    rfcv_data.identification = base_identification
+
+    # Créer 3 articles
+    rfcv_data.items = [
+        Item(goods_description=f"Article {i+1}")
+        for i in range(3)
+    ]
+
+    # Simuler l'ajout de Previous_document_reference
+    invoice_num = rfcv_data.financial.invoice_number
+    invoice_date = rfcv_data.financial.invoice_date
+    prev_doc_ref = f"{invoice_num} DU {invoice_date}"
+    rfcv_data.items[0].previous_document_reference = prev_doc_ref
+
+    # Vérifications
+    assert rfcv_data.items[0].previous_document_reference == "2025/BC/SN18215 DU 17/07/2025"
+
+    for i, item in enumerate(rfcv_data.items[1:], start=2):
+        assert item.previous_document_reference is None, \
+            f"Article {i} ne doit PAS avoir de Previous_document_reference"
+
+
+def test_invoice_number_with_empty_items(parser, base_financial, base_identification):
+    """Test avec liste d'articles vide (ne doit pas planter)"""
+    rfcv_data = RFCVData()
+    rfcv_data.financial = base_financial
+    rfcv_data.identification = base_identification
+    rfcv_data.items = []
+
+    # Ne doit pas planter
+    parser._add_attached_documents(rfcv_data)
+
+    assert len(rfcv_data.items) == 0
+
+
+def test_invoice_number_after_grouping(grouped_rfcv_data):
+    """Test que le numéro de facture reste sur le premier article après regroupement"""
+    # Vérifier que le premier article (après regroupement) a le document FACTURE
+    counts = _doc_counts(grouped_rfcv_data.items)
+    assert counts[(0, '0007')] == 1, "Le premier article groupé doit avoir le document FACTURE"
 
 
 if __name__ == '__main__':
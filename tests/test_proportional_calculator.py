@@ -8,11 +8,6 @@ Date: 2025-01-28
 """
 
 import pytest
-import sys
-from pathlib import Path
-
-# Ajouter src/ au path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from proportional_calculator import ProportionalCalculator
 from models import RFCVData, Valuation, Item, ValuationItem, Tarification, CurrencyAmount, Financial
@@ -68,15 +63,10 @@ class TestDistributeProportionally:
             fob_total=fob_total
         )
 
-        # Vérifier la somme exacte
-        assert sum(result) == 2000, f"Somme attendue: 2000, obtenue: {sum(result)}"
-
-        # Compter les valeurs 57 et 58
-        count_57 = result.count(57)
-        count_58 = result.count(58)
-
-        assert count_57 == 30, f"Attendu 30 articles à 57, obtenu {count_57}"
-        assert count_58 == 5, f"Attendu 5 articles à 58, obtenu {count_58}"
+        # Une seule comparaison de listes (en C) couvre la somme exacte (2000)
+        # et la répartition : +1 aux 5 premiers articles, 57 pour les 30 autres
+        expected = [58] * 5 + [57] * 30
+        assert result == expected, f"Répartition attendue: 5×58 puis 30×57, obtenue: {result}"
 
     def test_articles_differents(self):
         """Test avec articles de FOB différents"""
@@ -137,6 +127,23 @@ class TestDistributeProportionally:
                 fob_total=fob_total
             )
 
+    @pytest.mark.parametrize("total,fob_articles,fob_total", [
+        (-100.0, [100.0, 200.0, 300.0], 600.0),
+        (100.0, [100.0, -200.0, 300.0], 200.0),
+        (100.0, [100.0, 200.0, 300.0], -600.0),
+    ])
+    def test_montant_negatif_raise_error(self, monkeypatch, total, fob_articles, fob_total):
+        """Test montant négatif refusé, par la boucle Python comme par NumPy"""
+        import proportional_calculator
+
+        fob_articles = fob_articles * 12  # 36 articles : chemin NumPy possible
+        for seuil in (len(fob_articles) + 1, len(fob_articles)):
+            monkeypatch.setattr(proportional_calculator, '_NUMPY_MIN_ITEMS', seuil)
+            with pytest.raises(ValueError, match="montants négatifs"):
+                self.calculator.distribute_proportionally(total, fob_articles, fob_total)
+            with pytest.raises(ValueError, match="montants négatifs"):
+                self.calculator.distribute_proportionally_multi([total, 10.0], fob_articles, fob_total)
+
     def test_poids_brut_exemple_reel(self):
         """Test répartition poids brut - exemple réel RFCV"""
         # 35 articles, poids brut total: 22797 KG
@@ -200,6 +207,76 @@ class TestDistributeProportionally:
         assert 1 in result
         assert 2 in result
 
+    @pytest.mark.parametrize("n_items", [35, 200])
+    def test_numpy_identique_boucle_python(self, monkeypatch, n_items):
+        """La variante NumPy (grands nombres d'articles) donne le même résultat que la boucle"""
+        pytest.importorskip("numpy")
+        import proportional_calculator
+        import random
+
+        rng = random.Random(n_items)
+        fob_articles = [round(rng.uniform(1, 1000), 2) for _ in range(n_items)]
+        # Avec des articles identiques, les égalités de décimales départagent par ordre
+        fob_articles[:10] = [362.39] * 10
+        fob_total = sum(fob_articles)
+
+        results = []
+        for seuil in (n_items + 1, n_items):  # boucle Python, puis NumPy
+            monkeypatch.setattr(proportional_calculator, '_NUMPY_MIN_ITEMS', seuil)
+            results.append(self.calculator.distribute_proportionally(
+                total_amount=12345.67,
+                item_fobs=fob_articles,
+                fob_total=fob_total
+            ))
+
+        assert results[0] == results[1]
+        assert sum(results[1]) == 12346
+        assert all(isinstance(v, int) for v in results[1])
+
+    @pytest.mark.parametrize("n_items", [3, 35])
+    @pytest.mark.parametrize("fob_total", [None, 12683.65])
+    def test_fob_identiques_raccourci(self, n_items, fob_total):
+        """Articles de FOB identiques : même résultat que l'algorithme général"""
+        fob_articles = [362.39] * n_items
+        # Un FOB total déclaré peut différer de la somme des articles
+        fob_total = fob_total or sum(fob_articles)
+        # Un article différent en dernière position force l'algorithme général
+        reference = self.calculator.distribute_proportionally(
+            2000.00, fob_articles + [0.0], fob_total
+        )[:-1]
+
+        result = self.calculator.distribute_proportionally(2000.00, fob_articles, fob_total)
+        assert result == reference
+
+    @pytest.mark.parametrize("n_items", [3, 35])
+    def test_multi_identique_appels_unitaires(self, n_items):
+        """La répartition fusionnée de plusieurs totaux égale les appels unitaires"""
+        fob_articles = [362.39] * (n_items - 1) + [1000.0]
+        fob_total = sum(fob_articles)
+        totals = [2000.00, None, 44.05, 0.0, 22797.0]
+
+        result = self.calculator.distribute_proportionally_multi(totals, fob_articles, fob_total)
+
+        assert result == [
+            None if total is None
+            else self.calculator.distribute_proportionally(total, fob_articles, fob_total)
+            for total in totals
+        ]
+
+    def test_numpy_tampons_reutilises(self):
+        """Les tampons NumPy sont réutilisés entre répartitions (pas de réallocation)"""
+        pytest.importorskip("numpy")
+
+        fob_articles = [362.39, 100.0] * 20
+        first = self.calculator.distribute_proportionally(2000.00, fob_articles, sum(fob_articles))
+        buffer = self.calculator._floor_buf
+        second = self.calculator.distribute_proportionally(2000.00, fob_articles[:35], sum(fob_articles[:35]))
+
+        assert buffer is not None
+        assert self.calculator._floor_buf is buffer
+        # Les résultats sont des copies, indépendantes des tampons
+        assert sum(first) == 2000 and sum(second) == 2000
+
 
 class TestCurrencyAmount:
     """Tests de création des objets CurrencyAmount"""
@@ -222,6 +299,30 @@ class TestCurrencyAmount:
         assert result.currency_name == "Franc CFA"
         assert result.currency_rate == 1.0
 
+    @pytest.mark.parametrize("amount,expected", [
+        (44.05, 44.0),
+        (0.5, 1.0),
+        (2.5, 3.0),   # round() donnerait 2 (arrondi au pair)
+        (44050.5, 44051.0),
+        (2.4999, 2.0),
+    ])
+    def test_create_currency_amount_xof_arrondi(self, amount, expected):
+        """Test montant XOF fractionnaire arrondi à l'unité, demi vers le haut"""
+        result = self.calculator._create_currency_amount(
+            amount=amount,
+            currency_code="XOF"
+        )
+
+        assert result.amount_national == expected
+        assert result.amount_foreign == result.amount_national
+
+    def test_currency_amount_xof_non_arrondi(self):
+        """Test CurrencyAmount XOF hors répartition conservé tel quel (fret, etc.)"""
+        result = CurrencyAmount(amount_national=2.5, amount_foreign=2.5, currency_code="XOF")
+
+        assert result.amount_national == 2.5
+        assert result.amount_foreign == 2.5
+
     def test_create_currency_amount_usd(self):
         """Test création CurrencyAmount en USD (devise étrangère)"""
         result = self.calculator._create_currency_amount(
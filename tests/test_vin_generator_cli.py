@@ -0,0 +1,66 @@
+"""
+Tests de l'export JSON de vin_generator_cli
+"""
+
+import json
+
+import pytest
+
+import vin_generator_cli
+
+
+def _result(vins):
+    """Résultat de génération minimal attendu par export_json"""
+    return {
+        "success": True,
+        "vins": vins,
+        "quantity_generated": len(vins),
+        "wmi": "LZS",
+        "vds": "HCKZS",
+        "year": 2025,
+        "plant_code": "S",
+        "prefix": "LZSHCKZS",
+        "start_sequence": 1,
+        "end_sequence": len(vins),
+        "generated_at": "2025-01-15T10:00:00",
+    }
+
+
+def _attendu(result):
+    """Référence: json.dumps(indent=2, ensure_ascii=False) du même document"""
+    return json.dumps({
+        "success": result["success"],
+        "vins": result["vins"],
+        "metadata": {
+            "quantity": result["quantity_generated"],
+            "wmi": result["wmi"],
+            "vds": result["vds"],
+            "year": result["year"],
+            "plant_code": result["plant_code"],
+            "prefix": result["prefix"],
+            "start_sequence": result["start_sequence"],
+            "end_sequence": result["end_sequence"],
+            "generated_at": result["generated_at"],
+        },
+    }, indent=2, ensure_ascii=False)
+
+
+@pytest.mark.parametrize("vins", [
+    [],
+    ["LZSHCKZS2S8000001"],
+    ["LZSHCKZS2S8000001", "LZSHCKZS0S8000002", "LZSHCKZS9S8000003"],
+    ['LZS"HCKZS', "Châssis-é\\1"],  # échappement et non-ASCII
+])
+def test_export_json_sans_orjson_identique_a_json_dumps(monkeypatch, vins):
+    """Le document écrit directement (sans orjson) égale json.dumps"""
+    monkeypatch.setattr(vin_generator_cli, "HAS_ORJSON", False)
+    result = _result(vins)
+    assert vin_generator_cli.export_json(result) == _attendu(result)
+
+
+@pytest.mark.skipif(not vin_generator_cli.HAS_ORJSON, reason="orjson non installé")
+@pytest.mark.parametrize("vins", [[], ["LZSHCKZS2S8000001", "LZSHCKZS0S8000002"]])
+def test_export_json_orjson_identique_a_json_dumps(vins):
+    """La sortie orjson reste identique à json.dumps"""
+    result = _result(vins)
+    assert vin_generator_cli.export_json(result) == _attendu(result)
@@ -6,14 +6,10 @@ Tests pour VINPrefixDatabase
 Tests unitaires pour la base de données de préfixes VIN réels.
 """
 
-import sys
-from pathlib import Path
+import re
 import pytest
 
-# Ajouter src/ au path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
-
-from vin_prefix_database import VINPrefixDatabase, VINPrefix, WMI_REGISTRY
+from vin_prefix_database import VINPrefixDatabase, VINPrefix, WMI_REGISTRY, get_shared_database
 
 
 class TestVINPrefix:
@@ -117,12 +113,26 @@ class TestVINPrefixDatabase:
         assert prefix.country == "USA"
         assert prefix.year_code == "5"
 
+    def test_get_random_prefix_candidates_cached(self, database):
+        """Les candidats filtrés sont calculés une fois par combinaison de filtres"""
+        first = database.get_random_prefix(country="China", year_code="5")
+        assert len(database._candidates_cache) == 1
+
+        # Même combinaison à la casse près : même entrée de cache
+        for _ in range(20):
+            prefix = database.get_random_prefix(country="CHINA", year_code="5")
+            assert prefix.country == "China"
+            assert prefix.year_code == "5"
+        assert len(database._candidates_cache) == 1
+        assert first in database._candidates_cache[(None, None, "china", "5")]
+
     def test_get_random_prefix_no_match(self, database):
         """Test erreur si aucun préfixe ne correspond"""
-        with pytest.raises(ValueError, match="Aucun préfixe trouvé pour WMI"):
-            database.get_random_prefix(wmi="XXX")
+        with pytest.raises(ValueError, match="Aucun préfixe trouvé pour WMI: xxx$"):
+            database.get_random_prefix(wmi="xxx")
 
-        with pytest.raises(ValueError, match="Aucun préfixe trouvé pour fabricant"):
+        # Le message rapporte la valeur passée, pas sa forme normalisée
+        with pytest.raises(ValueError, match="Aucun préfixe trouvé pour fabricant: NonExistent$"):
             database.get_random_prefix(manufacturer="NonExistent")
 
     def test_search_by_wmi(self, database):
@@ -217,14 +227,15 @@ class TestIntegration:
 
     def test_no_forbidden_chars_in_prefixes(self):
         """Test qu'aucun préfixe ne contient I/O/Q"""
-        db = VINPrefixDatabase()
-        forbidden = {'I', 'O', 'Q', 'i', 'o', 'q'}
-        problematic = [p for p in db.prefixes if any(c in forbidden for c in p.wmi_vds)]
+        db = get_shared_database()
+        # Une seule recherche regex (en C) sur tous les préfixes, un par ligne
+        all_prefixes = '\n'.join(p.wmi_vds for p in db.prefixes)
+        problematic = re.findall(r'^.*[IOQioq].*$', all_prefixes, re.MULTILINE)
         assert len(problematic) == 0, f"Trouvé {len(problematic)} préfixes avec caractères interdits"
 
     def test_all_prefixes_have_valid_format(self):
         """Test que tous les préfixes ont format valide"""
-        db = VINPrefixDatabase()
+        db = get_shared_database()
         for prefix in db.prefixes[:1000]:  # Échantillon
             assert len(prefix.wmi_vds) == 8
             assert len(prefix.year_code) == 1
@@ -233,7 +244,7 @@ class TestIntegration:
 
     def test_manufacturer_consistency(self):
         """Test cohérence fabricant dans base"""
-        db = VINPrefixDatabase()
+        db = get_shared_database()
         # Tous les préfixes Ford doivent avoir WMI commençant par 1F
         ford_prefixes = db.search_by_manufacturer("Ford")
         for p in ford_prefixes:
@@ -11,11 +11,16 @@ Usage:
 
 import sys
 import argparse
-import json
-import csv
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime, timezone
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Ajouter src au path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
@@ -92,11 +97,58 @@ def export_json(result: dict) -> str:
             "generated_at": result["generated_at"]
         }
     }
-    return json.dumps(output, indent=2, ensure_ascii=False)
+    if HAS_ORJSON:
+        # Même sortie que json.dumps(indent=2, ensure_ascii=False), encodeur en C
+        return orjson.dumps(output, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return _json_indent2(output)
+
+
+def _json_indent2(output: dict) -> str:
+    """
+    Écrit directement le document JSON d'export_json (sans orjson)
+
+    Même texte que json.dumps(output, indent=2, ensure_ascii=False) pour
+    cette structure fixe (scalaire, liste de VINs, métadonnées scalaires),
+    sans passer chaque VIN dans l'encodeur Python : seuls les scalaires
+    sont encodés par json.
+
+    Args:
+        output: Document construit par export_json
+
+    Returns:
+        JSON indenté de 2 espaces
+    """
+    import json
+
+    def encode(value) -> str:
+        return json.dumps(value, ensure_ascii=False)
+
+    vins = output["vins"]
+    joined = "".join(vins)
+    if joined.isascii() and joined.isalnum():
+        # VINs alphanumériques ASCII : rien à échapper
+        items = '"' + '",\n    "'.join(vins) + '"'
+    else:
+        items = ",\n    ".join(map(encode, vins))
+    vins_block = f"[\n    {items}\n  ]" if vins else "[]"
+
+    metadata_block = ",\n".join(
+        f"    {encode(key)}: {encode(value)}" for key, value in output["metadata"].items()
+    )
+    return (
+        "{\n"
+        f'  "success": {encode(output["success"])},\n'
+        f'  "vins": {vins_block},\n'
+        '  "metadata": {\n'
+        f"{metadata_block}\n"
+        "  }\n"
+        "}"
+    )
 
 
 def export_csv(result: dict) -> str:
     """Exporte en CSV"""
+    import csv
     import io
     output = io.StringIO()
     writer = csv.writer(output)
@@ -104,35 +156,44 @@ def export_csv(result: dict) -> str:
     # En-tête
     writer.writerow(["index", "vin", "wmi", "vds", "year", "plant_code", "sequence"])
 
-    # Données
+    # Données (boucle d'écriture dans le module csv, en C)
     start_seq = result["start_sequence"]
-    for i, vin in enumerate(result["vins"]):
-        writer.writerow([
-            i + 1,
-            vin,
-            result["wmi"],
-            result["vds"],
-            result["year"],
-            result["plant_code"],
-            start_seq + i
-        ])
+    wmi, vds, year, plant_code = result["wmi"], result["vds"], result["year"], result["plant_code"]
+    writer.writerows(
+        (i, vin, wmi, vds, year, plant_code, start_seq + i - 1)
+        for i, vin in enumerate(result["vins"], start=1)
+    )
 
     return output.getvalue()
 
 
 def export_text(result: dict) -> str:
     """Exporte en texte simple"""
-    header = f"""# VINs générés le {result['generated_at']}
-# Quantité: {result['quantity_generated']}
-# WMI: {result['wmi']} | VDS: {result['vds']} | Année: {result['year']}
-# Séquences: {result['start_sequence']} à {result['end_sequence']}
-# =========================================================
-
-"""
-    return header + "\n".join(result["vins"])
-
-
-def main():
+    # En-tête et VINs assemblés en un seul join (une seule allocation)
+    return "\n".join((
+        f"# VINs générés le {result['generated_at']}",
+        f"# Quantité: {result['quantity_generated']}",
+        f"# WMI: {result['wmi']} | VDS: {result['vds']} | Année: {result['year']}",
+        f"# Séquences: {result['start_sequence']} à {result['end_sequence']}",
+        "# =========================================================",
+        "",
+        *result["vins"]
+    ))
+
+
+# Règles de validation des arguments : (prédicat, message d'erreur)
+_ARG_RULES = (
+    (lambda args: 1 <= args.quantity <= 10000, "La quantité doit être entre 1 et 10000"),
+    (lambda args: len(args.wmi) == 3, "Le WMI doit avoir exactement 3 caractères"),
+    (lambda args: len(args.vds) == 5, "Le VDS doit avoir exactement 5 caractères"),
+    (lambda args: len(args.plant) == 1, "Le code usine doit avoir exactement 1 caractère"),
+    (lambda args: 2001 <= args.year <= 2030, "L'année doit être entre 2001 et 2030"),
+)
+
+
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Construit le parser d'arguments (une seule fois par processus)"""
     parser = argparse.ArgumentParser(
         description="Génère des VINs ISO 3779 indépendamment du PDF RFCV",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -200,39 +261,41 @@ Structure VIN ISO 3779:
         help="Mode verbeux"
     )
 
-    args = parser.parse_args()
+    return parser
 
-    # Validation
-    if args.quantity < 1 or args.quantity > 10000:
-        parser.error("La quantité doit être entre 1 et 10000")
 
-    if len(args.wmi) != 3:
-        parser.error("Le WMI doit avoir exactement 3 caractères")
+def main(argv=None):
+    """
+    Point d'entrée CLI
 
-    if len(args.vds) != 5:
-        parser.error("Le VDS doit avoir exactement 5 caractères")
+    Args:
+        argv: Arguments (défaut: sys.argv[1:])
+    """
+    parser = _build_parser()
+    args = parser.parse_args(argv)
 
-    if len(args.plant) != 1:
-        parser.error("Le code usine doit avoir exactement 1 caractère")
+    # Validation (règles évaluées dans l'ordre, arrêt à la première erreur)
+    for is_valid, message in _ARG_RULES:
+        if not is_valid(args):
+            parser.error(message)
 
-    if args.year < 2001 or args.year > 2030:
-        parser.error("L'année doit être entre 2001 et 2030")
+    wmi, vds, plant_code = args.wmi.upper(), args.vds.upper(), args.plant.upper()
 
     # Génération
     if args.verbose:
         print(f"Génération de {args.quantity} VINs...", file=sys.stderr)
-        print(f"  WMI: {args.wmi.upper()}", file=sys.stderr)
-        print(f"  VDS: {args.vds.upper()}", file=sys.stderr)
+        print(f"  WMI: {wmi}", file=sys.stderr)
+        print(f"  VDS: {vds}", file=sys.stderr)
         print(f"  Année: {args.year}", file=sys.stderr)
-        print(f"  Usine: {args.plant.upper()}", file=sys.stderr)
+        print(f"  Usine: {plant_code}", file=sys.stderr)
 
     try:
         result = generate_vins(
             quantity=args.quantity,
-            wmi=args.wmi.upper(),
-            vds=args.vds.upper(),
+            wmi=wmi,
+            vds=vds,
             year=args.year,
-            plant_code=args.plant.upper()
+            plant_code=plant_code
         )
 
         # Export selon format
@@ -245,14 +308,25 @@ Structure VIN ISO 3779:
 
         # Sortie
         if args.output:
-            with open(args.output, "w", encoding="utf-8") as f:
-                f.write(output)
+            # Encodage unique puis une seule écriture binaire (pas de couche
+            # texte : les fins de ligne \r\n du CSV sont écrites telles quelles)
+            with open(args.output, "wb", buffering=1 << 20) as f:
+                f.write(output.encode("utf-8"))
             if args.verbose:
                 print(f"\n✓ {result['quantity_generated']} VINs générés", file=sys.stderr)
                 print(f"✓ Séquences: {result['start_sequence']} → {result['end_sequence']}", file=sys.stderr)
                 print(f"✓ Fichier: {args.output}", file=sys.stderr)
         else:
-            print(output)
+            # Écriture binaire directe (pas de ré-encodage par la couche texte) ;
+            # print() reste le repli si stdout a été remplacé par un flux texte pur
+            stdout = getattr(sys.stdout, "buffer", None)
+            if stdout is None:
+                print(output)
+            else:
+                sys.stdout.flush()
+                stdout.write(output.encode("utf-8"))
+                stdout.write(b"\n")
+                stdout.flush()
 
     except ValueError as e:
         print(f"Erreur: {e}", file=sys.stderr)